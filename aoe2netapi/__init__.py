@@ -20,6 +20,16 @@ if version_info.major < 3:
 # "from aoe2netapi.models import ..." or "from aoe2netapi.constants import ..."
 from .aoe2 import API, Nightbot, Aoe2NetException
 
+
+def __getattr__(name):
+    # the asyncio clients require the optional dependency 'aiohttp' (pip install aoe2netapi-wrapper[async]),
+    # so they (and aiohttp) are only imported when they are used
+    if name in ("AsyncAPI", "AsyncNightbot"):
+        from . import aio
+        return getattr(aio, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
 __version__ = "2.0.0"
 __license__ = """
 MIT License
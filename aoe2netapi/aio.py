@@ -0,0 +1,840 @@
+"""
+The asyncio counterpart of the `API` and `Nightbot` classes.
+
+Requires the optional dependency `aiohttp` (`pip install aoe2netapi-wrapper[async]`).
+
+The request parameters are validated and the responses are mapped exactly like in the blocking classes,
+see `aoe2netapi.aoe2` for the documentation of the individual functions.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Union, Any, Dict, List, Optional, AsyncIterator, Callable, Awaitable, Iterable, Mapping, \
+    Tuple
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency
+    aiohttp = None
+
+from aoe2netapi.aoe2 import (
+    Aoe2NetException, headers, _accept_encoding, DEFAULT_CACHE_TTLS, _STRINGS_INDEXES, _STREAM_CHUNK_SIZE, _retry_delay,
+    STRINGS_URL, LEADERBOARD_URL, MATCH_HISTORY_URL, RATING_HISTORY_URL, RANK_DETAILS_URL, CURRENT_MATCH_URL,
+    _strings_params, _build_strings, _leaderboard_params, _build_leaderboard,
+    _match_history_params, _build_match_history,
+    _rating_history_params, _rank_details_params, _current_or_last_match_params,
+    _check_pagination, _check_max_in_flight, _unique_profile_ids, _is_past_cutoff,
+    _leaderboard_page_starts, _merge_leaderboard_pages, _decode_body, _build_result
+)
+from aoe2netapi.cache import ConditionalCache, ResponseCache, _cache_key
+from aoe2netapi.instrumentation import Instrumentation, RequestMetrics
+from aoe2netapi.jsonbackend import JsonBackend, get_json_backend
+from aoe2netapi.ratelimit import Priority, RateLimiter, RetryPolicy
+from aoe2netapi.singleflight import AsyncSingleFlight
+from aoe2netapi.streaming import _JsonArrayStream
+from aoe2netapi.constants import Game, LeaderboardId, EventLeaderboardId
+from aoe2netapi.models import Strings, StringsIndex, Leaderboard, LeaderboardPlayer, LeaderboardTable, MatchHistory, \
+    RatingHistory, RatingHistoryItem, BatchResult
+from aoe2netapi.models.leaderboard import _decode_leaderboard_player
+
+
+async def _get_request_response(url: str, params: dict = None, is_nightbot: bool = False,
+                                session: "aiohttp.ClientSession" = None,
+                                loads: Optional[Callable[[bytes], Any]] = None,
+                                metrics: Optional[RequestMetrics] = None,
+                                body_sizes: Optional[List[int]] = None) -> \
+        Union[str, Dict[str, Any], List[Any]]:
+    """
+    Helper function to request data asynchronously.
+
+    See :func:`aoe2netapi.aoe2._get_request_response`.
+
+    :return:
+        the request response either as JSON (dict) or text
+    """
+
+    if metrics is not None:
+        result = await _get_measured_response(url, params, is_nightbot, session, loads, metrics)
+        if body_sizes is not None:
+            body_sizes.append(metrics.response_bytes)
+        return result
+    async with session.get(url, params=params) as response:
+        response.raise_for_status()
+        if body_sizes is not None:
+            body_sizes.append(len(await response.read()))  # the body is kept for decoding it below
+        if is_nightbot:
+            return await response.text()
+        if loads is not None:
+            return loads(await response.read())
+        return await response.json(content_type=None)  # the API does not always send 'application/json'
+
+
+async def _get_measured_response(url: str, params: Optional[dict], is_nightbot: bool,
+                                 session: "aiohttp.ClientSession", loads: Optional[Callable[[bytes], Any]],
+                                 metrics: RequestMetrics) -> Union[str, Dict[str, Any], List[Any]]:
+    """
+    Helper function like :func:`_get_request_response`, which additionally measures the phases of the request
+    (DNS lookup and connect via the trace hooks of the session, see `_create_trace_config`, time to first byte,
+    download and decoding), the size of the response body and its status code.
+    """
+
+    metrics.attempts += 1
+    metrics.dns, metrics.connect = 0.0, 0.0
+    started = time.perf_counter()
+    async with session.get(url, params=params, trace_request_ctx=metrics) as response:
+        received = time.perf_counter()
+        metrics.status = response.status
+        metrics.ttfb = received - started - metrics.dns - metrics.connect
+        response.raise_for_status()
+        body = await response.read()
+        downloaded = time.perf_counter()
+        metrics.download = downloaded - received
+        _measure_body(response, body, metrics)
+
+        if is_nightbot:
+            result = await response.text()
+        elif loads is not None:
+            result = loads(body)
+        else:
+            result = await response.json(content_type=None)
+        metrics.decode = time.perf_counter() - downloaded
+        return result
+
+
+def _measure_body(response: "aiohttp.ClientResponse", body: bytes, metrics: RequestMetrics) -> None:
+    """ See :func:`aoe2netapi.aoe2._measure_body`. """
+
+    metrics.compressed_bytes = getattr(response.content, "total_raw_bytes", len(body))  # aiohttp 3.12+
+    metrics.response_bytes = len(body)
+    metrics.content_encoding = response.headers.get("Content-Encoding")
+
+
+def _measure_stream_size(response: "aiohttp.ClientResponse", metrics: RequestMetrics) -> None:
+    """ See :func:`aoe2netapi.aoe2._measure_stream_size`. """
+
+    metrics.compressed_bytes = getattr(response.content, "total_raw_bytes", metrics.response_bytes)  # aiohttp 3.12+
+    metrics.content_encoding = response.headers.get("Content-Encoding")
+
+
+async def _get_conditional_response(url: str, params: Optional[dict], request_headers: Optional[Dict[str, str]],
+                                    session: "aiohttp.ClientSession", metrics: Optional[RequestMetrics] = None) -> \
+        Tuple[int, Mapping[str, str], bytes]:
+    """
+    Helper function to send a conditional request asynchronously.
+
+    See :func:`aoe2netapi.aoe2._get_conditional_response`.
+
+    :return:
+        the status code, the headers and the body (empty for a 304) of the response
+    """
+
+    if metrics is not None:
+        metrics.attempts += 1
+        metrics.dns, metrics.connect = 0.0, 0.0
+    started = time.perf_counter()
+    async with session.get(url, params=params, headers=request_headers, trace_request_ctx=metrics) as response:
+        received = time.perf_counter()
+        if metrics is not None:
+            metrics.status = response.status
+            metrics.ttfb = received - started - metrics.dns - metrics.connect
+        response.raise_for_status()
+        body = await response.read()
+        if metrics is not None:
+            metrics.download = time.perf_counter() - received
+            _measure_body(response, body, metrics)
+        return response.status, response.headers, body
+
+
+def _create_trace_config() -> "aiohttp.TraceConfig":
+    """
+    Helper function to create the trace hooks of the sessions of instrumented clients, which add the time spent on
+    DNS lookups and on opening new connections to the metrics of the measured request (its `trace_request_ctx`).
+    """
+
+    async def on_dns_resolvehost_start(session, context, params):
+        context.dns_started = time.perf_counter()
+
+    async def on_dns_resolvehost_end(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx.dns += time.perf_counter() - context.dns_started
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_started = time.perf_counter()
+        context.dns_before = context.trace_request_ctx.dns if context.trace_request_ctx is not None else 0.0
+
+    async def on_connection_create_end(session, context, params):
+        metrics = context.trace_request_ctx
+        if metrics is not None:  # the DNS lookup is part of creating the connection, but measured on its own
+            metrics.connect += time.perf_counter() - context.connect_started - (metrics.dns - context.dns_before)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+async def _get_response_stream(url: str, params: dict = None, session: "aiohttp.ClientSession" = None,
+                               metrics: Optional[RequestMetrics] = None) -> "aiohttp.ClientResponse":
+    """
+    Helper function to request data asynchronously, without reading the response body yet.
+
+    See :func:`aoe2netapi.aoe2._get_response_stream`. If 'metrics' are given, the DNS lookup and connect are added
+    to them (see `_create_trace_config`).
+
+    :return:
+        the (streamed) request response, which has to be released by the caller
+    """
+
+    response = await session.get(url, params=params, trace_request_ctx=metrics)
+    try:
+        response.raise_for_status()
+    except aiohttp.ClientResponseError:
+        response.release()
+        raise
+    return response
+
+
+def _session_headers() -> Dict[str, str]:
+    """ Helper function which returns the request headers, accepting the content encodings aiohttp can decompress. """
+
+    try:
+        from aiohttp import compression_utils
+    except ImportError:  # older versions of aiohttp, which decompress gzip and deflate only
+        compression_utils = None
+    return dict(headers, **{"Accept-Encoding": _accept_encoding(brotli=getattr(compression_utils, "HAS_BROTLI", False),
+                                                                zstd=getattr(compression_utils, "HAS_ZSTD", False))})
+
+
+""" --------------------------------------- CLIENT BASE (class _AsyncClient) ---------------------------------------"""
+
+
+class _AsyncClient:
+    """
+    The base class of the 'AsyncAPI' and 'AsyncNightbot' classes.
+
+    Owns a pooled :class:`aiohttp.ClientSession`, which is created on the first request
+    (inside the running event loop) and shared across all calls of an instance.
+    At most `max_concurrency` requests of an instance are in flight at the same time, all others wait for a free slot.
+
+    Optionally, the request responses are cached, concurrent identical requests share one in-flight request,
+    the sent requests are rate limited and failed requests are retried, see :class:`aoe2netapi.aoe2._Client`.
+
+    Can be used as an async context manager, which closes the session on exit. Otherwise, await `close()` explicitly.
+
+    Parameters
+    ----------
+    max_concurrency : `int`
+        The maximum number of requests in flight at the same time. Defaults to 100.
+    pool_maxsize : `int`
+        The maximum number of connections kept open in total. Defaults to 100.
+    pool_maxsize_per_host : `int`
+        The maximum number of connections kept open per host. Defaults to 0 (no limit).
+    keep_alive : `bool`
+        Specifies if connections should be kept alive and reused between requests. Defaults to True.
+    timeout : `float`
+        The total timeout in seconds for every request. Defaults to None (no timeout).
+    cache : :class:`aoe2netapi.cache.ResponseCache`
+        The cache for the request responses, e.g. :class:`aoe2netapi.cache.MemoryCache`. Defaults to None (no cache).
+    cache_ttls : `dict`
+        The time-to-live (in seconds) of cached responses per endpoint URL. Endpoints without (or with a 0) TTL
+        are not cached. Defaults to `DEFAULT_CACHE_TTLS`.
+    coalesce_requests : `bool`
+        Specifies if concurrent identical requests should share one in-flight request. Defaults to True.
+    rate_limiter : :class:`aoe2netapi.ratelimit.RateLimiter`
+        The rate limiter for the sent requests, which can be shared between several instances (also blocking ones).
+        Defaults to None (no rate limit).
+    priority : :class:`aoe2netapi.ratelimit.Priority`
+        The priority lane of this instance in the rate limiter.
+        Defaults to `Priority.INTERACTIVE` for 'AsyncNightbot' and to `Priority.NORMAL` otherwise.
+    retry_policy : :class:`aoe2netapi.ratelimit.RetryPolicy`
+        The retry policy for failed requests, e.g. `RetryPolicy()`. Defaults to None (no retries).
+    json_backend : `str`
+        The JSON decoder of the responses, see :class:`aoe2netapi.aoe2._Client`. Defaults to None (the fastest one).
+    instrumentation : :class:`aoe2netapi.instrumentation.Instrumentation`
+        Passes the metrics of every call to its hooks, see :class:`aoe2netapi.aoe2._Client`.
+        Defaults to None (not instrumented).
+    conditional_cache : :class:`aoe2netapi.cache.ConditionalCache`
+        Keeps the validators and the models of the last responses, see :class:`aoe2netapi.aoe2._Client`.
+        Defaults to None (not used).
+
+    :raises Aoe2NetException:
+        'aiohttp' is not installed
+    :raises ValueError:
+        the given JSON backend is not known or not installed
+    """
+
+    _default_priority = Priority.NORMAL
+
+    def __init__(self,
+                 max_concurrency: int = 100,
+                 pool_maxsize: int = 100,
+                 pool_maxsize_per_host: int = 0,
+                 keep_alive: bool = True,
+                 timeout: Optional[float] = None,
+                 cache: Optional[ResponseCache] = None,
+                 cache_ttls: Optional[Dict[str, float]] = None,
+                 coalesce_requests: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 priority: Optional[Priority] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 json_backend: Optional[str] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 conditional_cache: Optional[ConditionalCache] = None):
+        if aiohttp is None:
+            raise Aoe2NetException("The asyncio client requires 'aiohttp': pip install aoe2netapi-wrapper[async]")
+
+        if max_concurrency < 1:
+            raise Aoe2NetException("'max_concurrency' has to be 1 or more.")
+
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_ttls = DEFAULT_CACHE_TTLS if cache_ttls is None else cache_ttls
+        self.single_flight = AsyncSingleFlight() if coalesce_requests else None
+        self.rate_limiter = rate_limiter
+        self.priority = self._default_priority if priority is None else priority
+        self.retry_policy = retry_policy
+        self.json_backend: JsonBackend = get_json_backend(json_backend)
+        self.instrumentation = instrumentation
+        self.conditional_cache = conditional_cache
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self) -> None:
+        """ Closes the underlying session and all of its pooled connections. """
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """ Returns the session of this instance, creating it on first use. """
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, limit_per_host=self.pool_maxsize_per_host,
+                                             force_close=not self.keep_alive)
+            trace_configs = [_create_trace_config()] if self.instrumentation is not None else None
+            self._session = aiohttp.ClientSession(connector=connector, headers=_session_headers(),
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                                  trace_configs=trace_configs)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(self, url: str, params: dict = None, is_nightbot: bool = False,
+                       build: Optional[Callable[[Any], Any]] = None, variant: str = "") -> Any:
+        """ See :meth:`aoe2netapi.aoe2._Client._request`. """
+
+        if self.instrumentation is not None:
+            return await self._measure(url, params, is_nightbot, build, variant)
+        if self.conditional_cache is not None:
+            return await self._fetch_conditional(url, params, is_nightbot, build, variant)
+        result = await self._fetch(url, params, is_nightbot)
+        return result if build is None else build(result)
+
+    async def _measure(self, url: str, params: Optional[dict], is_nightbot: bool,
+                       build: Optional[Callable[[Any], Any]], variant: str = "") -> Any:
+        """ See :meth:`aoe2netapi.aoe2._Client._measure`. """
+
+        metrics = RequestMetrics(url, params)
+        started = time.perf_counter()
+        try:
+            if self.conditional_cache is not None:
+                return await self._fetch_conditional(url, params, is_nightbot, build, variant, metrics)
+            result = await self._fetch(url, params, is_nightbot, metrics)
+            if build is not None:
+                build_started = time.perf_counter()
+                result = build(result)
+                metrics.build = time.perf_counter() - build_started
+            return result
+        except Exception as error:
+            metrics.error = error
+            raise
+        finally:
+            metrics.total = time.perf_counter() - started
+            metrics.coalesced = not metrics.cached and metrics.attempts == 0
+            self.instrumentation.emit(metrics)
+
+    async def _fetch(self, url: str, params: dict = None, is_nightbot: bool = False,
+                     metrics: Optional[RequestMetrics] = None) -> Union[str, Dict[str, Any], List[Any]]:
+        """ See :meth:`aoe2netapi.aoe2._Client._fetch`. """
+
+        ttl = self.cache_ttls.get(url, 0) if self.cache is not None else 0
+        if ttl <= 0:
+            return await self._send(url, params, is_nightbot, metrics)
+
+        key = _cache_key(url, params)
+        result = self.cache.get(key)
+        if result is None:
+            result = await self._send(url, params, is_nightbot, metrics, ttl=ttl)
+        elif metrics is not None:
+            metrics.cached = True
+        return result
+
+    async def _fetch_conditional(self, url: str, params: Optional[dict], is_nightbot: bool,
+                                 build: Optional[Callable[[Any], Any]], variant: str = "",
+                                 metrics: Optional[RequestMetrics] = None) -> Any:
+        """ See :meth:`aoe2netapi.aoe2._Client._fetch_conditional`. """
+
+        key = _cache_key(url, params)
+        model_key = key + "#" + variant if variant else key
+        ttl = self.cache_ttls.get(url, 0) if self.cache is not None else 0
+        if ttl > 0:
+            result = self.cache.get(key)
+            if result is not None:
+                if metrics is not None:
+                    metrics.cached = True
+                return _build_result(result, build, metrics)
+
+        def build_model(body: bytes) -> Any:
+            result = _decode_body(body, is_nightbot, self.json_backend.loads, metrics)
+            if ttl > 0:
+                self.cache.set(key, result, ttl, size=len(body))
+            return _build_result(result, build, metrics)
+
+        session = self._get_session()
+
+        async def send():
+            entry = self.conditional_cache.get(model_key)
+
+            async def request():
+                async with self._semaphore:
+                    return await _get_conditional_response(
+                        url=url, params=params, request_headers=entry.request_headers if entry is not None else None,
+                        session=session, metrics=metrics)
+
+            status, response_headers, body = await self._with_retries(request)
+            return self.conditional_cache.resolve(model_key, entry, status, response_headers, body, build_model)
+
+        if self.single_flight is None:
+            return await send()
+        return await self.single_flight.do(model_key, send)
+
+    async def _send(self, url: str, params: dict = None, is_nightbot: bool = False,
+                    metrics: Optional[RequestMetrics] = None,
+                    ttl: float = 0) -> Union[str, Dict[str, Any], List[Any]]:
+        """
+        Sends a request over the pooled session of this instance, bounded by `max_concurrency`,
+        or waits for an identical request already in flight (if coalescing is used).
+
+        Every attempt waits for the rate limiter (if used), failed attempts are retried per the retry policy (if used).
+        If 'ttl' is given, the response is stored in the response cache for 'ttl' seconds (once, by the sending call).
+
+        See :func:`_get_request_response`.
+        """
+
+        session = self._get_session()
+        body_sizes = []
+
+        async def request():
+            async with self._semaphore:
+                return await _get_request_response(url=url, params=params, is_nightbot=is_nightbot, session=session,
+                                                   loads=self.json_backend.loads, metrics=metrics,
+                                                   body_sizes=body_sizes)
+
+        async def send():
+            result = await self._with_retries(request)
+            if ttl > 0:
+                self.cache.set(_cache_key(url, params), result, ttl, size=body_sizes[-1] if body_sizes else None)
+            return result
+
+        if self.single_flight is None:
+            return await send()
+        return await self.single_flight.do(_cache_key(url, params), send)
+
+    async def _with_retries(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Awaits 'request()' (which sends a request), after waiting for the rate limiter (if used).
+        Failed attempts are retried per the retry policy (if used).
+        """
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(self.priority)
+            try:
+                return await request()
+            except aiohttp.ClientResponseError as error:
+                retry_after = error.headers.get("Retry-After") if error.headers is not None else None
+                delay = _retry_delay(self.retry_policy, self.rate_limiter, attempt, error.status, retry_after)
+                if delay is None:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = _retry_delay(self.retry_policy, self.rate_limiter, attempt, None, None)
+                if delay is None:
+                    raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _stream(self, url: str, params: dict, key: str) -> AsyncIterator[Any]:
+        """ See :meth:`aoe2netapi.aoe2._Client._stream`. The request holds a slot of `max_concurrency` throughout. """
+
+        if self.instrumentation is not None:
+            items = self._measure_stream(url, params, key)
+            try:
+                async for item in items:
+                    yield item
+            finally:  # see `stream_leaderboard`
+                await items.aclose()
+            return
+
+        session = self._get_session()
+        async with self._semaphore:
+            response = await self._with_retries(lambda: _get_response_stream(url=url, params=params,
+                                                                             session=session))
+            try:
+                parser = _JsonArrayStream(key)
+                async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+                    for item in parser.feed(chunk):
+                        yield item
+                    if parser.done:
+                        return
+                parser.close()
+            finally:
+                response.release()
+
+    async def _measure_stream(self, url: str, params: dict, key: str) -> AsyncIterator[Any]:
+        """ See :meth:`aoe2netapi.aoe2._Client._measure_stream`. """
+
+        metrics = RequestMetrics(url, params)
+        started = time.perf_counter()
+        received, paused = None, 0.0  # 'paused': the time spent by the caller between the items
+        session = self._get_session()
+
+        async def request() -> "aiohttp.ClientResponse":
+            metrics.attempts += 1
+            metrics.dns, metrics.connect = 0.0, 0.0
+            sent = time.perf_counter()
+            try:
+                response = await _get_response_stream(url=url, params=params, session=session, metrics=metrics)
+            except aiohttp.ClientResponseError as error:
+                metrics.status = error.status
+                raise
+            metrics.status = response.status
+            metrics.ttfb = time.perf_counter() - sent - metrics.dns - metrics.connect
+            return response
+
+        try:
+            async with self._semaphore:
+                response = await self._with_retries(request)
+                received = time.perf_counter()
+                try:
+                    parser = _JsonArrayStream(key)
+                    async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+                        metrics.response_bytes += len(chunk)
+                        parse_started = time.perf_counter()
+                        items = parser.feed(chunk)
+                        metrics.decode += time.perf_counter() - parse_started
+                        for item in items:
+                            yielded = time.perf_counter()
+                            yield item
+                            paused += time.perf_counter() - yielded
+                        if parser.done:
+                            return
+                    parser.close()
+                finally:
+                    _measure_stream_size(response, metrics)
+                    response.release()
+        except Exception as error:
+            metrics.error = error
+            raise
+        finally:
+            finished = time.perf_counter()
+            if received is not None:
+                metrics.download = finished - received - paused - metrics.decode
+            metrics.total = finished - started - paused
+            self.instrumentation.emit(metrics)
+
+
+""" ---------------------------------------- API REQUESTS (class AsyncAPI) -----------------------------------------"""
+
+
+class AsyncAPI(_AsyncClient):
+    """
+    The asyncio counterpart of the 'API' class.
+
+    See :class:`aoe2netapi.API` for the documentation of the functions
+    and :class:`_AsyncClient` for the available client options.
+    """
+
+    async def get_strings(self, game: Game) -> Strings:
+        """ See :meth:`aoe2netapi.API.get_strings`. """
+
+        return await self._request(url=STRINGS_URL, params=_strings_params(game),
+                                   build=lambda result: _build_strings(result, game))
+
+    async def get_strings_index(self, game: Game) -> StringsIndex:
+        """ See :meth:`aoe2netapi.API.get_strings_index`. """
+
+        index = _STRINGS_INDEXES.get(game.value)
+        return (await self.get_strings(game)).index if index is None else index
+
+    async def get_leaderboard(self,
+                              leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                              start: int = 1,
+                              count: int = 10,
+                              columnar: bool = False,
+                              **kwargs) -> Union[Leaderboard, LeaderboardTable]:
+        """ See :meth:`aoe2netapi.API.get_leaderboard`. """
+
+        params, is_event_leaderboard = _leaderboard_params(leaderboard_id, start, count, kwargs)
+        return await self._request(url=LEADERBOARD_URL, params=params,
+                                   build=lambda result: _build_leaderboard(result, leaderboard_id, is_event_leaderboard,
+                                                                           columnar),
+                                   variant="columnar" if columnar else "")
+
+    async def stream_leaderboard(self,
+                                 leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                 start: int = 1,
+                                 count: int = 10000,
+                                 **kwargs) -> AsyncIterator[LeaderboardPlayer]:
+        """ See :meth:`aoe2netapi.API.stream_leaderboard`. """
+
+        params, _ = _leaderboard_params(leaderboard_id, start, count, kwargs)
+        players = self._stream(url=LEADERBOARD_URL, params=params, key="leaderboard")
+        try:
+            async for player in players:
+                yield _decode_leaderboard_player(player)
+        finally:  # releases the response (and its slot of `max_concurrency`) right away when stopped early
+            await players.aclose()
+
+    async def _iter_leaderboard_pages(self,
+                                      leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                      page_size: int,
+                                      max_in_flight: int,
+                                      columnar: bool = False) -> AsyncIterator[Union[Leaderboard, LeaderboardTable]]:
+        """ See :meth:`aoe2netapi.API._iter_leaderboard_pages`. """
+
+        _check_pagination(page_size, max_in_flight)
+
+        first_page = await self.get_leaderboard(leaderboard_id, start=1, count=page_size, columnar=columnar)
+        yield first_page
+
+        pending = deque()
+        try:
+            for start in _leaderboard_page_starts(first_page, page_size):
+                if len(pending) >= max_in_flight:
+                    yield await pending.popleft()
+                page = self.get_leaderboard(leaderboard_id, start, page_size, columnar)
+                pending.append(asyncio.ensure_future(page))
+            while pending:
+                yield await pending.popleft()
+        finally:  # stopped early (or failed), do not request the pages nobody is waiting for anymore
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)  # also retrieves the errors of failed pages
+
+    async def iter_leaderboard(self,
+                               leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                               page_size: int = 10000,
+                               max_in_flight: int = 4) -> AsyncIterator[LeaderboardPlayer]:
+        """ See :meth:`aoe2netapi.API.iter_leaderboard`. """
+
+        pages = self._iter_leaderboard_pages(leaderboard_id, page_size, max_in_flight)
+        try:
+            async for page in pages:
+                for player in page.players:
+                    yield player
+        finally:  # see `iter_match_history`
+            await pages.aclose()
+
+    async def get_full_leaderboard(self,
+                                   leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                   page_size: int = 10000,
+                                   max_in_flight: int = 4,
+                                   columnar: bool = False) -> Union[Leaderboard, LeaderboardTable]:
+        """ See :meth:`aoe2netapi.API.get_full_leaderboard`. """
+
+        return _merge_leaderboard_pages([page async for page in self._iter_leaderboard_pages(leaderboard_id, page_size,
+                                                                                              max_in_flight, columnar)])
+
+    async def get_match_history(self, game: Game,
+                                start: int = 0,
+                                count: int = 5,
+                                steam_id: str = "",
+                                profile_id: str = "") -> List[MatchHistory]:
+        """ See :meth:`aoe2netapi.API.get_match_history`. """
+
+        params = _match_history_params(game, start, count, steam_id, profile_id)
+        return await self._request(url=MATCH_HISTORY_URL, params=params, build=_build_match_history)
+
+    async def get_rating_history(self,
+                                 leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                 start: int = 0,
+                                 count: int = 100,
+                                 steam_id: str = "",
+                                 profile_id: str = "") -> RatingHistory:
+        """ See :meth:`aoe2netapi.API.get_rating_history`. """
+
+        params, is_event_leaderboard = _rating_history_params(leaderboard_id, start, count, steam_id, profile_id)
+        return await self._request(url=RATING_HISTORY_URL, params=params,
+                                   build=lambda result: RatingHistory(leaderboard_id=leaderboard_id,
+                                                                      is_event_leaderboard=is_event_leaderboard,
+                                                                      ratings=result))
+
+    @staticmethod
+    async def _iter_prefetched_pages(request_page: Callable[[int, int], Awaitable[List]],
+                                     page_size: int) -> AsyncIterator[List]:
+        """ See :meth:`aoe2netapi.API._iter_prefetched_pages`. """
+
+        start = 0
+        task = asyncio.ensure_future(request_page(start, page_size))
+        try:
+            while task is not None:
+                page = await task
+                task = None
+                if len(page) == page_size:
+                    start += page_size
+                    task = asyncio.ensure_future(request_page(start, page_size))
+                yield page
+        finally:  # stopped early (or failed), do not request the page nobody is waiting for anymore
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def iter_match_history(self, game: Game,
+                                 steam_id: str = "",
+                                 profile_id: str = "",
+                                 page_size: int = 1000,
+                                 until_match_id: str = "",
+                                 since: Optional[int] = None) -> AsyncIterator[MatchHistory]:
+        """ See :meth:`aoe2netapi.API.iter_match_history`. """
+
+        _check_pagination(page_size, max_page_size=1000)
+        _match_history_params(game, 0, page_size, steam_id, profile_id)  # validate before the first request
+
+        async def request_page(start: int, count: int) -> List[MatchHistory]:
+            return await self.get_match_history(game, start=start, count=count,
+                                                steam_id=steam_id, profile_id=profile_id)
+
+        pages = self._iter_prefetched_pages(request_page, page_size)
+        try:
+            async for page in pages:
+                for match in page:
+                    if _is_past_cutoff(match.match_id, match.started, until_match_id, since):
+                        return
+                    yield match
+        finally:  # cancels the prefetched page right away, not only once the iterator is garbage collected
+            await pages.aclose()
+
+    async def iter_rating_history(self,
+                                  leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                  steam_id: str = "",
+                                  profile_id: str = "",
+                                  page_size: int = 1000,
+                                  since: Optional[int] = None) -> AsyncIterator[RatingHistoryItem]:
+        """ See :meth:`aoe2netapi.API.iter_rating_history`. """
+
+        _check_pagination(page_size)
+        _rating_history_params(leaderboard_id, 0, page_size, steam_id, profile_id)  # validate before the first request
+
+        async def request_page(start: int, count: int) -> List[RatingHistoryItem]:
+            rating_history = await self.get_rating_history(leaderboard_id, start=start, count=count,
+                                                           steam_id=steam_id, profile_id=profile_id)
+            return rating_history.ratings
+
+        pages = self._iter_prefetched_pages(request_page, page_size)
+        try:
+            async for page in pages:
+                for rating in page:
+                    if _is_past_cutoff(None, rating.timestamp, since=since):
+                        return
+                    yield rating
+        finally:  # see `iter_match_history`
+            await pages.aclose()
+
+    @staticmethod
+    async def _batch(request: Callable[[str], Awaitable[Any]], profile_ids: List[str],
+                     max_in_flight: int) -> BatchResult:
+        """ See :meth:`aoe2netapi.API._batch`. """
+
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def bounded_request(profile_id: str) -> Any:
+            async with semaphore:
+                return await request(profile_id)
+
+        batch = BatchResult()
+        results = await asyncio.gather(*(bounded_request(profile_id) for profile_id in profile_ids),
+                                       return_exceptions=True)
+        for profile_id, result in zip(profile_ids, results):
+            if isinstance(result, Exception):
+                batch.errors[profile_id] = result
+            elif isinstance(result, BaseException):  # e.g. cancelled
+                raise result
+            else:
+                batch.results[profile_id] = result
+        return batch
+
+    async def get_match_histories(self, game: Game,
+                                  profile_ids: Iterable[str],
+                                  start: int = 0,
+                                  count: int = 5,
+                                  max_in_flight: int = 8) -> BatchResult[List[MatchHistory]]:
+        """ See :meth:`aoe2netapi.API.get_match_histories`. """
+
+        profile_ids = _unique_profile_ids(profile_ids)
+        _check_max_in_flight(max_in_flight)
+        if profile_ids:  # validate once, before the first request
+            _match_history_params(game, start, count, "", profile_ids[0])
+
+        async def request(profile_id: str) -> List[MatchHistory]:
+            return await self.get_match_history(game, start=start, count=count, profile_id=profile_id)
+
+        return await self._batch(request, profile_ids, max_in_flight)
+
+    async def get_rating_histories(self,
+                                   leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                   profile_ids: Iterable[str],
+                                   start: int = 0,
+                                   count: int = 100,
+                                   max_in_flight: int = 8) -> BatchResult[RatingHistory]:
+        """ See :meth:`aoe2netapi.API.get_rating_histories`. """
+
+        profile_ids = _unique_profile_ids(profile_ids)
+        _check_max_in_flight(max_in_flight)
+        if profile_ids:  # validate once, before the first request
+            _rating_history_params(leaderboard_id, start, count, "", profile_ids[0])
+
+        async def request(profile_id: str) -> RatingHistory:
+            return await self.get_rating_history(leaderboard_id, start=start, count=count, profile_id=profile_id)
+
+        return await self._batch(request, profile_ids, max_in_flight)
+
+
+""" --------------------------------- NIGHTBOT API REQUESTS (class AsyncNightbot) ----------------------------------"""
+
+
+class AsyncNightbot(_AsyncClient):
+    """
+    The asyncio counterpart of the 'Nightbot' class.
+
+    See :class:`aoe2netapi.Nightbot` for the documentation of the functions
+    and :class:`_AsyncClient` for the available client options.
+    """
+
+    _default_priority = Priority.INTERACTIVE
+
+    async def get_rank_details(self, leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                               search: str = "", steam_id: str = "", profile_id: str = "", flag: bool = True) -> str:
+        """ See :meth:`aoe2netapi.Nightbot.get_rank_details`. """
+
+        params = _rank_details_params(leaderboard_id, search, steam_id, profile_id, flag)
+        return await self._request(url=RANK_DETAILS_URL, params=params, is_nightbot=True)
+
+    async def get_current_or_last_match(self, search: str = "", steam_id: str = "", profile_id: str = "",
+                                        game: Optional[Game] = None, **kwargs) -> str:
+        """ See :meth:`aoe2netapi.Nightbot.get_current_or_last_match`. """
+
+        params = _current_or_last_match_params(search, steam_id, profile_id, game, kwargs)
+        return await self._request(url=CURRENT_MATCH_URL, params=params, is_nightbot=True)
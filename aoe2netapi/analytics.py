@@ -0,0 +1,188 @@
+"""
+Vectorized (NumPy based) analytics of rating histories.
+
+Requires the optional dependency `numpy` (`pip install aoe2netapi-wrapper[numpy]`).
+
+All helpers work on a single history (1-dimensional arrays) as well as on a batch of histories
+(2-dimensional arrays, one row per history, see `stack` and `resample`), always along the last axis.
+Missing values of a batch (e.g. the padding of shorter histories) are NaN and ignored by all helpers.
+"""
+from dataclasses import dataclass
+from typing import Any, List, Sequence, Union
+
+try:
+    import numpy
+except ImportError:  # optional dependency
+    numpy = None
+
+from aoe2netapi.aoe2 import Aoe2NetException
+
+RATING_COLUMNS = ("timestamp", "rating", "num_wins", "num_losses", "streak", "drops")
+
+
+def _check_numpy() -> None:
+    if numpy is None:
+        raise Aoe2NetException("The analytics require 'numpy': pip install aoe2netapi-wrapper[numpy]")
+
+
+@dataclass
+class RatingArrays:
+    """
+    The columns of a :class:`RatingHistory` as typed NumPy arrays, in chronological order (oldest entry first).
+
+    The timestamps are `int64` (unix timestamps), all other columns `int32`.
+    """
+
+    timestamp: Any
+    rating: Any
+    num_wins: Any
+    num_losses: Any
+    streak: Any
+    drops: Any
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+def _to_rating_arrays(ratings: List) -> RatingArrays:
+    """ Helper function which builds the :class:`RatingArrays` of a list of `RatingHistoryItem` (most recent first). """
+
+    _check_numpy()
+    count = len(ratings)
+    columns = {
+        name: numpy.fromiter((int(getattr(item, name)) for item in reversed(ratings)),
+                             dtype=numpy.int64 if name == "timestamp" else numpy.int32, count=count)
+        for name in RATING_COLUMNS
+    }
+    # the API returns the most recent entry first, but entries with equal timestamps have to keep their order
+    order = numpy.argsort(columns["timestamp"], kind="stable")
+    if numpy.any(order != numpy.arange(count)):
+        columns = {name: column[order] for name, column in columns.items()}
+    return RatingArrays(**columns)
+
+
+def stack(arrays: Sequence[RatingArrays], column: str = "rating") -> Any:
+    """
+    Stacks one column of several histories into a 2-dimensional `float64` array (one row per history).
+
+    Shorter histories are padded with NaN at the end.
+
+    :raises AttributeError: the given column does not exist
+    """
+
+    _check_numpy()
+    stacked = numpy.full((len(arrays), max((len(a) for a in arrays), default=0)), numpy.nan)
+    for row, history in enumerate(arrays):
+        stacked[row, :len(history)] = getattr(history, column)
+    return stacked
+
+
+def resample(arrays: Union[RatingArrays, Sequence[RatingArrays]], grid: Any, column: str = "rating") -> Any:
+    """
+    Resamples one column of one or several histories onto a common time grid.
+
+    Each grid point gets the last value known at that time (NaN before the first entry of a history).
+
+    Parameters
+    ----------
+    arrays : :class:`RatingArrays` or a sequence of :class:`RatingArrays`
+        The history or histories to resample.
+    grid : array-like
+        The (ascending) unix timestamps to resample onto, e.g. `numpy.arange(start, end, 24 * 60 * 60)`.
+    column : `str`
+        The column to resample. Defaults to "rating".
+
+    :return:
+        a `float64` array, 1-dimensional for a single history, otherwise 2-dimensional (one row per history)
+    """
+
+    _check_numpy()
+    grid = numpy.asarray(grid, dtype=numpy.int64)
+    if isinstance(arrays, RatingArrays):
+        indexes = numpy.searchsorted(arrays.timestamp, grid, side="right") - 1
+        values = getattr(arrays, column).astype(numpy.float64)
+        return numpy.where(indexes >= 0, values[numpy.maximum(indexes, 0)] if len(values) else numpy.nan, numpy.nan)
+    resampled = numpy.empty((len(arrays), len(grid)))
+    for row, history in enumerate(arrays):
+        resampled[row] = resample(history, grid, column)
+    return resampled
+
+
+def peak(values: Any) -> Any:
+    """ Returns the highest value (e.g. the peak rating) of one history, or of each history of a batch. """
+
+    _check_numpy()
+    return numpy.nanmax(numpy.asarray(values, dtype=numpy.float64), axis=-1)
+
+
+def rolling_mean(values: Any, window: int) -> Any:
+    """
+    Returns the rolling mean over the last 'window' entries, of one history or of each history of a batch.
+
+    The first 'window - 1' entries (which have no full window) are NaN. Missing values are ignored.
+
+    :raises Aoe2NetException: 'window' has to be 1 or more
+    """
+
+    _check_numpy()
+    if window < 1:
+        raise Aoe2NetException("'window' has to be 1 or more.")
+
+    values = numpy.asarray(values, dtype=numpy.float64)
+    present = ~numpy.isnan(values)
+    sums = _window_sums(numpy.where(present, values, 0.0), window)
+    counts = _window_sums(present.astype(numpy.float64), window)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where(counts > 0, sums / counts, numpy.nan)
+
+
+def _window_sums(values: Any, window: int) -> Any:
+    """ Helper function which sums the last 'window' entries along the last axis (NaN if there are fewer). """
+
+    sums = numpy.cumsum(values, axis=-1)
+    sums[..., window:] = sums[..., window:] - sums[..., :-window]
+    sums[..., :window - 1] = numpy.nan
+    return sums
+
+
+def max_drawdown(values: Any) -> Any:
+    """
+    Returns the largest drop from a previous peak (e.g. of the rating), of one history or of each history of a batch.
+    """
+
+    _check_numpy()
+    values = numpy.asarray(values, dtype=numpy.float64)
+    drawdowns = numpy.fmax.accumulate(values, axis=-1) - values
+    return numpy.max(numpy.where(numpy.isnan(drawdowns), 0.0, drawdowns), axis=-1, initial=0.0)  # numpy 1.15+
+
+
+def volatility(values: Any) -> Any:
+    """ Returns the standard deviation of the changes between entries, of one history or of each history of a batch. """
+
+    _check_numpy()
+    return numpy.nanstd(numpy.diff(numpy.asarray(values, dtype=numpy.float64), axis=-1), axis=-1)
+
+
+def win_rates(num_wins: Any, num_losses: Any, window: int) -> Any:
+    """
+    Returns the win rate within each window of 'window' entries, of one history or of each history of a batch.
+
+    The number of wins and losses of a history are cumulative totals, the win rate of an entry is therefore based on
+    the wins and losses since the entry 'window' entries before. Entries without a full window or without any games
+    within their window are NaN.
+
+    :raises Aoe2NetException: 'window' has to be 1 or more
+    """
+
+    _check_numpy()
+    if window < 1:
+        raise Aoe2NetException("'window' has to be 1 or more.")
+
+    num_wins = numpy.asarray(num_wins, dtype=numpy.float64)
+    num_losses = numpy.asarray(num_losses, dtype=numpy.float64)
+    wins = numpy.full(num_wins.shape, numpy.nan)
+    games = numpy.full(num_wins.shape, numpy.nan)
+    wins[..., window:] = num_wins[..., window:] - num_wins[..., :-window]
+    games[..., window:] = wins[..., window:] + num_losses[..., window:] - num_losses[..., :-window]
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where(games > 0, wins / games, numpy.nan)
@@ -5,12 +5,28 @@ Available on GitHub (+ documentation): https://github.com/sixP-NaraKa/aoe2net-ap
 
 See https://aoe2.net/#api & https://aoe2.net/#nightbot for the API documentation directly.
 """
-from typing import Union, Any, Dict, List, Tuple, Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Any, Dict, List, Tuple, Optional, Iterator, Callable, Iterable, Mapping
 
 import requests
-
+from requests.adapters import HTTPAdapter
+from urllib3 import response as _urllib3_response
+
+from aoe2netapi.cache import ConditionalCache, ResponseCache, _cache_key
+from aoe2netapi.instrumentation import Instrumentation, RequestMetrics, _TimedHTTPAdapter, _take_connect_time
+from aoe2netapi.jsonbackend import JsonBackend, get_json_backend
+from aoe2netapi.ratelimit import Priority, RateLimiter, RetryPolicy
+from aoe2netapi.singleflight import SingleFlight
+from aoe2netapi.transport import Transport
 from aoe2netapi.constants import Game, LeaderboardId, EventLeaderboardId
-from aoe2netapi.models import Strings, Leaderboard, MatchHistory, RatingHistory
+from aoe2netapi.models import Strings, Leaderboard, LeaderboardPlayer, MatchHistory, RatingHistory, RatingHistoryItem, \
+    BatchResult
+from aoe2netapi.models.leaderboard import LeaderboardTable, _decode_leaderboard, _decode_leaderboard_table, \
+    _decode_leaderboard_player
+from aoe2netapi.models.matchhistory import _decode_lazy_match_history
+from aoe2netapi.models.strings import StringsIndex, _decode_strings
 
 API_BASE_URL = "https://aoe2.net/api"
 NIGHTBOT_BASE_URL = API_BASE_URL + "/nightbot"  # "https://aoe2.net/api/nightbot"
@@ -25,8 +41,38 @@ RATING_HISTORY_URL = API_BASE_URL + "/player/ratinghistory"
 RANK_DETAILS_URL = NIGHTBOT_BASE_URL + "/rank?"
 CURRENT_MATCH_URL = NIGHTBOT_BASE_URL + "/match?"
 
+# the default time-to-live (in seconds) of cached responses per endpoint, if a response cache is used
+DEFAULT_CACHE_TTLS = {
+    STRINGS_URL: 24 * 60 * 60,
+    LEADERBOARD_URL: 5 * 60,
+    MATCH_HISTORY_URL: 60,
+    RATING_HISTORY_URL: 60,
+    RANK_DETAILS_URL: 30,
+    CURRENT_MATCH_URL: 10,
+}
+
+# the lookup indexes of the most recently requested strings per game, shared by all clients of the process
+_STRINGS_INDEXES: Dict[str, StringsIndex] = {}
+
+# the size in bytes of the chunks in which streamed responses are read
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _accept_encoding(brotli: bool, zstd: bool) -> str:
+    """
+    Helper function to build the `Accept-Encoding` request header: the content encodings the responses can be
+    decompressed from, the most compact ones first (brotli and zstd only if their decoders are installed).
+    """
+
+    return ", ".join(encoding for encoding, supported in (("zstd", zstd), ("br", brotli), ("gzip", True),
+                                                          ("deflate", True)) if supported)
+
+
 # request headers
-headers = {"content-type": "application/json;charset=UTF-8", "User-Agent": "aoe2netapi-wrapper 2.0.0"}
+headers = {"content-type": "application/json;charset=UTF-8", "User-Agent": "aoe2netapi-wrapper 2.0.0",
+           # the decoders urllib3 imported, if any (older versions of urllib3 decompress gzip and deflate only)
+           "Accept-Encoding": _accept_encoding(brotli=getattr(_urllib3_response, "brotli", None) is not None,
+                                               zstd=getattr(_urllib3_response, "HAS_ZSTD", False))}
 
 
 # simple base exception class, to raise errors with
@@ -64,7 +110,47 @@ def _is_valid_kwarg(provided: dict, available: dict) -> Dict:
     return available
 
 
-def _get_request_response(url: str, params: dict = None, is_nightbot: bool = False) -> \
+def _create_session(pool_connections: int, pool_maxsize: int, pool_block: bool,
+                    keep_alive: bool, timed: bool = False) -> requests.Session:
+    """
+    Helper function to create a pooled :class:`requests.Session`.
+
+    Parameters
+    ----------
+    pool_connections : `int`
+        The number of per-host connection pools to cache.
+    pool_maxsize : `int`
+        The maximum number of connections kept open per host.
+    pool_block : `bool`
+        Specifies if a request should wait for a free connection when the per-host pool is exhausted.
+    keep_alive : `bool`
+        Specifies if connections should be kept alive and reused between requests.
+    timed : `bool`
+        Specifies if the time it takes to open new connections should be measured (for instrumented clients).
+        Defaults to False.
+
+    :return:
+        the configured session
+    """
+
+    session = requests.Session()
+    adapter = (_TimedHTTPAdapter if timed else HTTPAdapter)(pool_connections=pool_connections,
+                                                            pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def _get_request_response(url: str, params: dict = None, is_nightbot: bool = False,
+                          session: Optional[requests.Session] = None,
+                          timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                          loads: Optional[Callable[[bytes], Any]] = None,
+                          transport: Optional[Transport] = None,
+                          metrics: Optional[RequestMetrics] = None,
+                          body_sizes: Optional[List[int]] = None) -> \
         Union[str, Dict[str, Any], List[Any]]:
     """
     Helper function to request data.
@@ -80,14 +166,217 @@ def _get_request_response(url: str, params: dict = None, is_nightbot: bool = Fal
         A dictionary of parameters that will be used for a GET request.
     is_nightbot : `bool`
         Specifies if the request response should be returned as text (for the `Nightbot` API calls). Defaults to False.
+    session : :class:`requests.Session`
+        The (pooled) session to send the request with. If not given, a one-off connection is used.
+    timeout : `float` | `tuple`
+        The timeout in seconds, either as a single value or as a (connect, read) tuple. Defaults to None (no timeout).
+    loads : `callable`
+        The function to decode the JSON response body with, see :mod:`aoe2netapi.jsonbackend`.
+        Defaults to None (`response.json()`).
+    transport : :class:`aoe2netapi.transport.Transport`
+        The transport to send the request with, e.g. to replay recorded responses. Defaults to None (HTTP).
+    metrics : :class:`aoe2netapi.instrumentation.RequestMetrics`
+        The metrics to measure the request in (for instrumented clients). Defaults to None (not measured).
+    body_sizes : `list`
+        A list to append the size of the response body in bytes to (e.g. for the response cache). Defaults to None.
 
     :return:
         the request response either as JSON (dict) or text
     """
 
-    response = requests.get(url, params=params, headers=headers)
+    if metrics is not None:
+        result = _get_measured_response(url, params, is_nightbot, session, timeout, loads, transport, metrics)
+        if body_sizes is not None:
+            body_sizes.append(metrics.response_bytes)
+        return result
+    if transport is not None:
+        response = transport.send(url, params=params, session=session, timeout=timeout)
+    elif session is not None:
+        response = session.get(url, params=params, timeout=timeout)
+    else:
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
     response.raise_for_status()
-    return response.text if is_nightbot else response.json()
+    if body_sizes is not None:
+        body_sizes.append(len(response.content))
+    if is_nightbot:
+        return response.text
+    return response.json() if loads is None else loads(response.content)
+
+
+def _get_measured_response(url: str, params: Optional[dict], is_nightbot: bool, session: Optional[requests.Session],
+                           timeout: Optional[Union[float, Tuple[float, float]]],
+                           loads: Optional[Callable[[bytes], Any]], transport: Optional[Transport],
+                           metrics: RequestMetrics) -> Union[str, Dict[str, Any], List[Any]]:
+    """
+    Helper function like :func:`_get_request_response`, which additionally measures the phases of the request
+    (connect, time to first byte, download and decoding), the size of the response body and its status code.
+    """
+
+    metrics.attempts += 1
+    _take_connect_time()
+    started = time.perf_counter()
+    try:
+        response = _get_response_stream(url=url, params=params, session=session, timeout=timeout, transport=transport)
+    except requests.HTTPError as error:
+        metrics.status = error.response.status_code
+        raise
+    received = time.perf_counter()
+    metrics.status = response.status_code
+    metrics.connect = _take_connect_time()
+    metrics.ttfb = received - started - metrics.connect
+
+    with response:
+        body = response.content
+    downloaded = time.perf_counter()
+    metrics.download = downloaded - received
+    _measure_body(response, body, metrics)
+
+    if is_nightbot:
+        result = response.text
+    else:
+        result = response.json() if loads is None else loads(body)
+    metrics.decode = time.perf_counter() - downloaded
+    return result
+
+
+def _measure_body(response: requests.Response, body: bytes, metrics: RequestMetrics) -> None:
+    """
+    Helper function which measures the size of a (read) response body, as received (compressed)
+    and after its (streaming) decompression.
+    """
+
+    raw = getattr(response, "raw", None)  # None for the responses of transports which are not received over HTTP
+    metrics.compressed_bytes = raw.tell() if raw is not None else len(body)
+    metrics.response_bytes = len(body)
+    metrics.content_encoding = response.headers.get("Content-Encoding")
+
+
+def _measure_stream_size(response: requests.Response, metrics: RequestMetrics) -> None:
+    """
+    Helper function like :func:`_measure_body` for a streamed response, whose (decompressed) received chunks are
+    already added up in `metrics.response_bytes`.
+    """
+
+    raw = getattr(response, "raw", None)
+    metrics.compressed_bytes = raw.tell() if raw is not None else metrics.response_bytes
+    metrics.content_encoding = response.headers.get("Content-Encoding")
+
+
+def _get_response_stream(url: str, params: dict = None, session: Optional[requests.Session] = None,
+                         timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                         transport: Optional[Transport] = None,
+                         request_headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """
+    Helper function to request data, without reading the response body yet (to parse it while it is received).
+
+    See :func:`_get_request_response` for the parameters. 'request_headers' are sent in addition to the default ones.
+
+    :return:
+        the (streamed) request response, which has to be closed by the caller
+    """
+
+    if transport is not None:
+        response = transport.send(url, params=params, session=session, timeout=timeout, stream=True,
+                                  headers=request_headers)
+    elif session is not None:
+        response = session.get(url, params=params, headers=request_headers, timeout=timeout, stream=True)
+    else:
+        response = requests.get(url, params=params, headers=dict(headers, **(request_headers or {})),
+                                timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+    except requests.HTTPError:
+        response.close()
+        raise
+    return response
+
+
+def _get_conditional_response(url: str, params: Optional[dict], request_headers: Optional[Dict[str, str]],
+                              session: Optional[requests.Session],
+                              timeout: Optional[Union[float, Tuple[float, float]]],
+                              transport: Optional[Transport],
+                              metrics: Optional[RequestMetrics] = None) -> Tuple[int, Mapping[str, str], bytes]:
+    """
+    Helper function to send a conditional request (with the 'If-None-Match' and 'If-Modified-Since' headers of
+    'request_headers', if any), see :class:`aoe2netapi.cache.ConditionalCache`.
+
+    The response body is not decoded. If 'metrics' are given, the request is measured like in
+    :func:`_get_measured_response`.
+
+    :return:
+        the status code, the headers and the body (empty for a 304) of the response
+    """
+
+    if metrics is not None:
+        metrics.attempts += 1
+        _take_connect_time()
+    started = time.perf_counter()
+    try:
+        response = _get_response_stream(url=url, params=params, session=session, timeout=timeout,
+                                        transport=transport, request_headers=request_headers)
+    except requests.HTTPError as error:
+        if metrics is not None:
+            metrics.status = error.response.status_code
+        raise
+    received = time.perf_counter()
+
+    with response:
+        body = response.content
+    if metrics is not None:
+        metrics.status = response.status_code
+        metrics.connect = _take_connect_time()
+        metrics.ttfb = received - started - metrics.connect
+        metrics.download = time.perf_counter() - received
+        _measure_body(response, body, metrics)
+    return response.status_code, response.headers, body
+
+
+def _decode_body(body: bytes, is_nightbot: bool, loads: Callable[[bytes], Any],
+                 metrics: Optional[RequestMetrics] = None) -> Union[str, Dict[str, Any], List[Any]]:
+    """ Helper function which decodes a response body (text for the `Nightbot` API calls, JSON otherwise). """
+
+    started = time.perf_counter()
+    result = body.decode("utf-8") if is_nightbot else loads(body)
+    if metrics is not None:
+        metrics.decode = time.perf_counter() - started
+    return result
+
+
+def _build_result(result: Any, build: Optional[Callable[[Any], Any]],
+                  metrics: Optional[RequestMetrics] = None) -> Any:
+    """ Helper function which maps a decoded response to the models by 'build' (if given). """
+
+    if build is None:
+        return result
+    started = time.perf_counter()
+    model = build(result)
+    if metrics is not None:
+        metrics.build = time.perf_counter() - started
+    return model
+
+
+def _retry_delay(retry_policy: Optional[RetryPolicy], rate_limiter: Optional[RateLimiter], attempt: int,
+                 status: Optional[int], retry_after: Optional[str]) -> Optional[float]:
+    """
+    Helper function which returns the time to wait before retrying a failed request.
+
+    A 429 (Too Many Requests) additionally pauses the rate limiter (if any) for all of its users.
+
+    :param retry_policy: the retry policy, if any
+    :param rate_limiter: the rate limiter, if any
+    :param attempt: the number of retries done so far
+    :param status: the response status code, or None for connection errors and timeouts
+    :param retry_after: the value of the `Retry-After` response header, if any
+
+    :returns: the time to wait in seconds, or None if the request should not be retried
+    """
+
+    if retry_policy is None:
+        return None
+    delay = retry_policy.delay(attempt, status, retry_after)
+    if delay is not None and status == 429 and rate_limiter is not None:
+        rate_limiter.pause(delay)
+    return delay
 
 
 def _check_is_leaderboard(leaderboard_id: Union[LeaderboardId, EventLeaderboardId]) -> Tuple[str, bool]:
@@ -111,13 +400,603 @@ def _check_is_leaderboard(leaderboard_id: Union[LeaderboardId, EventLeaderboardI
         raise Aoe2NetException("A valid 'leaderboard_id' is required.")
 
 
+""" ------------------------------------- REQUEST PARAMETERS & MODEL BUILDING --------------------------------------"""
+# shared by the blocking (API, Nightbot) and the asyncio (AsyncAPI, AsyncNightbot) clients,
+# see the corresponding public methods for the documentation of the parameters
+
+
+def _strings_params(game: Game) -> Dict:
+    """ Builds the request parameters for `get_strings`. """
+
+    return {"game": game.value}
+
+
+def _build_strings(result: Dict, game: Game) -> Strings:
+    """ Builds the :class:`Strings` from a `get_strings` request response and (re-)registers its lookup index. """
+
+    strings = _decode_strings(result)  # fast path of 'Strings.from_dict(result)'
+    _STRINGS_INDEXES[game.value] = strings.index
+    return strings
+
+
+def _leaderboard_params(leaderboard_id: Union[LeaderboardId, EventLeaderboardId], start: int, count: int,
+                        kwargs: dict) -> Tuple[Dict, bool]:
+    """
+    Validates and builds the request parameters for `get_leaderboard`.
+
+    :returns: the request parameters and if the given leaderboard is an event leaderboard
+
+    :raises Aoe2NetException:
+        'count' has to be 10000 or less or required parameters are missing
+    """
+
+    if not start or not count:
+        raise Aoe2NetException("'start' and 'count' required.")
+
+    if count > 10000:
+        raise Aoe2NetException("'count' has to be 10000 or less.")
+
+    leaderboard_id_param, is_event_leaderboard = _check_is_leaderboard(leaderboard_id=leaderboard_id)
+
+    optionals = {
+        "search": "",
+        "steam_id": "",
+        "profile_id": "",
+    }
+    optionals = _is_valid_kwarg(kwargs, optionals)
+
+    params = {"game": leaderboard_id.value.game, leaderboard_id_param: leaderboard_id.value.aoe2net_id,
+              "start": start, "count": count}
+    params.update(optionals)
+    return params, is_event_leaderboard
+
+
+def _build_leaderboard(result: Dict, leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                       is_event_leaderboard: bool, columnar: bool = False) -> Union[Leaderboard, LeaderboardTable]:
+    """ Builds the :class:`Leaderboard` (or :class:`LeaderboardTable`) from a `get_leaderboard` request response. """
+
+    if columnar:
+        leaderboard = _decode_leaderboard_table(result)
+    else:
+        leaderboard = _decode_leaderboard(result)  # fast path of 'Leaderboard.from_dict(result, infer_missing=True)'
+    leaderboard.game = leaderboard_id.value.game
+    leaderboard.is_event_leaderboard = is_event_leaderboard
+    return leaderboard
+
+
+def _match_history_params(game: Game, start: int, count: int, steam_id: str, profile_id: str) -> Dict:
+    """
+    Validates and builds the request parameters for `get_match_history`.
+
+    :raises Aoe2NetException:
+        'count' has to be 1000 or less || Either 'steam_id' or 'profile_id' required || 'game' is not valid
+    """
+
+    if game not in Game:
+        raise Aoe2NetException("A valid 'game' is required.")
+
+    if count > 1000:
+        raise Aoe2NetException("'count' has to be 1000 or less.")
+
+    if not steam_id and not profile_id:
+        raise Aoe2NetException("Either 'steam_id' or 'profile_id' required.")
+
+    return {"game": game.value, "start": start, "count": count, "steam_id": steam_id, "profile_id": profile_id}
+
+
+def _build_match_history(result: List[Dict]) -> List[MatchHistory]:
+    """
+    Builds the list of :class:`MatchHistory` from a `get_match_history` request response.
+    The properties of the matches are only built on first access, see :class:`aoe2netapi.models.LazyMatchHistory`.
+    """
+
+    # lazy fast path of 'MatchHistory.from_dict(match, infer_missing=True)'
+    return [_decode_lazy_match_history(match) for match in result]
+
+
+def _rating_history_params(leaderboard_id: Union[LeaderboardId, EventLeaderboardId], start: int, count: int,
+                           steam_id: str, profile_id: str) -> Tuple[Dict, bool]:
+    """
+    Validates and builds the request parameters for `get_rating_history`.
+
+    :returns: the request parameters and if the given leaderboard is an event leaderboard
+
+    :raises Aoe2NetException:
+        'count' has to be 10000 or less || Either 'steam_id' or 'profile_id' required
+    """
+
+    if count > 10000:
+        raise Aoe2NetException("'count' has to be 10000 or less.")
+
+    if not steam_id and not profile_id:
+        raise Aoe2NetException("Either 'steam_id' or 'profile_id' required.")
+
+    leaderboard_id_param, is_event_leaderboard = _check_is_leaderboard(leaderboard_id=leaderboard_id)
+
+    params = {"game": leaderboard_id.value.game, leaderboard_id_param: leaderboard_id.value.aoe2net_id,
+              "start": start, "count": count, "steam_id": steam_id, "profile_id": profile_id}
+    return params, is_event_leaderboard
+
+
+def _rank_details_params(leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                         search: str, steam_id: str, profile_id: str, flag: bool) -> Dict:
+    """
+    Validates and builds the request parameters for `get_rank_details`.
+
+    :raises Aoe2NetException:
+        Either 'search', 'steam_id' or 'profile_id' required
+    """
+
+    if not search and not steam_id and not profile_id:
+        raise Aoe2NetException("Either 'search', 'steam_id' or 'profile_id' required.")
+
+    leaderboard_id_param, _ = _check_is_leaderboard(leaderboard_id=leaderboard_id)
+
+    return {"flag": flag.__str__().lower(), "language": "en", "search": search, "steam_id": steam_id,
+            "profile_id": profile_id, leaderboard_id_param: leaderboard_id.value.aoe2net_id,
+            "game": leaderboard_id.value.game}
+
+
+def _current_or_last_match_params(search: str, steam_id: str, profile_id: str, game: Optional[Game],
+                                  kwargs: dict) -> Dict:
+    """
+    Validates and builds the request parameters for `get_current_or_last_match`.
+
+    :raises Aoe2NetException:
+        Either 'search', 'steam_id' or 'profile_id' required || 'search' used but without 'game' specified
+    """
+
+    if not search and not steam_id and not profile_id:
+        raise Aoe2NetException("Either 'search', 'steam_id' or 'profile_id' required.")
+
+    if search and not game:
+        raise Aoe2NetException("'game' is required if 'search' is used.")
+
+    optionals = {
+        "color": True,
+        "flag": True
+    }
+    optionals = _is_valid_kwarg(kwargs, optionals)
+
+    params = {"search": search, "steam_id": steam_id, "profile_id": profile_id, "civflag": "false",
+              "game": game.value if game else ""}
+    params.update(optionals)
+    color = params.get("color").__str__().lower()
+    flag = params.get("flag").__str__().lower()
+    params["color"] = color
+    params["flag"] = flag
+    return params
+
+
+def _check_pagination(page_size: int, max_in_flight: int = 1, max_page_size: int = 10000) -> None:
+    """
+    Validates the pagination arguments of the paginating functions (e.g. `iter_leaderboard`).
+
+    :raises Aoe2NetException:
+        'page_size' has to be between 1 and 'max_page_size' || 'max_in_flight' has to be 1 or more
+    """
+
+    if not page_size or not 0 < page_size <= max_page_size:
+        raise Aoe2NetException("'page_size' has to be between 1 and {}.".format(max_page_size))
+
+    _check_max_in_flight(max_in_flight)
+
+
+def _check_max_in_flight(max_in_flight: int) -> None:
+    """
+    Validates the maximum number of parallel requests of the paginating and batch functions.
+
+    :raises Aoe2NetException:
+        'max_in_flight' has to be 1 or more
+    """
+
+    if not max_in_flight or max_in_flight < 1:
+        raise Aoe2NetException("'max_in_flight' has to be 1 or more.")
+
+
+def _is_past_cutoff(match_id: Optional[str], started: Optional[Union[str, int]],
+                    until_match_id: str = "", since: Optional[int] = None) -> bool:
+    """
+    Helper function which checks if a history entry (newest first) reached the cutoff of a streaming function.
+
+    :param match_id: the match ID of the entry, if any
+    :param started: the (unix) timestamp of the entry, if any
+    :param until_match_id: the match ID at which to stop (exclusive)
+    :param since: the (unix) timestamp before which to stop
+
+    :returns: the check result
+    """
+
+    if until_match_id and match_id is not None and str(match_id) == str(until_match_id):
+        return True
+    return since is not None and started is not None and int(started) < since
+
+
+def _unique_profile_ids(profile_ids: Iterable[str]) -> List[str]:
+    """ Helper function which removes duplicate (and empty) profile IDs of a batch request, keeping their order. """
+
+    return list(dict.fromkeys(str(profile_id) for profile_id in profile_ids if profile_id))
+
+
+def _leaderboard_page_starts(first_page: Leaderboard, page_size: int) -> range:
+    """ Returns the 'start' values of all remaining pages of a leaderboard, based on its first page. """
+
+    return range(1 + page_size, first_page.total + 1, page_size)
+
+
+def _merge_leaderboard_pages(pages: List[Union[Leaderboard, LeaderboardTable]]) -> \
+        Union[Leaderboard, LeaderboardTable]:
+    """ Builds the full :class:`Leaderboard` (or :class:`LeaderboardTable`) out of all of its (rank ordered) pages. """
+
+    first_page = pages[0]
+    if isinstance(first_page, LeaderboardTable):
+        # a new table, as the pages may be shared (see `aoe2netapi.cache.ConditionalCache`)
+        table = LeaderboardTable(total=first_page.total, leaderboard_id=first_page.leaderboard_id, start=1, count=0,
+                                 game=first_page.game, is_event_leaderboard=first_page.is_event_leaderboard)
+        for page in pages:
+            table.extend(page)
+        table.count = len(table)
+        return table
+
+    players = [player for page in pages for player in page.players]
+    return Leaderboard(total=first_page.total, leaderboard_id=first_page.leaderboard_id, start=1,
+                       count=len(players), players=players, game=first_page.game,
+                       is_event_leaderboard=first_page.is_event_leaderboard)
+
+
+""" ----------------------------------------- CLIENT BASE (class _Client) ------------------------------------------"""
+
+
+class _Client:
+    """
+    The base class of the 'API' and 'Nightbot' classes.
+
+    Owns a pooled :class:`requests.Session`, which is shared across all calls of an instance,
+    so that consecutive requests reuse already established (keep-alive) connections.
+
+    Optionally, the request responses are cached in a :class:`aoe2netapi.cache.ResponseCache`,
+    for a time-to-live chosen per endpoint (see `DEFAULT_CACHE_TTLS`).
+
+    Concurrent calls with the same endpoint and parameters (e.g. from several threads) share one in-flight request,
+    see :class:`aoe2netapi.singleflight.SingleFlight`. The number of collapsed calls is available via
+    `single_flight.stats`.
+
+    Optionally, the sent requests are rate limited by a (shared) :class:`aoe2netapi.ratelimit.RateLimiter`,
+    in the lane of the given 'priority', and failed requests are retried according to a
+    :class:`aoe2netapi.ratelimit.RetryPolicy`.
+
+    Can be used as a context manager, which closes the session on exit. Otherwise, call `close()` explicitly.
+
+    Parameters
+    ----------
+    pool_connections : `int`
+        The number of per-host connection pools to cache. Defaults to 10.
+    pool_maxsize : `int`
+        The maximum number of connections kept open per host. Defaults to 10.
+    pool_block : `bool`
+        Specifies if a request should wait for a free connection when the per-host pool is exhausted,
+        instead of opening an additional (not pooled) connection. Defaults to False.
+    keep_alive : `bool`
+        Specifies if connections should be kept alive and reused between requests. Defaults to True.
+    timeout : `float` | `tuple`
+        The timeout in seconds for every request, either as a single value or as a (connect, read) tuple.
+        Defaults to None (no timeout).
+    cache : :class:`aoe2netapi.cache.ResponseCache`
+        The cache for the request responses, e.g. :class:`aoe2netapi.cache.MemoryCache`. Defaults to None (no cache).
+    cache_ttls : `dict`
+        The time-to-live (in seconds) of cached responses per endpoint URL. Endpoints without (or with a 0) TTL
+        are not cached. Defaults to `DEFAULT_CACHE_TTLS`.
+    coalesce_requests : `bool`
+        Specifies if concurrent identical requests should share one in-flight request. Defaults to True.
+    rate_limiter : :class:`aoe2netapi.ratelimit.RateLimiter`
+        The rate limiter for the sent requests, which can be shared between several instances.
+        Defaults to None (no rate limit).
+    priority : :class:`aoe2netapi.ratelimit.Priority`
+        The priority lane of this instance in the rate limiter.
+        Defaults to `Priority.INTERACTIVE` for 'Nightbot' and to `Priority.NORMAL` otherwise.
+    retry_policy : :class:`aoe2netapi.ratelimit.RetryPolicy`
+        The retry policy for failed requests, e.g. `RetryPolicy()`. Defaults to None (no retries).
+    json_backend : `str`
+        The JSON decoder of the responses, one of `aoe2netapi.jsonbackend.JSON_BACKENDS` ("orjson", "simdjson",
+        "ujson" or "json"). Defaults to None (the fastest installed one).
+    transport : :class:`aoe2netapi.transport.Transport`
+        The transport to send the requests with, e.g. :class:`aoe2netapi.transport.ReplayTransport` to replay recorded
+        responses offline. Defaults to None (HTTP to aoe2.net).
+    instrumentation : :class:`aoe2netapi.instrumentation.Instrumentation`
+        Passes the metrics of every call (e.g. its timing split into network, decoding and model building)
+        to its hooks. Defaults to None (not instrumented).
+    conditional_cache : :class:`aoe2netapi.cache.ConditionalCache`
+        Keeps the validators and the models of the last responses, to send conditional requests and to return
+        the last model for unchanged responses, without decoding and building it again. Defaults to None (not used).
+
+    :raises ValueError: the given JSON backend is not known or not installed
+    """
+
+    _default_priority = Priority.NORMAL
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 keep_alive: bool = True,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                 cache: Optional[ResponseCache] = None,
+                 cache_ttls: Optional[Dict[str, float]] = None,
+                 coalesce_requests: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 priority: Optional[Priority] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 json_backend: Optional[str] = None,
+                 transport: Optional[Transport] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 conditional_cache: Optional[ConditionalCache] = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_ttls = DEFAULT_CACHE_TTLS if cache_ttls is None else cache_ttls
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.rate_limiter = rate_limiter
+        self.priority = self._default_priority if priority is None else priority
+        self.retry_policy = retry_policy
+        self.json_backend: JsonBackend = get_json_backend(json_backend)
+        self.transport = transport
+        self.instrumentation = instrumentation
+        self.conditional_cache = conditional_cache
+        self._session = _create_session(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                        pool_block=pool_block, keep_alive=keep_alive,
+                                        timed=instrumentation is not None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """ Closes the underlying session and all of its pooled connections. """
+
+        self._session.close()
+
+    def _request(self, url: str, params: dict = None, is_nightbot: bool = False,
+                 build: Optional[Callable[[Any], Any]] = None, variant: str = "") -> Any:
+        """
+        Returns the response of a request, either from the cache (if used) or by sending the request,
+        mapped to the models by 'build' (if given).
+
+        'variant' distinguishes the different models 'build' can map the same response to (e.g. "columnar"),
+        as the built models of a :class:`aoe2netapi.cache.ConditionalCache` are kept per request and variant.
+
+        If this instance is instrumented, the metrics of the call are passed to the hooks.
+
+        See :func:`_get_request_response`.
+        """
+
+        if self.instrumentation is not None:
+            return self._measure(url, params, is_nightbot, build, variant)
+        if self.conditional_cache is not None:
+            return self._fetch_conditional(url, params, is_nightbot, build, variant)
+        result = self._fetch(url, params, is_nightbot)
+        return result if build is None else build(result)
+
+    def _measure(self, url: str, params: Optional[dict], is_nightbot: bool,
+                 build: Optional[Callable[[Any], Any]], variant: str = "") -> Any:
+        """ See `_request`, measures the call and passes its metrics to the hooks of the instrumentation. """
+
+        metrics = RequestMetrics(url, params)
+        started = time.perf_counter()
+        try:
+            if self.conditional_cache is not None:
+                return self._fetch_conditional(url, params, is_nightbot, build, variant, metrics)
+            result = self._fetch(url, params, is_nightbot, metrics)
+            if build is not None:
+                build_started = time.perf_counter()
+                result = build(result)
+                metrics.build = time.perf_counter() - build_started
+            return result
+        except Exception as error:
+            metrics.error = error
+            raise
+        finally:
+            metrics.total = time.perf_counter() - started
+            metrics.coalesced = not metrics.cached and metrics.attempts == 0
+            self.instrumentation.emit(metrics)
+
+    def _fetch(self, url: str, params: dict = None, is_nightbot: bool = False,
+               metrics: Optional[RequestMetrics] = None) -> Union[str, Dict[str, Any], List[Any]]:
+        """ Returns the (decoded) response of a request, either from the cache (if used) or by sending the request. """
+
+        ttl = self.cache_ttls.get(url, 0) if self.cache is not None else 0
+        if ttl <= 0:
+            return self._send(url, params, is_nightbot, metrics)
+
+        key = _cache_key(url, params)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._send(url, params, is_nightbot, metrics, ttl=ttl)
+        elif metrics is not None:
+            metrics.cached = True
+        return result
+
+    def _fetch_conditional(self, url: str, params: Optional[dict], is_nightbot: bool,
+                           build: Optional[Callable[[Any], Any]], variant: str = "",
+                           metrics: Optional[RequestMetrics] = None) -> Any:
+        """
+        Returns the model of a request like `_request`, either from the response cache (if used) or by sending
+        a conditional request with the validators of the last response, see :class:`aoe2netapi.cache.ConditionalCache`.
+        Unchanged responses are answered with the model of the last response, without decoding and building it again.
+
+        Responses answered with a 304 (Not Modified) are not stored in the response cache again.
+        """
+
+        key = _cache_key(url, params)
+        model_key = key + "#" + variant if variant else key  # the key of the built model (and of the sent request)
+        ttl = self.cache_ttls.get(url, 0) if self.cache is not None else 0
+        if ttl > 0:
+            result = self.cache.get(key)
+            if result is not None:
+                if metrics is not None:
+                    metrics.cached = True
+                return _build_result(result, build, metrics)
+
+        def build_model(body: bytes) -> Any:
+            result = _decode_body(body, is_nightbot, self.json_backend.loads, metrics)
+            if ttl > 0:
+                self.cache.set(key, result, ttl, size=len(body))
+            return _build_result(result, build, metrics)
+
+        def send():
+            entry = self.conditional_cache.get(model_key)
+            status, response_headers, body = self._with_retries(lambda: _get_conditional_response(
+                url=url, params=params, request_headers=entry.request_headers if entry is not None else None,
+                session=self._session, timeout=self.timeout, transport=self.transport, metrics=metrics))
+            return self.conditional_cache.resolve(model_key, entry, status, response_headers, body, build_model)
+
+        if self.single_flight is None:
+            return send()
+        return self.single_flight.do(model_key, send)
+
+    def _send(self, url: str, params: dict = None, is_nightbot: bool = False,
+              metrics: Optional[RequestMetrics] = None, ttl: float = 0) -> Union[str, Dict[str, Any], List[Any]]:
+        """
+        Sends a request over the pooled session of this instance,
+        or waits for an identical request already in flight (if coalescing is used).
+
+        Every attempt waits for the rate limiter (if used), failed attempts are retried per the retry policy (if used).
+        If 'ttl' is given, the response is stored in the response cache for 'ttl' seconds (once, by the sending call).
+
+        See :func:`_get_request_response`.
+        """
+
+        def send():
+            body_sizes = []
+            result = self._with_retries(lambda: _get_request_response(url=url, params=params, is_nightbot=is_nightbot,
+                                                                      session=self._session, timeout=self.timeout,
+                                                                      loads=self.json_backend.loads,
+                                                                      transport=self.transport, metrics=metrics,
+                                                                      body_sizes=body_sizes))
+            if ttl > 0:
+                self.cache.set(_cache_key(url, params), result, ttl, size=body_sizes[-1] if body_sizes else None)
+            return result
+
+        if self.single_flight is None:
+            return send()
+        return self.single_flight.do(_cache_key(url, params), send)
+
+    def _with_retries(self, request: Callable[[], Any]) -> Any:
+        """
+        Calls 'request' (which sends a request), after waiting for the rate limiter (if used).
+        Failed attempts are retried per the retry policy (if used).
+        """
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(self.priority)
+            try:
+                return request()
+            except (requests.HTTPError, requests.ConnectionError, requests.Timeout) as error:
+                response = getattr(error, "response", None)
+                delay = _retry_delay(self.retry_policy, self.rate_limiter, attempt,
+                                     response.status_code if response is not None else None,
+                                     response.headers.get("Retry-After") if response is not None else None)
+                if delay is None:
+                    raise
+            attempt += 1
+            time.sleep(delay)
+
+    def _stream(self, url: str, params: dict, key: str) -> Iterator[Any]:
+        """
+        Sends a request over the pooled session of this instance and yields the items of the array at the given
+        top-level key of the response as soon as they are received, see :class:`aoe2netapi.streaming._JsonArrayStream`.
+
+        Streamed responses are neither cached nor coalesced.
+        If this instance is instrumented, the metrics of the call are passed to the hooks, see `_measure_stream`.
+        """
+
+        from aoe2netapi.streaming import _JsonArrayStream  # imported lazily, as it depends on this module
+
+        if self.instrumentation is not None:
+            yield from self._measure_stream(url, params, key)
+            return
+
+        response = self._with_retries(lambda: _get_response_stream(url=url, params=params, session=self._session,
+                                                                   timeout=self.timeout, transport=self.transport))
+        with response:
+            parser = _JsonArrayStream(key)
+            for chunk in response.iter_content(chunk_size=_STREAM_CHUNK_SIZE):
+                yield from parser.feed(chunk)
+                if parser.done:
+                    return
+            parser.close()
+
+    def _measure_stream(self, url: str, params: dict, key: str) -> Iterator[Any]:
+        """
+        See `_stream`, measures the streamed call and passes its metrics to the hooks once the stream is done
+        (or closed early).
+
+        'decode' is the time spent parsing the received chunks and 'download' the remaining time spent receiving them.
+        The time the caller spends between the yielded items is not part of the measured phases (and of the 'total').
+        """
+
+        from aoe2netapi.streaming import _JsonArrayStream  # imported lazily, as it depends on this module
+
+        metrics = RequestMetrics(url, params)
+        started = time.perf_counter()
+        received, paused = None, 0.0  # 'paused': the time spent by the caller between the items
+
+        def request() -> requests.Response:
+            metrics.attempts += 1
+            _take_connect_time()
+            sent = time.perf_counter()
+            try:
+                response = _get_response_stream(url=url, params=params, session=self._session,
+                                                timeout=self.timeout, transport=self.transport)
+            except requests.HTTPError as error:
+                metrics.status = error.response.status_code
+                raise
+            metrics.status = response.status_code
+            metrics.connect = _take_connect_time()
+            metrics.ttfb = time.perf_counter() - sent - metrics.connect
+            return response
+
+        try:
+            response = self._with_retries(request)
+            received = time.perf_counter()
+            with response:
+                parser = _JsonArrayStream(key)
+                for chunk in response.iter_content(chunk_size=_STREAM_CHUNK_SIZE):
+                    metrics.response_bytes += len(chunk)
+                    parse_started = time.perf_counter()
+                    items = parser.feed(chunk)
+                    metrics.decode += time.perf_counter() - parse_started
+                    for item in items:
+                        yielded = time.perf_counter()
+                        yield item
+                        paused += time.perf_counter() - yielded
+                    if parser.done:
+                        return
+                parser.close()
+        except Exception as error:
+            metrics.error = error
+            raise
+        finally:
+            if received is not None:
+                _measure_stream_size(response, metrics)
+            finished = time.perf_counter()
+            if received is not None:
+                metrics.download = finished - received - paused - metrics.decode
+            metrics.total = finished - started - paused
+            self.instrumentation.emit(metrics)
+
+
 """ ------------------------------------------- API REQUESTS (class API) -------------------------------------------"""
 
 
-class API:
+class API(_Client):
     """
     The 'API' class encompasses the https://aoe2.net/#api API functions,
     which return their requested data as user-friendly Python objects.
+
+    See :class:`_Client` for the available client options.
     """
 
     def get_strings(self, game: Game) -> Strings:
@@ -134,14 +1013,34 @@ class API:
             the requested data as :class:`Strings`
         """
 
-        result = _get_request_response(url=STRINGS_URL, params={"game": game.value})
-        return Strings.from_dict(result)
+        return self._request(url=STRINGS_URL, params=_strings_params(game),
+                             build=lambda result: _build_strings(result, game))
+
+    def get_strings_index(self, game: Game) -> StringsIndex:
+        """
+        Returns the lookup index of the strings used by the API, e.g. `get_strings_index(game).lookup("civ", 36)`.
+
+        The index is built once per game and shared process-wide, by all clients: the strings are only requested
+        if they were not requested before (via `get_strings` or this function).
+
+        Parameters
+        ----------
+        game : :class:`Game`
+            The game for which to extract the list of strings.
+
+        :return:
+            the :class:`StringsIndex`
+        """
+
+        index = _STRINGS_INDEXES.get(game.value)
+        return self.get_strings(game).index if index is None else index
 
     def get_leaderboard(self,
                         leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
                         start: int = 1,
                         count: int = 10,
-                        **kwargs) -> Leaderboard:
+                        columnar: bool = False,
+                        **kwargs) -> Union[Leaderboard, LeaderboardTable]:
         """
         Requests the data of the given leaderboard, specified by the 'leaderboard_id'.
 
@@ -157,6 +1056,9 @@ class API:
             Specifies how many entries of the given leaderboard should be extracted,
             if able to find with the given criteria. Defaults to 10.
             Max. 10000.
+        columnar : `bool`
+            Specifies if the data should be returned as the memory-efficient :class:`LeaderboardTable`.
+            Defaults to False.
         **kwargs : `dict`
             Additional optional arguments.
 
@@ -176,36 +1078,123 @@ class API:
                 Takes precedence over 'search'.
 
         :return:
-            the data as :class:`Leaderboard`
+            the data as :class:`Leaderboard` (or :class:`LeaderboardTable` if 'columnar' is set)
 
         :raises Aoe2NetException:
             'count' has to be 10000 or less or required parameters are missing
         """
 
-        if not start or not count:
-            raise Aoe2NetException("'start' and 'count' required.")
+        params, is_event_leaderboard = _leaderboard_params(leaderboard_id, start, count, kwargs)
+        return self._request(url=LEADERBOARD_URL, params=params,
+                             build=lambda result: _build_leaderboard(result, leaderboard_id, is_event_leaderboard,
+                                                                     columnar),
+                             variant="columnar" if columnar else "")
+
+    def stream_leaderboard(self,
+                           leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                           start: int = 1,
+                           count: int = 10000,
+                           **kwargs) -> Iterator[LeaderboardPlayer]:
+        """
+        Requests the data of the given leaderboard, specified by the 'leaderboard_id', and yields each player
+        as soon as it is received, instead of waiting for (and parsing) the whole response at once.
+
+        The response is parsed incrementally, with `ijson` if installed. Streamed responses are neither cached
+        nor coalesced, but rate limited and retried (until the first player is received) as any other request.
+
+        See `get_leaderboard` for the parameters. 'count' defaults to 10000 here.
+
+        :return:
+            a generator of :class:`LeaderboardPlayer`
+
+        :raises Aoe2NetException:
+            'count' has to be 10000 or less or required parameters are missing || the response is not valid JSON
+        """
+
+        params, _ = _leaderboard_params(leaderboard_id, start, count, kwargs)
+        for player in self._stream(url=LEADERBOARD_URL, params=params, key="leaderboard"):
+            yield _decode_leaderboard_player(player)
+
+    def _iter_leaderboard_pages(self,
+                                leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                page_size: int,
+                                max_in_flight: int,
+                                columnar: bool = False) -> Iterator[Union[Leaderboard, LeaderboardTable]]:
+        """
+        Requests all pages of the given leaderboard and yields them in rank order.
+
+        The first page is requested on its own to read the 'total' of the leaderboard,
+        the remaining pages are then requested in parallel, with at most 'max_in_flight' requests at the same time.
+        """
+
+        _check_pagination(page_size, max_in_flight)
+
+        first_page = self.get_leaderboard(leaderboard_id, start=1, count=page_size, columnar=columnar)
+        yield first_page
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            try:
+                for start in _leaderboard_page_starts(first_page, page_size):
+                    if len(pending) >= max_in_flight:
+                        yield pending.popleft().result()
+                    pending.append(executor.submit(self.get_leaderboard, leaderboard_id, start, page_size, columnar))
+                while pending:
+                    yield pending.popleft().result()
+            finally:  # stopped early (or failed), do not request the pages nobody is waiting for anymore
+                for future in pending:
+                    future.cancel()
+
+    def iter_leaderboard(self,
+                         leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                         page_size: int = 10000,
+                         max_in_flight: int = 4) -> Iterator[LeaderboardPlayer]:
+        """
+        Requests the whole leaderboard, specified by the 'leaderboard_id', page by page.
+
+        The remaining pages after the first one are requested in parallel.
+        The players are yielded in rank order as soon as their page arrives.
+
+        Parameters
+        ----------
+        leaderboard_id : :class:`LeaderboardId` | :class:`EventLeaderboardId`
+            The leaderboard in which to extract data in.
+        page_size : `int`
+            Specifies how many entries should be requested per page. Defaults to 10000.
+            Max. 10000.
+        max_in_flight : `int`
+            Specifies how many pages may be requested at the same time. Defaults to 4.
 
-        if count > 10000:
-            raise Aoe2NetException("'count' has to be 10000 or less.")
+        :return:
+            a generator of :class:`LeaderboardPlayer`
 
-        leaderboard_id_param, is_event_leaderboard = _check_is_leaderboard(leaderboard_id=leaderboard_id)
+        :raises Aoe2NetException:
+            'page_size' has to be between 1 and 10000 || 'max_in_flight' has to be 1 or more
+        """
 
-        optionals = {
-            "search": "",
-            "steam_id": "",
-            "profile_id": "",
-        }
-        optionals = _is_valid_kwarg(kwargs, optionals)
+        for page in self._iter_leaderboard_pages(leaderboard_id, page_size, max_in_flight):
+            yield from page.players
 
-        params = {"game": leaderboard_id.value.game, leaderboard_id_param: leaderboard_id.value.aoe2net_id,
-                  "start": start, "count": count}
-        params.update(optionals)
+    def get_full_leaderboard(self,
+                             leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                             page_size: int = 10000,
+                             max_in_flight: int = 4,
+                             columnar: bool = False) -> Union[Leaderboard, LeaderboardTable]:
+        """
+        Requests the whole leaderboard, specified by the 'leaderboard_id'.
 
-        leaderboard = Leaderboard.from_dict(_get_request_response(url=LEADERBOARD_URL, params=params),
-                                            infer_missing=True)  # either infer_missing or specify dataclass defaults
-        leaderboard.game = leaderboard_id.value.game
-        leaderboard.is_event_leaderboard = is_event_leaderboard
-        return leaderboard
+        See `iter_leaderboard` for the parameters.
+        If 'columnar' is set, the data is returned as the memory-efficient :class:`LeaderboardTable`.
+
+        :return:
+            the data as :class:`Leaderboard` (or :class:`LeaderboardTable`), containing all players
+
+        :raises Aoe2NetException:
+            'page_size' has to be between 1 and 10000 || 'max_in_flight' has to be 1 or more
+        """
+
+        return _merge_leaderboard_pages(list(self._iter_leaderboard_pages(leaderboard_id, page_size,
+                                                                          max_in_flight, columnar)))
 
     def get_match_history(self, game: Game,
                           start: int = 0,
@@ -243,18 +1232,8 @@ class API:
             'count' has to be 1000 or less || Either 'steam_id' or 'profile_id' required || 'game' is not valid
         """
 
-        if game not in Game:
-            raise Aoe2NetException("A valid 'game' is required.")
-
-        if count > 1000:
-            raise Aoe2NetException("'count' has to be 1000 or less.")
-
-        if not steam_id and not profile_id:
-            raise Aoe2NetException("Either 'steam_id' or 'profile_id' required.")
-
-        params = {"game": game.value, "start": start, "count": count, "steam_id": steam_id, "profile_id": profile_id}
-        return [MatchHistory.from_dict(match, infer_missing=True) for match in
-                _get_request_response(url=MATCH_HISTORY_URL, params=params)]
+        params = _match_history_params(game, start, count, steam_id, profile_id)
+        return self._request(url=MATCH_HISTORY_URL, params=params, build=_build_match_history)
 
     def get_rating_history(self,
                            leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
@@ -293,30 +1272,248 @@ class API:
             'count' has to be 10000 or less || Either 'steam_id' or 'profile_id' required
         """
 
-        if count > 10000:
-            raise Aoe2NetException("'count' has to be 10000 or less.")
+        params, is_event_leaderboard = _rating_history_params(leaderboard_id, start, count, steam_id, profile_id)
+        return self._request(url=RATING_HISTORY_URL, params=params,
+                             build=lambda result: RatingHistory(leaderboard_id=leaderboard_id,
+                                                                is_event_leaderboard=is_event_leaderboard,
+                                                                ratings=result))
+
+    @staticmethod
+    def _iter_prefetched_pages(request_page: Callable[[int, int], List], page_size: int) -> Iterator[List]:
+        """
+        Requests a history page by page, starting at 0 (most recent entry), until a page is not full anymore.
+
+        The next page is already requested in the background while the caller works on the current one,
+        so that at most two pages are held in memory at any time.
+        """
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            start = 0
+            future = executor.submit(request_page, start, page_size)
+            try:
+                while future is not None:
+                    page = future.result()
+                    future = None
+                    if len(page) == page_size:
+                        start += page_size
+                        future = executor.submit(request_page, start, page_size)
+                    yield page
+            finally:  # stopped early (or failed), do not request the page nobody is waiting for anymore
+                if future is not None:
+                    future.cancel()
+
+    def iter_match_history(self, game: Game,
+                           steam_id: str = "",
+                           profile_id: str = "",
+                           page_size: int = 1000,
+                           until_match_id: str = "",
+                           since: Optional[int] = None) -> Iterator[MatchHistory]:
+        """
+        Requests the whole match history for a player lazily, page by page (most recent match first).
+
+        'game' required, as well as either 'steam_id' or 'profile_id'.
+
+        Parameters
+        ---------
+        game : :class:`Game`
+            The game for which to extract the match history.
+        steam_id : `str`
+            The steamID64 of a player. (ex: 76561199003184910)
+
+            Takes precedence over 'profile_id'.
+        profile_id : `str`
+            The profile ID. (ex: 459658)
+        page_size : `int`
+            Specifies how many entries should be requested per page. Defaults to 1000.
+            Max. 1000.
+        until_match_id : `str`
+            Stops once the match with this ID is reached (exclusive). Defaults to an empty string (no cutoff).
+        since : `int`
+            Stops once a match started before this (unix) timestamp is reached. Defaults to None (no cutoff).
+
+        :return:
+            a generator of :class:`MatchHistory`
+
+        :raises Aoe2NetException:
+            'page_size' has to be between 1 and 1000 || Either 'steam_id' or 'profile_id' required ||
+            'game' is not valid
+        """
+
+        _check_pagination(page_size, max_page_size=1000)
+        _match_history_params(game, 0, page_size, steam_id, profile_id)  # validate before the first request
+
+        def request_page(start: int, count: int) -> List[MatchHistory]:
+            return self.get_match_history(game, start=start, count=count, steam_id=steam_id, profile_id=profile_id)
+
+        for page in self._iter_prefetched_pages(request_page, page_size):
+            for match in page:
+                if _is_past_cutoff(match.match_id, match.started, until_match_id, since):
+                    return
+                yield match
+
+    def iter_rating_history(self,
+                            leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                            steam_id: str = "",
+                            profile_id: str = "",
+                            page_size: int = 1000,
+                            since: Optional[int] = None) -> Iterator[RatingHistoryItem]:
+        """
+        Requests the whole rating history for a player lazily, page by page (most recent entry first).
+
+        Either 'steam_id' or 'profile_id' required.
+
+        Parameters
+        ---------
+        leaderboard_id : :class:`LeaderboardId` | :class:`EventLeaderboardId`
+            The leaderboard in which to extract data in.
+        steam_id : `str`
+            The steamID64 of a player. (ex: 76561199003184910)
+
+            Takes precedence over 'profile_id'.
+        profile_id : `str`
+            The profile ID. (ex: 459658)
+        page_size : `int`
+            Specifies how many entries should be requested per page. Defaults to 1000.
+            Max. 10000.
+        since : `int`
+            Stops once an entry older than this (unix) timestamp is reached. Defaults to None (no cutoff).
+
+        :return:
+            a generator of :class:`RatingHistoryItem`
+
+        :raises Aoe2NetException:
+            'page_size' has to be between 1 and 10000 || Either 'steam_id' or 'profile_id' required
+        """
+
+        _check_pagination(page_size)
+        _rating_history_params(leaderboard_id, 0, page_size, steam_id, profile_id)  # validate before the first request
+
+        def request_page(start: int, count: int) -> List[RatingHistoryItem]:
+            return self.get_rating_history(leaderboard_id, start=start, count=count,
+                                           steam_id=steam_id, profile_id=profile_id).ratings
+
+        for page in self._iter_prefetched_pages(request_page, page_size):
+            for rating in page:
+                if _is_past_cutoff(None, rating.timestamp, since=since):
+                    return
+                yield rating
+
+    @staticmethod
+    def _batch(request: Callable[[str], Any], profile_ids: List[str], max_in_flight: int) -> BatchResult:
+        """
+        Requests the data of several players in parallel, with at most 'max_in_flight' requests at the same time.
+
+        A failed request is recorded as the error of its player, and does not fail the whole batch.
+        """
+
+        batch = BatchResult()
+        if not profile_ids:
+            return batch
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            futures = {profile_id: executor.submit(request, profile_id) for profile_id in profile_ids}
+            for profile_id, future in futures.items():
+                try:
+                    batch.results[profile_id] = future.result()
+                except Exception as error:
+                    batch.errors[profile_id] = error
+        return batch
+
+    def get_match_histories(self, game: Game,
+                            profile_ids: Iterable[str],
+                            start: int = 0,
+                            count: int = 5,
+                            max_in_flight: int = 8) -> BatchResult[List[MatchHistory]]:
+        """
+        Requests the match history for several players at once, see `get_match_history`.
+
+        Parameters
+        ---------
+        game : :class:`Game`
+            The game for which to extract the match histories.
+        profile_ids : `Iterable[str]`
+            The profile IDs of the players. (ex: ["459658", "196240"])
+        start : `int`
+            Specifies the start point for which to extract data at. Defaults to 0 (most recent match).
+        count : `int`
+            Specifies how many matches should be extracted per player. Defaults to 5.
+            Max. 1000.
+        max_in_flight : `int`
+            Specifies how many players may be requested at the same time. Defaults to 8.
+
+        :return:
+            the data as :class:`BatchResult`, mapping each profile ID to its list of :class:`MatchHistory`
+            (or to the error of its request)
+
+        :raises Aoe2NetException:
+            'count' has to be 1000 or less || 'game' is not valid || 'max_in_flight' has to be 1 or more
+        """
 
-        if not steam_id and not profile_id:
-            raise Aoe2NetException("Either 'steam_id' or 'profile_id' required.")
+        profile_ids = _unique_profile_ids(profile_ids)
+        _check_max_in_flight(max_in_flight)
+        if profile_ids:  # validate once, before the first request
+            _match_history_params(game, start, count, "", profile_ids[0])
 
-        leaderboard_id_param, is_event_leaderboard = _check_is_leaderboard(leaderboard_id=leaderboard_id)
+        def request(profile_id: str) -> List[MatchHistory]:
+            return self.get_match_history(game, start=start, count=count, profile_id=profile_id)
 
-        params = {"game": leaderboard_id.value.game, leaderboard_id_param: leaderboard_id.value.aoe2net_id,
-                  "start": start, "count": count, "steam_id": steam_id, "profile_id": profile_id}
-        return RatingHistory(leaderboard_id=leaderboard_id,
-                             is_event_leaderboard=is_event_leaderboard,
-                             ratings=_get_request_response(url=RATING_HISTORY_URL, params=params))
+        return self._batch(request, profile_ids, max_in_flight)
+
+    def get_rating_histories(self,
+                             leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                             profile_ids: Iterable[str],
+                             start: int = 0,
+                             count: int = 100,
+                             max_in_flight: int = 8) -> BatchResult[RatingHistory]:
+        """
+        Requests the rating history for several players at once, see `get_rating_history`.
+
+        Parameters
+        ---------
+        leaderboard_id : :class:`LeaderboardId` | :class:`EventLeaderboardId`
+            The leaderboard in which to extract data in.
+        profile_ids : `Iterable[str]`
+            The profile IDs of the players. (ex: ["459658", "196240"])
+        start : `int`
+            Specifies the start point for which to extract data at. Defaults to 0 (most recent match).
+        count : `int`
+            Specifies how many entries should be extracted per player. Defaults to 100.
+            Max. 10000.
+        max_in_flight : `int`
+            Specifies how many players may be requested at the same time. Defaults to 8.
+
+        :return:
+            the data as :class:`BatchResult`, mapping each profile ID to its :class:`RatingHistory`
+            (or to the error of its request)
+
+        :raises Aoe2NetException:
+            'count' has to be 10000 or less || 'max_in_flight' has to be 1 or more
+        """
+
+        profile_ids = _unique_profile_ids(profile_ids)
+        _check_max_in_flight(max_in_flight)
+        if profile_ids:  # validate once, before the first request
+            _rating_history_params(leaderboard_id, start, count, "", profile_ids[0])
+
+        def request(profile_id: str) -> RatingHistory:
+            return self.get_rating_history(leaderboard_id, start=start, count=count, profile_id=profile_id)
+
+        return self._batch(request, profile_ids, max_in_flight)
 
 
 """ ------------------------------------ NIGHTBOT API REQUESTS (class Nightbot) ------------------------------------"""
 
 
-class Nightbot:
+class Nightbot(_Client):
     """
     The 'Nightbot' class encompasses the https://aoe2.net/#nightbot Nightbot API functions,
     which only return their requested data as plain text.
+
+    See :class:`_Client` for the available client options.
     """
 
+    _default_priority = Priority.INTERACTIVE
+
     def get_rank_details(self, leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
                          search: str = "", steam_id: str = "", profile_id: str = "", flag: bool = True) -> str:
         """
@@ -354,16 +1551,8 @@ class Nightbot:
             Either 'search', 'steam_id' or 'profile_id' required
         """
 
-        if not search and not steam_id and not profile_id:
-            raise Aoe2NetException("Either 'search', 'steam_id' or 'profile_id' required.")
-
-        leaderboard_id_param, _ = _check_is_leaderboard(leaderboard_id=leaderboard_id)
-
-        params = {"flag": flag.__str__().lower(), "language": "en", "search": search, "steam_id": steam_id,
-                  "profile_id": profile_id, leaderboard_id_param: leaderboard_id.value.aoe2net_id,
-                  "game": leaderboard_id.value.game}
-
-        return _get_request_response(url=RANK_DETAILS_URL, params=params, is_nightbot=True)
+        params = _rank_details_params(leaderboard_id, search, steam_id, profile_id, flag)
+        return self._request(url=RANK_DETAILS_URL, params=params, is_nightbot=True)
 
     def get_current_or_last_match(self, search: str = "", steam_id: str = "", profile_id: str = "",
                                   game: Optional[Game] = None, **kwargs):
@@ -409,24 +1598,5 @@ class Nightbot:
             Either 'search', 'steam_id' or 'profile_id' required || 'search' used but without 'game' specified
         """
 
-        if not search and not steam_id and not profile_id:
-            raise Aoe2NetException("Either 'search', 'steam_id' or 'profile_id' required.")
-
-        if search and not game:
-            raise Aoe2NetException("'game' is required if 'search' is used.")
-
-        optionals = {
-            "color": True,
-            "flag": True
-        }
-        optionals = _is_valid_kwarg(kwargs, optionals)
-
-        params = {"search": search, "steam_id": steam_id, "profile_id": profile_id, "civflag": "false",
-                  "game": game.value if game else ""}
-        params.update(optionals)
-        color = params.get("color").__str__().lower()
-        flag = params.get("flag").__str__().lower()
-        params["color"] = color
-        params["flag"] = flag
-
-        return _get_request_response(url=CURRENT_MATCH_URL, params=params, is_nightbot=True)
+        params = _current_or_last_match_params(search, steam_id, profile_id, game, kwargs)
+        return self._request(url=CURRENT_MATCH_URL, params=params, is_nightbot=True)
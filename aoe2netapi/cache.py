@@ -0,0 +1,384 @@
+"""
+Opt-in response caches for the `API` and `Nightbot` classes (and their asyncio counterparts).
+
+The (decoded) request responses are cached per URL and request parameters, for a time-to-live (TTL) which is
+chosen per API endpoint by the client (see `aoe2netapi.aoe2.DEFAULT_CACHE_TTLS`).
+The caches are bounded by their number of entries and their size in bytes and evict the least recently used entries.
+
+Two backends are available:
+
+- :class:`MemoryCache` -- an in-process cache
+- :class:`SqliteCache` -- an on-disk cache, which can be shared between several processes
+
+Independently of them, a :class:`ConditionalCache` keeps the validators (`ETag`, `Last-Modified`) and the built models
+of the last responses, so that unchanged responses are neither downloaded again nor decoded and built again.
+"""
+import abc
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+
+@dataclass
+class CacheStats:
+    """ The statistics of a response cache. """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """ The share of lookups answered from the cache. """
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _cache_key(url: str, params: Optional[dict]) -> str:
+    """
+    Helper function to build the cache key of a request: its URL plus its normalized (sorted) parameters.
+
+    :param url: the request URL
+    :param params: the request parameters
+
+    :returns: the cache key
+    """
+
+    if not params:
+        return url
+    return url + "?" + urlencode(sorted((key, str(value)) for key, value in params.items()))
+
+
+def _size_of(value: Any) -> int:
+    """ Helper function which estimates the size in bytes of a decoded request response. """
+
+    if isinstance(value, str):
+        return len(value.encode())
+    return len(json.dumps(value, separators=(",", ":")).encode())
+
+
+class ResponseCache(abc.ABC):
+    """
+    The base class of the response caches.
+
+    Parameters
+    ----------
+    max_entries : `int`
+        The maximum number of cached responses. Defaults to 1024.
+    max_bytes : `int`
+        The maximum size of all cached responses in bytes. Defaults to 64 MiB.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """ Returns the cached response for the given key, or None if not cached (anymore). """
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any, ttl: float, size: Optional[int] = None) -> None:
+        """
+        Caches the response for the given key for 'ttl' seconds.
+
+        'size' is the size of the response body in bytes, if known (otherwise it is estimated from the response).
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """ Removes all cached responses. """
+
+    @abc.abstractmethod
+    def _usage(self) -> Tuple[int, int]:
+        """ Returns the current number of entries and their size in bytes. """
+
+    @property
+    def stats(self) -> CacheStats:
+        """ The current statistics of this cache (the hits, misses and evictions are counted per process). """
+
+        entries, size = self._usage()
+        return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions, entries=entries,
+                          bytes=size)
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+
+
+class MemoryCache(ResponseCache):
+    """
+    An in-process response cache with least recently used (LRU) eviction. Thread-safe.
+
+    See :class:`ResponseCache` for the parameters.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()  # key -> (expires at, value, size)
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            self._record(entry is not None)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, size: Optional[int] = None) -> None:
+        if size is None:
+            size = _size_of(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _usage(self) -> Tuple[int, int]:
+        with self._lock:
+            return len(self._entries), self._bytes
+
+
+class SqliteCache(ResponseCache):
+    """
+    An on-disk (sqlite) response cache with least recently used (LRU) eviction.
+
+    Several processes can share the same cache file. Thread-safe.
+
+    Parameters
+    ----------
+    path : `str`
+        The path to the sqlite database file.
+
+    See :class:`ResponseCache` for the other parameters.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                                 "size INTEGER NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def close(self) -> None:
+        """ Closes the connection to the database file. """
+
+        self._connection.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                                           (key, now)).fetchone()
+            self._record(row is not None)
+            if row is None:
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float, size: Optional[int] = None) -> None:
+        serialized = json.dumps(value, separators=(",", ":"))
+        if size is None:
+            size = _size_of(value) if isinstance(value, str) else len(serialized.encode())
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                                   (key, serialized, size, now + ttl, now))
+                entries, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+                if entries > self.max_entries or total > self.max_bytes:
+                    for evicted_key, evicted_size in connection.execute(
+                            "SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+                        if entries <= self.max_entries and total <= self.max_bytes:
+                            break
+                        connection.execute("DELETE FROM responses WHERE key = ?", (evicted_key,))
+                        entries, total = entries - 1, total - evicted_size
+                        self._evictions += 1
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def _usage(self) -> Tuple[int, int]:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+
+""" ------------------------------------------------ CONDITIONAL CACHE ----------------------------------------------"""
+
+
+@dataclass
+class ConditionalStats:
+    """ The statistics of a conditional cache. """
+
+    not_modified: int = 0  # responses revalidated with a 304 (Not Modified)
+    unchanged: int = 0  # responses without (matching) validators, whose body was identical to the last one
+    modified: int = 0  # responses which were decoded and built
+    entries: int = 0
+
+
+@dataclass
+class _ConditionalEntry:
+    """ The validators, the digest of the body and the built model of the last response of a request. """
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: bytes
+    model: Any
+
+    @property
+    def request_headers(self) -> Dict[str, str]:
+        """ The headers of a conditional request, which the server answers with a 304 if the response is unchanged. """
+
+        request_headers = {}
+        if self.etag is not None:
+            request_headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            request_headers["If-Modified-Since"] = self.last_modified
+        return request_headers
+
+
+def _digest(body: bytes) -> bytes:
+    """ Helper function which returns the digest of a response body, to detect byte-identical responses. """
+
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class ConditionalCache:
+    """
+    Keeps the validators (`ETag`, `Last-Modified`) and the built models (e.g. the :class:`Leaderboard`) of the
+    last responses per URL and request parameters, with least recently used (LRU) eviction. Thread-safe.
+
+    The clients send the validators with the next identical request (`If-None-Match`, `If-Modified-Since`).
+    If the server answers with a 304 (Not Modified), the model of the last response is returned without downloading,
+    decoding and building it again. If the server does not send validators, but the response body is byte-identical
+    to the last one, the model of the last response is returned as well, without decoding and building it again.
+
+    The models are shared between all calls answered from the same response, so they should not be modified.
+
+    Parameters
+    ----------
+    max_entries : `int`
+        The maximum number of kept responses (models). Defaults to 256.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _ConditionalEntry]" = OrderedDict()
+        self._not_modified = 0
+        self._unchanged = 0
+        self._modified = 0
+
+    def get(self, key: str) -> Optional[_ConditionalEntry]:
+        """ Returns the entry of the last response for the given key, or None if there is none (anymore). """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: _ConditionalEntry) -> None:
+        """ Keeps the entry of the last response for the given key. """
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """ Removes all kept responses. """
+
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> ConditionalStats:
+        """ The current statistics of this cache. """
+
+        with self._lock:
+            return ConditionalStats(not_modified=self._not_modified, unchanged=self._unchanged,
+                                    modified=self._modified, entries=len(self._entries))
+
+    def resolve(self, key: str, entry: Optional[_ConditionalEntry], status: int, headers: Mapping[str, str],
+                body: bytes, build: Callable[[bytes], Any]) -> Any:
+        """
+        Returns the model of a response to a (conditional) request and keeps it for the next one.
+
+        :param key: the key of the request, see `_cache_key`
+        :param entry: the entry whose validators were sent with the request, if any
+        :param status: the status code of the response
+        :param headers: the response headers
+        :param body: the response body
+        :param build: decodes the response body and builds its model, if it changed
+
+        :returns: the model of the response
+        """
+
+        if status == 304 and entry is not None:  # a 304 does not have to repeat the validators
+            self.set(key, _ConditionalEntry(headers.get("ETag", entry.etag),
+                                            headers.get("Last-Modified", entry.last_modified), entry.digest,
+                                            entry.model))
+            with self._lock:
+                self._not_modified += 1
+            return entry.model
+
+        digest = _digest(body)
+        unchanged = entry is not None and entry.digest == digest
+        model = entry.model if unchanged else build(body)
+        self.set(key, _ConditionalEntry(headers.get("ETag"), headers.get("Last-Modified"), digest, model))
+        with self._lock:
+            if unchanged:
+                self._unchanged += 1
+            else:
+                self._modified += 1
+        return model
@@ -0,0 +1,254 @@
+"""
+A multi-process crawler of whole leaderboards, with sharded output.
+
+:func:`crawl_leaderboards` splits every leaderboard into page ranges (`start`/`count`) and spreads them across a pool
+of worker processes. Every worker requests, decodes and writes its pages as shards (JSON Lines or Parquet files),
+so that the CPU-bound decoding scales with the number of cores. The parent process merges the shards of every
+leaderboard into one rank ordered file as soon as all of them are written.
+
+Writing Parquet files requires the optional dependency `pyarrow` (`pip install aoe2netapi-wrapper[arrow]`).
+"""
+import heapq
+import json
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from aoe2netapi.aoe2 import API, Aoe2NetException, _check_pagination
+from aoe2netapi.constants import LeaderboardId, EventLeaderboardId
+
+# the formats of the shards and the merged files
+SHARD_FORMATS = ("jsonl", "parquet")
+# the number of rows read from each Parquet shard (and written to the merged file) at a time
+_MERGE_BATCH_SIZE = 1024
+
+
+@dataclass
+class CrawlResult:
+    """ The result of crawling one leaderboard. """
+
+    leaderboard_id: Union[LeaderboardId, EventLeaderboardId]
+    total: int  # the number of players reported by the API when the crawl started
+    rows: int  # the number of players in the merged file
+    path: str  # the merged, rank ordered file
+    shards: List[str] = field(default_factory=list)  # the shard files (removed after merging, unless kept)
+    duration: float = 0.0  # the time in seconds from the start of the crawl until the merged file was written
+
+
+@dataclass(frozen=True)
+class _ShardTask:
+    """ A page range of a leaderboard, requested and written by a worker process. """
+
+    leaderboard_id: Union[LeaderboardId, EventLeaderboardId]
+    start: int
+    count: int
+    path: str
+    shard_format: str
+
+
+# the client of a worker process, see `_init_worker`
+_worker_api: Optional[API] = None
+
+
+def _init_worker(client_options: Dict[str, Any]) -> None:
+    global _worker_api
+    _worker_api = API(**client_options)
+
+
+def _crawl_shard(task: _ShardTask, api: Optional[API] = None) -> int:
+    """
+    Requests, decodes and writes the page range of a shard, with the given client or the one of the worker process.
+
+    :returns: the number of written rows
+    """
+
+    api = _worker_api if api is None else api
+    if task.shard_format == "parquet":
+        from aoe2netapi import export  # imported lazily, as 'pyarrow' is optional
+
+        batch = export.leaderboard_to_record_batch(
+            api.get_leaderboard(task.leaderboard_id, start=task.start, count=task.count, columnar=True))
+        export.write_parquet(task.path, [batch], export.LEADERBOARD_SCHEMA)
+        return batch.num_rows
+
+    players = api.get_leaderboard(task.leaderboard_id, start=task.start, count=task.count).players or []
+    with open(task.path, "w", encoding="utf-8") as file:
+        for player in players:
+            file.write(json.dumps(player.__dict__))
+            file.write("\n")
+    return len(players)
+
+
+def _file_name(leaderboard_id: Union[LeaderboardId, EventLeaderboardId]) -> str:
+    """ Returns the base name of the files of a leaderboard, e.g. "aoe_two_rm" or "event_aoe_four_season_one". """
+
+    name = leaderboard_id.name.lower()
+    return "event_" + name if isinstance(leaderboard_id, EventLeaderboardId) else name
+
+
+def _rank_key(rank: Optional[int]) -> int:
+    """ Sorts players without a rank last. """
+
+    return rank if rank is not None else 2 ** 31
+
+
+def _merge_jsonl(shards: List[str], path: str) -> int:
+    """
+    Merges the (rank ordered) JSON Lines shards of a leaderboard into one rank ordered file.
+    Players which moved across page boundaries during the crawl (and thus were written twice) are only kept once.
+
+    :returns: the number of merged rows
+    """
+
+    def read(shard: str) -> Iterator[Tuple[int, dict]]:
+        with open(shard, encoding="utf-8") as file:
+            for line in file:
+                player = json.loads(line)
+                yield _rank_key(player.get("rank")), player
+
+    seen, rows = set(), 0
+    with open(path, "w", encoding="utf-8") as file:
+        for _, player in heapq.merge(*map(read, shards), key=lambda item: item[0]):
+            if player.get("profile_id") in seen:
+                continue
+            seen.add(player.get("profile_id"))
+            file.write(json.dumps(player))
+            file.write("\n")
+            rows += 1
+    return rows
+
+
+def _merge_parquet(shards: List[str], path: str) -> int:
+    """ The Parquet counterpart of `_merge_jsonl`, which reads and writes the shards batch by batch. """
+
+    from aoe2netapi import export  # imported lazily, as 'pyarrow' is optional
+    pyarrow = export.pyarrow
+    schema = export.LEADERBOARD_SCHEMA
+
+    def read(shard: str) -> Iterator[Tuple[int, dict]]:
+        with pyarrow.parquet.ParquetFile(shard) as file:
+            for batch in file.iter_batches(batch_size=_MERGE_BATCH_SIZE):
+                for player in batch.to_pylist():
+                    yield _rank_key(player["rank"]), player
+
+    def merge() -> Iterator["pyarrow.RecordBatch"]:
+        seen, players = set(), []
+        for _, player in heapq.merge(*map(read, shards), key=lambda item: item[0]):
+            if player["profile_id"] in seen:
+                continue
+            seen.add(player["profile_id"])
+            players.append(player)
+            if len(players) == _MERGE_BATCH_SIZE:
+                yield pyarrow.RecordBatch.from_pylist(players, schema=schema)
+                players = []
+        if players:
+            yield pyarrow.RecordBatch.from_pylist(players, schema=schema)
+
+    return export.write_parquet(path, merge(), schema)
+
+
+def crawl_leaderboards(output_dir: str,
+                       leaderboard_ids: Optional[Iterable[Union[LeaderboardId, EventLeaderboardId]]] = None,
+                       page_size: int = 10000,
+                       processes: Optional[int] = None,
+                       shard_format: str = "jsonl",
+                       client_options: Optional[Dict[str, Any]] = None,
+                       keep_shards: bool = False) -> Dict[Union[LeaderboardId, EventLeaderboardId], CrawlResult]:
+    """
+    Crawls whole leaderboards with a pool of worker processes and writes one rank ordered file per leaderboard
+    (`<output_dir>/<leaderboard>.<shard_format>`, e.g. "aoe_two_rm.jsonl").
+
+    The number of players of every leaderboard is requested first. The leaderboards are then split into page ranges
+    of 'page_size' players, which are requested, decoded and written (as shards in `<output_dir>/shards`)
+    by the worker processes. The shards of a leaderboard are merged as soon as all of them are written.
+
+    Parameters
+    ----------
+    output_dir : `str`
+        The directory to write the files to. Created if it does not exist.
+    leaderboard_ids : `iterable`
+        The leaderboards to crawl. Defaults to None (all :class:`LeaderboardId` leaderboards).
+    page_size : `int`
+        The number of players per shard. Max. 10000. Defaults to 10000.
+    processes : `int`
+        The number of worker processes. 0 crawls in the calling process. Defaults to None (the number of CPUs).
+    shard_format : `str`
+        The format of the files, "jsonl" (a JSON object per player and line) or "parquet" (see
+        `aoe2netapi.export.LEADERBOARD_SCHEMA`). Defaults to "jsonl".
+    client_options : `dict`
+        The (picklable) arguments of the :class:`API` client of every process, e.g. a `retry_policy`.
+        Note: a rate limiter is not shared between processes. Defaults to None (default client).
+    keep_shards : `bool`
+        Specifies if the shards should be kept after merging. Defaults to False.
+
+    :return:
+        the :class:`CrawlResult` per leaderboard
+
+    :raises Aoe2NetException:
+        'page_size' has to be between 1 and 10000 || 'shard_format' is not valid || 'pyarrow' is not installed
+    """
+
+    _check_pagination(page_size)
+    if shard_format not in SHARD_FORMATS:
+        raise Aoe2NetException("'shard_format' has to be one of {}.".format(", ".join(SHARD_FORMATS)))
+    if shard_format == "parquet":
+        from aoe2netapi.export import _check_pyarrow  # imported lazily, as 'pyarrow' is optional
+        _check_pyarrow()
+
+    started = time.perf_counter()
+    client_options = dict(client_options or {})
+    leaderboard_ids = list(LeaderboardId if leaderboard_ids is None else leaderboard_ids)
+    shard_dir = os.path.join(output_dir, "shards")
+    os.makedirs(shard_dir, exist_ok=True)
+
+    results, tasks = {}, []
+    with API(**client_options) as api:
+        for leaderboard_id in leaderboard_ids:
+            name = _file_name(leaderboard_id)
+            total = api.get_leaderboard(leaderboard_id, start=1, count=1).total or 0
+            shards = [_ShardTask(leaderboard_id, start, page_size,
+                                 os.path.join(shard_dir, "{}-{:08d}.{}".format(name, start, shard_format)),
+                                 shard_format)
+                      for start in range(1, total + 1, page_size)]
+            results[leaderboard_id] = CrawlResult(leaderboard_id, total, 0,
+                                                  os.path.join(output_dir, "{}.{}".format(name, shard_format)),
+                                                  [shard.path for shard in shards])
+            tasks.extend(shards)
+
+        remaining = {leaderboard_id: len(result.shards) for leaderboard_id, result in results.items()}
+
+        def written(leaderboard_id):
+            """ Merges the shards of the leaderboard once the last one of them is written. """
+
+            remaining[leaderboard_id] -= 1
+            if remaining[leaderboard_id] > 0:
+                return
+            result = results[leaderboard_id]
+            result.rows = (_merge_parquet if shard_format == "parquet" else _merge_jsonl)(result.shards, result.path)
+            if not keep_shards:
+                for shard in result.shards:
+                    os.remove(shard)
+            result.duration = time.perf_counter() - started
+
+        for leaderboard_id in [leaderboard_id for leaderboard_id, count in remaining.items() if count == 0]:
+            remaining[leaderboard_id] = 1  # an empty leaderboard, merged right away
+            written(leaderboard_id)
+
+        if processes == 0:
+            for task in tasks:
+                _crawl_shard(task, api)
+                written(task.leaderboard_id)
+            return results
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(client_options,)) as executor:
+        futures: Dict[Future, _ShardTask] = {executor.submit(_crawl_shard, task): task for task in tasks}
+        try:
+            for future in as_completed(futures):
+                future.result()
+                written(futures[future].leaderboard_id)
+        finally:  # failed, do not crawl the remaining shards
+            for future in futures:
+                future.cancel()
+    return results
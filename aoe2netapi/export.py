@@ -0,0 +1,238 @@
+"""
+Export of leaderboards and match histories to Apache Arrow record batches and Parquet/Feather files.
+
+Requires the optional dependency `pyarrow` (`pip install aoe2netapi-wrapper[arrow]`).
+
+Every model has a fixed schema (see `LEADERBOARD_SCHEMA` and `MATCH_HISTORY_SCHEMA`). The numeric columns of a
+:class:`LeaderboardTable` are handed to Arrow without copying them, and the `iter_*_record_batches` functions stream
+a whole leaderboard or match history page by page, so that only the current page is held as Python objects.
+"""
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+from aoe2netapi.aoe2 import Aoe2NetException, _check_pagination
+from aoe2netapi.constants import Game, LeaderboardId, EventLeaderboardId
+from aoe2netapi.models import Leaderboard, LeaderboardTable, MatchHistory
+
+# the properties which are typed as `str`, but are (unix) timestamps
+_TIMESTAMPS = ("last_match_time", "started", "finished")
+
+
+def _check_pyarrow() -> None:
+    if pyarrow is None:
+        raise Aoe2NetException("The export requires 'pyarrow': pip install aoe2netapi-wrapper[arrow]")
+
+
+if pyarrow is not None:
+    LEADERBOARD_SCHEMA = pyarrow.schema([
+        (name, pyarrow.int32() if name in LeaderboardTable.INT_COLUMNS else
+         pyarrow.int64() if name in _TIMESTAMPS else pyarrow.string())
+        for name in LeaderboardTable.COLUMNS
+    ])
+
+    _MATCH_HISTORY_PLAYER_TYPE = pyarrow.struct([
+        ("profile_id", pyarrow.string()), ("name", pyarrow.string()), ("clan", pyarrow.string()),
+        ("country", pyarrow.string()), ("slot", pyarrow.int32()), ("slot_type", pyarrow.int32()),
+        ("rating", pyarrow.int32()), ("rating_change", pyarrow.int32()), ("color", pyarrow.int32()),
+        ("team", pyarrow.int32()), ("civ", pyarrow.int32()), ("won", pyarrow.bool_()), ("civ_name", pyarrow.string()),
+    ])
+
+    MATCH_HISTORY_SCHEMA = pyarrow.schema([
+        ("match_id", pyarrow.string()), ("version", pyarrow.string()), ("name", pyarrow.string()),
+        ("num_players", pyarrow.int32()), ("num_slots", pyarrow.int32()), ("has_password", pyarrow.bool_()),
+        ("map_size", pyarrow.int32()), ("map_type", pyarrow.int32()), ("ranked", pyarrow.bool_()),
+        ("event_leaderboard_id", pyarrow.int32()), ("rating_type_id", pyarrow.int32()), ("server", pyarrow.string()),
+        ("started", pyarrow.int64()), ("finished", pyarrow.int64()), ("match_uuid", pyarrow.string()),
+        ("cheats", pyarrow.bool_()), ("full_tech_tree", pyarrow.bool_()), ("ending_age", pyarrow.int32()),
+        ("game_type", pyarrow.int32()), ("lock_speed", pyarrow.bool_()), ("lock_teams", pyarrow.bool_()),
+        ("pop", pyarrow.int32()), ("leaderboard_id", pyarrow.int32()), ("resources", pyarrow.int32()),
+        ("shared_exploration", pyarrow.bool_()), ("speed", pyarrow.int32()), ("starting_age", pyarrow.int32()),
+        ("team_together", pyarrow.bool_()), ("team_positions", pyarrow.bool_()), ("treaty_length", pyarrow.int32()),
+        ("turbo", pyarrow.bool_()), ("victory", pyarrow.int32()), ("victory_time", pyarrow.int32()),
+        ("map_type_name", pyarrow.string()), ("game_type_name", pyarrow.string()),
+        ("leaderboard_name", pyarrow.string()),
+        ("players", pyarrow.list_(_MATCH_HISTORY_PLAYER_TYPE)),
+    ])
+else:
+    LEADERBOARD_SCHEMA = MATCH_HISTORY_SCHEMA = None
+
+
+def _convert(values: List, arrow_type: Any) -> List:
+    """ Helper function which converts the values of a column to the Python type of its Arrow type, if needed. """
+
+    if pyarrow.types.is_string(arrow_type):
+        return [None if value is None else str(value) for value in values]
+    if pyarrow.types.is_integer(arrow_type):
+        return [None if value is None else int(value) for value in values]
+    return values
+
+
+def _int_column(column: Any) -> Any:
+    """ Helper function which wraps an `array("i")` column of a :class:`LeaderboardTable` without copying it. """
+
+    data = pyarrow.Array.from_buffers(pyarrow.int32(), len(column), [None, pyarrow.py_buffer(column)])
+    valid = pyarrow.compute.not_equal(data, LeaderboardTable._MISSING)
+    if valid.false_count == 0:
+        return data
+    return pyarrow.Array.from_buffers(pyarrow.int32(), len(column), [valid.buffers()[1], data.buffers()[1]],
+                                      null_count=valid.false_count, offset=0)
+
+
+def leaderboard_to_record_batch(leaderboard: Union[Leaderboard, LeaderboardTable]) -> "pyarrow.RecordBatch":
+    """
+    Converts the players of a leaderboard (page) into a record batch of `LEADERBOARD_SCHEMA`.
+
+    The numeric columns of a :class:`LeaderboardTable` are not copied: while the returned record batch (or any array
+    taken from it) is alive, the table cannot be extended (`append`/`extend` raise a `BufferError`).
+
+    :raises Aoe2NetException: 'pyarrow' is not installed
+    """
+
+    _check_pyarrow()
+    if not isinstance(leaderboard, LeaderboardTable):
+        table = LeaderboardTable(leaderboard.total, leaderboard.leaderboard_id, leaderboard.start, leaderboard.count)
+        for player in leaderboard.players or ():
+            table.append(player.__dict__)
+        leaderboard = table
+
+    arrays = []
+    for arrow_field in LEADERBOARD_SCHEMA:
+        column = leaderboard.column(arrow_field.name)
+        if arrow_field.name in LeaderboardTable.INT_COLUMNS:
+            arrays.append(_int_column(column))
+        else:
+            arrays.append(pyarrow.array(_convert(column, arrow_field.type), type=arrow_field.type))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=LEADERBOARD_SCHEMA)
+
+
+def match_histories_to_record_batch(matches: List[MatchHistory]) -> "pyarrow.RecordBatch":
+    """
+    Converts the given matches into a record batch of `MATCH_HISTORY_SCHEMA`, with the players as list of structs.
+
+    :raises Aoe2NetException: 'pyarrow' is not installed
+    """
+
+    _check_pyarrow()
+    arrays = []
+    for arrow_field in MATCH_HISTORY_SCHEMA:
+        if arrow_field.name == "players":
+            arrays.append(_players_array(matches))
+            continue
+        values = [getattr(match, arrow_field.name) for match in matches]
+        arrays.append(pyarrow.array(_convert(values, arrow_field.type), type=arrow_field.type))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=MATCH_HISTORY_SCHEMA)
+
+
+def _players_array(matches: List[MatchHistory]) -> Any:
+    """ Helper function which builds the (list of struct) players column of `match_histories_to_record_batch`. """
+
+    offsets, players = [0], []
+    for match in matches:
+        players.extend(match.players or ())
+        offsets.append(len(players))
+    struct = pyarrow.StructArray.from_arrays(
+        [pyarrow.array(_convert([getattr(player, child.name) for player in players], child.type), type=child.type)
+         for child in _MATCH_HISTORY_PLAYER_TYPE],
+        fields=list(_MATCH_HISTORY_PLAYER_TYPE))
+    return pyarrow.ListArray.from_arrays(pyarrow.array(offsets, type=pyarrow.int32()), struct,
+                                         type=pyarrow.list_(_MATCH_HISTORY_PLAYER_TYPE))
+
+
+def iter_leaderboard_record_batches(api,
+                                    leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                                    page_size: int = 10000,
+                                    max_in_flight: int = 4) -> Iterator["pyarrow.RecordBatch"]:
+    """
+    Requests the whole leaderboard page by page (see `API.iter_leaderboard`) and yields one record batch per page.
+
+    Parameters
+    ----------
+    api : `API`
+        The client to request the leaderboard with.
+
+    See `API.iter_leaderboard` for the other parameters.
+
+    :raises Aoe2NetException:
+        'pyarrow' is not installed || 'page_size' has to be between 1 and 10000 || 'max_in_flight' has to be 1 or more
+    """
+
+    _check_pyarrow()
+    for page in api._iter_leaderboard_pages(leaderboard_id, page_size, max_in_flight, columnar=True):
+        yield leaderboard_to_record_batch(page)
+
+
+def iter_match_history_record_batches(api, game: Game,
+                                      steam_id: str = "",
+                                      profile_id: str = "",
+                                      page_size: int = 1000,
+                                      since: Optional[int] = None) -> Iterator["pyarrow.RecordBatch"]:
+    """
+    Requests the whole match history for a player page by page (see `API.iter_match_history`)
+    and yields one record batch per page.
+
+    Parameters
+    ----------
+    api : `API`
+        The client to request the match history with.
+
+    See `API.iter_match_history` for the other parameters.
+
+    :raises Aoe2NetException:
+        'pyarrow' is not installed || 'page_size' has to be between 1 and 1000 ||
+        Either 'steam_id' or 'profile_id' required || 'game' is not valid
+    """
+
+    _check_pyarrow()
+    _check_pagination(page_size, max_page_size=1000)
+    matches = api.iter_match_history(game, steam_id=steam_id, profile_id=profile_id, page_size=page_size, since=since)
+    while True:
+        page = list(islice(matches, page_size))
+        if not page:
+            return
+        yield match_histories_to_record_batch(page)
+
+
+def write_parquet(path: str, batches: Iterable["pyarrow.RecordBatch"], schema: "pyarrow.Schema") -> int:
+    """
+    Writes the given record batches to a Parquet file, batch by batch.
+
+    :param path: the path of the file to write
+    :param batches: the record batches, e.g. of `iter_leaderboard_record_batches`
+    :param schema: the schema of the record batches, e.g. `LEADERBOARD_SCHEMA`
+
+    :returns: the number of rows written
+
+    :raises Aoe2NetException: 'pyarrow' is not installed
+    """
+
+    _check_pyarrow()
+    rows = 0
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_feather(path: str, batches: Iterable["pyarrow.RecordBatch"], schema: "pyarrow.Schema") -> int:
+    """
+    Writes the given record batches to a Feather (Arrow IPC) file, batch by batch. See `write_parquet`.
+
+    :raises Aoe2NetException: 'pyarrow' is not installed
+    """
+
+    _check_pyarrow()
+    rows = 0
+    with pyarrow.ipc.new_file(path, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,354 @@
+"""
+Instrumentation of the requests of the client classes.
+
+- :class:`RequestMetrics` -- the metrics of one call: its time split into phases (DNS lookup, connect, time to first
+  byte, download, JSON decoding and model building), the size of the response body and its status code
+- :class:`Instrumentation` -- passes the metrics of every call to its hooks (callbacks)
+- :class:`PrometheusExporter` -- a hook which aggregates the metrics per endpoint, in the Prometheus text format
+- :class:`OpenTelemetryExporter` -- a hook which records the metrics via an OpenTelemetry (style) meter
+- :class:`ResponseSizes` -- a hook which adds up the compressed and decompressed size of the responses per endpoint
+
+Instrumentation is opt-in per client, e.g. `API(instrumentation=Instrumentation(print))`.
+Clients without it take the same code path as before, so that it costs nothing when disabled.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# the phases of a call, in order
+PHASES = ("dns", "connect", "ttfb", "download", "decode", "build")
+
+
+@dataclass
+class RequestMetrics:
+    """
+    The metrics of one call of a client function (e.g. `get_leaderboard`), passed to the hooks once it is done.
+
+    The phases are in seconds. If a request was retried, they are the ones of the last attempt.
+    The blocking clients measure the DNS lookup as part of 'connect' ('dns' is None).
+    """
+
+    url: str
+    params: Optional[dict] = None
+    status: Optional[int] = None  # the status code of the (last) response, None if none was received
+    attempts: int = 0  # the number of sent requests, 0 if the call was answered from the cache or coalesced
+    cached: bool = False  # answered from the response cache
+    coalesced: bool = False  # answered by an identical request already in flight
+    response_bytes: int = 0  # the size of the (decompressed) response body
+    compressed_bytes: int = 0  # the size of the response body as received, before its decompression
+    content_encoding: Optional[str] = None  # the content encoding of the response (e.g. "gzip"), if compressed
+    dns: Optional[float] = None
+    connect: float = 0.0  # opening a new connection (TCP and TLS handshake), 0 if a pooled connection was reused
+    ttfb: float = 0.0  # sending the request until the response headers were received
+    download: float = 0.0  # receiving the response body
+    decode: float = 0.0  # decoding the JSON response body
+    build: float = 0.0  # building the models from the decoded response
+    total: float = 0.0  # the whole call, including waiting for the rate limiter and retries
+    error: Optional[BaseException] = None  # the exception raised by the call, if any
+
+    @property
+    def endpoint(self) -> str:
+        """ The path of the URL, e.g. "/api/leaderboard". """
+
+        return urlsplit(self.url).path
+
+    @property
+    def phases(self) -> Dict[str, float]:
+        """ The time in seconds per phase (see `PHASES`). """
+
+        return {phase: getattr(self, phase) or 0.0 for phase in PHASES}
+
+    @property
+    def outcome(self) -> str:
+        """ The status code, or "cached", "coalesced" or "error" if no response was received for this call. """
+
+        if self.status is not None:
+            return str(self.status)
+        return "cached" if self.cached else "coalesced" if self.coalesced else "error"
+
+
+# a hook of an `Instrumentation`, called with the metrics of every call
+Hook = Callable[[RequestMetrics], Any]
+
+
+class Instrumentation:
+    """
+    Passes the :class:`RequestMetrics` of every call of the clients it is given to to its hooks, in order.
+    Can be shared between several clients (also asyncio ones).
+
+    The hooks are called in the calling thread (or event loop) right after a call is done, so they should be cheap.
+    Exceptions raised by a hook are not caught.
+
+    Parameters
+    ----------
+    hooks : `callable`
+        The hooks, e.g. a :class:`PrometheusExporter`, called with the :class:`RequestMetrics` of every call.
+    """
+
+    def __init__(self, *hooks: Hook):
+        self.hooks: List[Hook] = list(hooks)
+
+    def add_hook(self, hook: Hook) -> None:
+        """ Adds a hook, called after the ones already added. """
+
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        """ Removes a hook. """
+
+        self.hooks.remove(hook)
+
+    def emit(self, metrics: RequestMetrics) -> None:
+        """ Passes the metrics of a call to all hooks. """
+
+        for hook in self.hooks:
+            hook(metrics)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class PrometheusExporter:
+    """
+    A hook which aggregates the metrics per endpoint and renders them in the Prometheus text exposition format,
+    e.g. to be served on the `/metrics` endpoint of an application (see `render`). Thread-safe.
+
+    - `<namespace>_requests_total{endpoint, status}` -- the number of calls, per status code
+      (or "cached", "coalesced" and "error", see `RequestMetrics.outcome`)
+    - `<namespace>_request_duration_seconds{endpoint}` -- a histogram of the total duration of the calls
+    - `<namespace>_request_phase_seconds_total{endpoint, phase}` -- the time spent per phase
+    - `<namespace>_response_bytes_total{endpoint}` -- the size of the received response bodies (decompressed)
+    - `<namespace>_response_compressed_bytes_total{endpoint}` -- the size of the received response bodies as received
+
+    Parameters
+    ----------
+    namespace : `str`
+        The prefix of the metric names. Defaults to "aoe2net".
+    buckets : `tuple`
+        The upper bounds of the duration histogram buckets in seconds. Defaults to `DEFAULT_BUCKETS`.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, namespace: str = "aoe2net", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], int] = {}
+        self._durations: Dict[str, List] = {}  # per endpoint: [bucket counts..., count, sum]
+        self._phases: Dict[Tuple[str, str], float] = {}
+        self._bytes: Dict[str, int] = {}
+        self._compressed_bytes: Dict[str, int] = {}
+
+    def __call__(self, metrics: RequestMetrics) -> None:
+        endpoint = metrics.endpoint
+        with self._lock:
+            key = (endpoint, metrics.outcome)
+            self._calls[key] = self._calls.get(key, 0) + 1
+
+            histogram = self._durations.setdefault(endpoint, [0] * (len(self.buckets) + 1) + [0.0])
+            for index, bound in enumerate(self.buckets):
+                if metrics.total <= bound:
+                    histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += metrics.total
+
+            for phase, seconds in metrics.phases.items():
+                if seconds:
+                    self._phases[endpoint, phase] = self._phases.get((endpoint, phase), 0.0) + seconds
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + metrics.response_bytes
+            self._compressed_bytes[endpoint] = self._compressed_bytes.get(endpoint, 0) + metrics.compressed_bytes
+
+    def render(self) -> str:
+        """ Returns the aggregated metrics in the Prometheus text exposition format (version 0.0.4). """
+
+        name = self.namespace
+        with self._lock:
+            lines = ["# HELP {}_requests_total The number of calls.".format(name),
+                     "# TYPE {}_requests_total counter".format(name)]
+            for (endpoint, status), count in sorted(self._calls.items()):
+                lines.append('{}_requests_total{{endpoint="{}",status="{}"}} {}'
+                             .format(name, _escape(endpoint), status, count))
+
+            lines += ["# HELP {}_request_duration_seconds The total duration of the calls.".format(name),
+                      "# TYPE {}_request_duration_seconds histogram".format(name)]
+            for endpoint, histogram in sorted(self._durations.items()):
+                labels = 'endpoint="{}"'.format(_escape(endpoint))
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append('{}_request_duration_seconds_bucket{{{},le="{}"}} {}'
+                                 .format(name, labels, bound, count))
+                lines.append('{}_request_duration_seconds_bucket{{{},le="+Inf"}} {}'
+                             .format(name, labels, histogram[-2]))
+                lines.append("{}_request_duration_seconds_count{{{}}} {}".format(name, labels, histogram[-2]))
+                lines.append("{}_request_duration_seconds_sum{{{}}} {}".format(name, labels, histogram[-1]))
+
+            lines += ["# HELP {}_request_phase_seconds_total The time spent per phase of the calls.".format(name),
+                      "# TYPE {}_request_phase_seconds_total counter".format(name)]
+            for (endpoint, phase), seconds in sorted(self._phases.items()):
+                lines.append('{}_request_phase_seconds_total{{endpoint="{}",phase="{}"}} {}'
+                             .format(name, _escape(endpoint), phase, seconds))
+
+            lines += ["# HELP {}_response_bytes_total The size of the received response bodies.".format(name),
+                      "# TYPE {}_response_bytes_total counter".format(name)]
+            for endpoint, size in sorted(self._bytes.items()):
+                lines.append('{}_response_bytes_total{{endpoint="{}"}} {}'.format(name, _escape(endpoint), size))
+
+            lines += ["# HELP {}_response_compressed_bytes_total The size of the received response bodies before "
+                      "their decompression.".format(name),
+                      "# TYPE {}_response_compressed_bytes_total counter".format(name)]
+            for endpoint, size in sorted(self._compressed_bytes.items()):
+                lines.append('{}_response_compressed_bytes_total{{endpoint="{}"}} {}'
+                             .format(name, _escape(endpoint), size))
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryExporter:
+    """
+    A hook which records the metrics via a meter of the OpenTelemetry metrics API
+    (e.g. `opentelemetry.metrics.get_meter("aoe2netapi")`), or any object with the same interface.
+
+    - `<namespace>.requests` -- a counter of the calls, with the attributes `endpoint` and `status`
+    - `<namespace>.request.duration` -- a histogram of the total duration of the calls in seconds
+    - `<namespace>.request.phase.duration` -- a histogram of the phases in seconds, with the attribute `phase`
+    - `<namespace>.response.size` -- a counter of the size of the received response bodies in bytes (decompressed)
+    - `<namespace>.response.compressed_size` -- a counter of the size of the received response bodies in bytes,
+      before their decompression
+
+    Parameters
+    ----------
+    meter : `opentelemetry.metrics.Meter`
+        The meter to create the instruments with.
+    namespace : `str`
+        The prefix of the instrument names. Defaults to "aoe2net".
+    """
+
+    def __init__(self, meter: Any, namespace: str = "aoe2net"):
+        self._calls = meter.create_counter(namespace + ".requests", unit="1", description="The number of calls.")
+        self._duration = meter.create_histogram(namespace + ".request.duration", unit="s",
+                                                description="The total duration of the calls.")
+        self._phases = meter.create_histogram(namespace + ".request.phase.duration", unit="s",
+                                              description="The duration of the phases of the calls.")
+        self._bytes = meter.create_counter(namespace + ".response.size", unit="By",
+                                           description="The size of the received response bodies.")
+        self._compressed_bytes = meter.create_counter(namespace + ".response.compressed_size", unit="By",
+                                                      description="The size of the received response bodies before "
+                                                                  "their decompression.")
+
+    def __call__(self, metrics: RequestMetrics) -> None:
+        attributes = {"endpoint": metrics.endpoint, "status": metrics.outcome}
+        self._calls.add(1, attributes)
+        self._duration.record(metrics.total, attributes)
+        for phase, seconds in metrics.phases.items():
+            if seconds:
+                self._phases.record(seconds, {"endpoint": metrics.endpoint, "phase": phase})
+        if metrics.response_bytes:
+            self._bytes.add(metrics.response_bytes, {"endpoint": metrics.endpoint})
+        if metrics.compressed_bytes:
+            self._compressed_bytes.add(metrics.compressed_bytes, {"endpoint": metrics.endpoint})
+
+
+@dataclass
+class ResponseSize:
+    """ The added up size of the responses of an endpoint, see :class:`ResponseSizes`. """
+
+    responses: int = 0  # the number of received responses
+    compressed_bytes: int = 0  # the size of their bodies as received
+    decompressed_bytes: int = 0  # the size of their bodies after their decompression
+
+    @property
+    def ratio(self) -> float:
+        """ The compression ratio (decompressed / compressed size), 1.0 if nothing was received (yet). """
+
+        return self.decompressed_bytes / self.compressed_bytes if self.compressed_bytes else 1.0
+
+
+class ResponseSizes:
+    """
+    A hook which adds up the size of the received responses per endpoint, as received (compressed) and after their
+    decompression, e.g. to measure the bandwidth a crawler uses. Thread-safe.
+
+    Calls which were answered without receiving a response (cached, coalesced or failed) are not counted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, ResponseSize] = {}
+
+    def __call__(self, metrics: RequestMetrics) -> None:
+        if metrics.status is None:
+            return
+        with self._lock:
+            size = self._sizes.setdefault(metrics.endpoint, ResponseSize())
+            size.responses += 1
+            size.compressed_bytes += metrics.compressed_bytes
+            size.decompressed_bytes += metrics.response_bytes
+
+    def per_endpoint(self) -> Dict[str, ResponseSize]:
+        """ Returns (a copy of) the added up size of the responses per endpoint, e.g. "/api/leaderboard". """
+
+        with self._lock:
+            return {endpoint: ResponseSize(size.responses, size.compressed_bytes, size.decompressed_bytes)
+                    for endpoint, size in sorted(self._sizes.items())}
+
+    def total(self) -> ResponseSize:
+        """ Returns the added up size of the responses of all endpoints. """
+
+        sizes = self.per_endpoint().values()
+        return ResponseSize(sum(size.responses for size in sizes), sum(size.compressed_bytes for size in sizes),
+                            sum(size.decompressed_bytes for size in sizes))
+
+
+""" ------------------------------------- CONNECTION TIMING (blocking clients) -------------------------------------"""
+# the time spent opening new connections is only measured on the sessions of instrumented clients,
+# by pool classes whose connections add it up per (requesting) thread
+
+_connect_times = threading.local()
+
+
+def _take_connect_time() -> float:
+    """ Returns the time spent opening connections in the current thread since the last call, and resets it. """
+
+    connect = getattr(_connect_times, "seconds", 0.0)
+    _connect_times.seconds = 0.0
+    return connect
+
+
+class _TimedConnectMixin:
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_times.seconds = getattr(_connect_times, "seconds", 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """ A :class:`requests.adapters.HTTPAdapter` whose connections measure the time it takes to open them. """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
@@ -0,0 +1,65 @@
+"""
+Pluggable JSON decoding of the request responses.
+
+The fastest installed backend is used by default: `orjson`, `simdjson` (pysimdjson), `ujson` and finally the stdlib
+`json`, which is always available. A backend can also be chosen per client instance via the 'json_backend' argument.
+
+See `python -m benchmarks.json_benchmark` for a comparison of the installed backends.
+"""
+import importlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# the backends in the order of preference, see `get_json_backend`
+JSON_BACKENDS = ("orjson", "simdjson", "ujson", "json")
+
+
+@dataclass(frozen=True)
+class JsonBackend:
+    """ A JSON decoder: its name and its function to decode a (UTF-8 encoded) response body. """
+
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+
+
+_loaded: Dict[str, Optional[JsonBackend]] = {"json": JsonBackend("json", json.loads)}
+
+
+def _load(name: str) -> Optional[JsonBackend]:
+    """ Helper function which imports the given backend (once), or returns None if it is not installed. """
+
+    if name not in _loaded:
+        try:
+            _loaded[name] = JsonBackend(name, importlib.import_module(name).loads)
+        except ImportError:
+            _loaded[name] = None
+    return _loaded[name]
+
+
+def available_json_backends() -> List[str]:
+    """ Returns the names of the installed backends, in the order of preference. """
+
+    return [name for name in JSON_BACKENDS if _load(name) is not None]
+
+
+def get_json_backend(name: Optional[str] = None) -> JsonBackend:
+    """
+    Returns the given JSON backend.
+
+    :param name: one of `JSON_BACKENDS`, or None for the fastest installed one
+
+    :returns: the :class:`JsonBackend`
+
+    :raises ValueError: the given backend is not known or not installed
+    """
+
+    if name is None:
+        return _load(available_json_backends()[0])
+
+    if name not in JSON_BACKENDS:
+        raise ValueError("'json_backend' has to be one of {}.".format(", ".join(JSON_BACKENDS)))
+    backend = _load(name)
+    if backend is None:
+        raise ValueError("The JSON backend '{}' is not installed.".format(name))
+    return backend
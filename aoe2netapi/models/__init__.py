@@ -1,10 +1,12 @@
-from .strings import Strings
-from .leaderboard import Leaderboard, LeaderboardPlayer
-from .matchhistory import MatchHistory, MatchHistoryPlayer
+from .strings import Strings, StringsIndex
+from .leaderboard import Leaderboard, LeaderboardPlayer, LeaderboardTable
+from .matchhistory import MatchHistory, MatchHistoryPlayer, LazyMatchHistory
 from .ratinghistory import RatingHistory, RatingHistoryItem
+from .batch import BatchResult
 
 __all__ = [
-    "Strings", "Leaderboard", "LeaderboardPlayer",
-    "MatchHistory", "MatchHistoryPlayer",
-    "RatingHistory", "RatingHistoryItem"
+    "Strings", "StringsIndex", "Leaderboard", "LeaderboardPlayer", "LeaderboardTable",
+    "MatchHistory", "MatchHistoryPlayer", "LazyMatchHistory",
+    "RatingHistory", "RatingHistoryItem",
+    "BatchResult"
 ]
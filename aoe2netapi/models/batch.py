@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from typing import Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    """
+    The result of a batch request for several players (e.g. `API.get_rating_histories`).
+    The results and errors are mapped to the profile ID they were requested for.
+    """
+
+    results: Dict[str, T] = field(default_factory=dict)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """ True if the request for every player succeeded. """
+
+        return not self.errors
@@ -1,5 +1,6 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Any
+from array import array
+from dataclasses import dataclass, field, fields
+from typing import List, Optional, Any, Dict, Iterator, Union, Tuple
 
 from dataclasses_json import dataclass_json, Undefined, config
 
@@ -40,3 +41,177 @@ class Leaderboard:
     game: str = ""  # defaulting here, will be populated after creation
     # or use 'event_leaderboard_id: Optional[int] = None' and remove 'field' from leaderboard_id
     is_event_leaderboard: bool = False  # defaulting here, will be populated after creation
+
+
+class LeaderboardTable:
+    """
+    A memory-efficient, columnar representation of a :class:`Leaderboard`.
+
+    The numeric player properties (rank, rating, wins, losses, games, ...) are stored in typed `array` columns,
+    all other properties in one list per property - instead of one :class:`LeaderboardPlayer` (with its own `__dict__`)
+    per player.
+
+    The players are still accessible as :class:`LeaderboardPlayer` objects, which are built on access
+    (`table[0]`, `for player in table`, ...), and each column can be accessed directly via `column(name)`.
+
+    The numeric columns are exported to Arrow without copying them (see `aoe2netapi.export`), so a table cannot be
+    extended while a record batch of it is alive.
+    """
+
+    # 'array' has no notion of None, missing values are stored as the smallest 32-bit integer instead
+    _MISSING = -2 ** 31
+    COLUMNS = tuple(f.name for f in fields(LeaderboardPlayer))
+    INT_COLUMNS = ("rank", "rating", "previous_rating", "highest_rating", "streak", "lowest_streak",
+                   "highest_streak", "games", "wins", "losses", "drops")
+    _OBJECT_COLUMNS = ("profile_id", "steam_id", "icon", "name", "clan", "country", "last_match_time")
+
+    def __init__(self,
+                 total: int,
+                 leaderboard_id: Optional[int],
+                 start: int,
+                 count: int,
+                 game: str = "",
+                 is_event_leaderboard: bool = False):
+        self.total = total
+        self.leaderboard_id = leaderboard_id
+        self.start = start
+        self.count = count
+        self.game = game
+        self.is_event_leaderboard = is_event_leaderboard
+        self._columns: Dict[str, Union[array, list]] = {
+            name: array("i") if name in self.INT_COLUMNS else [] for name in self.COLUMNS
+        }
+
+    def __repr__(self) -> str:
+        return "LeaderboardTable(total={}, leaderboard_id={}, start={}, count={}, players=<{} rows>, game='{}', " \
+               "is_event_leaderboard={})".format(self.total, self.leaderboard_id, self.start, self.count, len(self),
+                                                 self.game, self.is_event_leaderboard)
+
+    def __len__(self) -> int:
+        return len(self._columns["rank"])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[LeaderboardPlayer, List[LeaderboardPlayer]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return self.row_to_player(tuple(column[index] for column in self._columns.values()))
+
+    def __iter__(self) -> Iterator[LeaderboardPlayer]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def players(self) -> List[LeaderboardPlayer]:
+        """ All players as :class:`LeaderboardPlayer` objects. Note: materializes every row. """
+
+        return self[:]
+
+    def rows(self) -> Iterator[Tuple]:
+        """
+        Yields the raw rows of this table as tuples (in the order of `COLUMNS`), without building any player objects.
+
+        Missing numeric values are stored as `-2 ** 31`, see `row_to_player` and `player_to_row`.
+        """
+
+        return zip(*self._columns.values())
+
+    @classmethod
+    def row_to_player(cls, row: Tuple) -> LeaderboardPlayer:
+        """ Builds the :class:`LeaderboardPlayer` of a raw row (see `rows`). """
+
+        missing = cls._MISSING
+        player = object.__new__(LeaderboardPlayer)
+        values = dict(zip(cls.COLUMNS, row))
+        for name in cls.INT_COLUMNS:
+            if values[name] == missing:
+                values[name] = None
+        player.__dict__ = values
+        return player
+
+    @classmethod
+    def player_to_row(cls, player: LeaderboardPlayer) -> Tuple:
+        """ Builds the raw row (see `rows`) of a :class:`LeaderboardPlayer`. """
+
+        missing = cls._MISSING
+        return tuple(missing if value is None and name in cls.INT_COLUMNS else value
+                     for name, value in ((name, getattr(player, name)) for name in cls.COLUMNS))
+
+    def column(self, name: str) -> Union[array, list]:
+        """
+        Returns the column of the given player property, e.g. `column("rating")`.
+
+        The numeric properties (see `INT_COLUMNS`) are returned as `array("i")`,
+        in which missing values are stored as `-2 ** 31`.
+
+        :raises KeyError: the given property does not exist
+        """
+
+        return self._columns[name]
+
+    def append(self, player: Dict) -> None:
+        """ Appends a player, given as a (request response) `dict`. """
+
+        get = player.get
+        missing = self._MISSING
+        columns = self._columns
+        for name in self.INT_COLUMNS:  # first, so that nothing is appended if they are exported (and cannot resize)
+            value = get(name)
+            columns[name].append(missing if value is None else value)
+        for name in self._OBJECT_COLUMNS:
+            columns[name].append(get(name))
+
+    def extend(self, other: "LeaderboardTable") -> None:
+        """ Appends all players of another table (e.g. the next page of the same leaderboard). """
+
+        for name in self.INT_COLUMNS + self._OBJECT_COLUMNS:  # the (exported) arrays first, see `append`
+            self._columns[name].extend(other._columns[name])
+
+    def to_leaderboard(self) -> Leaderboard:
+        """ Materializes this table as a regular :class:`Leaderboard`. """
+
+        return Leaderboard(total=self.total, leaderboard_id=self.leaderboard_id, start=self.start, count=self.count,
+                           players=self.players, game=self.game, is_event_leaderboard=self.is_event_leaderboard)
+
+
+""" Fast-path decoding, bypassing the generic (reflection based) decoding of `dataclasses_json`. """
+
+_LEADERBOARD_PLAYER_FIELDS = tuple(f.name for f in fields(LeaderboardPlayer))
+
+
+def _decode_leaderboard_player(data: dict) -> LeaderboardPlayer:
+    """ Equivalent to `LeaderboardPlayer.from_dict(data, infer_missing=True)`. """
+
+    player = object.__new__(LeaderboardPlayer)
+    get = data.get
+    player.__dict__ = {name: get(name) for name in _LEADERBOARD_PLAYER_FIELDS}
+    return player
+
+
+def _decode_leaderboard(data: dict) -> Leaderboard:
+    """ Equivalent to `Leaderboard.from_dict(data, infer_missing=True)`. """
+
+    players = data.get("leaderboard")
+    leaderboard = object.__new__(Leaderboard)
+    # falls back to 'leaderboard_id' if 'event_leaderboard_id' is not present, see the 'Leaderboard' dataclass
+    leaderboard_id = data["event_leaderboard_id"] if "event_leaderboard_id" in data else data.get("leaderboard_id")
+    leaderboard.__dict__ = {
+        "total": data.get("total"),
+        "leaderboard_id": leaderboard_id,
+        "start": data.get("start"),
+        "count": data.get("count"),
+        "players": None if players is None else [_decode_leaderboard_player(player) for player in players],
+        "game": data.get("game", ""),
+        "is_event_leaderboard": data.get("is_event_leaderboard", False),
+    }
+    return leaderboard
+
+
+def _decode_leaderboard_table(data: dict) -> LeaderboardTable:
+    """ Decodes a `/leaderboard` request response directly into a :class:`LeaderboardTable`. """
+
+    leaderboard_id = data["event_leaderboard_id"] if "event_leaderboard_id" in data else data.get("leaderboard_id")
+    table = LeaderboardTable(total=data.get("total"), leaderboard_id=leaderboard_id, start=data.get("start"),
+                             count=data.get("count"))
+    for player in data.get("leaderboard") or ():
+        table.append(player)
+    return table
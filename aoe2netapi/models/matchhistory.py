@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Optional, Any, List
 from uuid import UUID
 
@@ -21,6 +21,8 @@ class MatchHistoryPlayer:
     civ: Optional[int]
     won: Optional[bool]
 
+    civ_name: Optional[str] = None  # populated via `Strings.enrich(...)`
+
 
 @dataclass_json(undefined=Undefined.EXCLUDE)
 @dataclass
@@ -74,3 +76,102 @@ class MatchHistory:
 
     # shared property
     players: List[MatchHistoryPlayer] = field(default_factory=list)
+
+    # populated via `Strings.enrich(...)`
+    map_type_name: Optional[str] = None
+    game_type_name: Optional[str] = None
+    leaderboard_name: Optional[str] = None
+
+
+""" Fast-path decoding, bypassing the generic (reflection based) decoding of `dataclasses_json`. """
+
+_MATCH_HISTORY_PLAYER_FIELDS = tuple(f.name for f in fields(MatchHistoryPlayer))
+# 'unknown' (CatchAll) stays None, as `Undefined.EXCLUDE` drops unknown properties, and 'players' is decoded separately
+_MATCH_HISTORY_FIELDS = tuple(f.name for f in fields(MatchHistory)
+                              if f.name not in ("unknown", "players", "match_uuid"))
+
+
+def _decode_match_history_player(data: dict) -> MatchHistoryPlayer:
+    """ Equivalent to `MatchHistoryPlayer.from_dict(data, infer_missing=True)`. """
+
+    player = object.__new__(MatchHistoryPlayer)
+    get = data.get
+    player.__dict__ = {name: get(name) for name in _MATCH_HISTORY_PLAYER_FIELDS}
+    return player
+
+
+def _decode_match_history(data: dict) -> MatchHistory:
+    """ Equivalent to `MatchHistory.from_dict(data, infer_missing=True)`. """
+
+    match = object.__new__(MatchHistory)
+    get = data.get
+    values = {name: get(name) for name in _MATCH_HISTORY_FIELDS}
+    match_uuid = get("match_uuid")
+    values["match_uuid"] = UUID(match_uuid) if isinstance(match_uuid, str) else match_uuid
+    values["unknown"] = None
+    players = get("players", ())  # a missing list is empty (its default), but null stays None (like in `from_dict`)
+    values["players"] = None if players is None else [_decode_match_history_player(player) for player in players]
+    match.__dict__ = values
+    return match
+
+
+class LazyMatchHistory(MatchHistory):
+    """
+    A :class:`MatchHistory` which keeps the decoded JSON of the match and only builds a property on first access,
+    e.g. the parsed `match_uuid` or the :class:`MatchHistoryPlayer` objects of `players`.
+    Returned by `get_match_history(...)`, so that reading a few properties of many matches stays cheap.
+
+    Behaves exactly like (and compares equal to) the result of `MatchHistory.from_dict(data, infer_missing=True)`.
+    """
+
+    def __getattr__(self, name: str) -> Any:  # only called for the properties not built yet
+        data = self.__dict__.get("_data")
+        if data is None or name not in _LAZY_FIELDS:
+            raise AttributeError(name)
+
+        if name == "match_uuid":
+            value = data.get(name)
+            value = UUID(value) if isinstance(value, str) else value
+        elif name == "players":
+            players = data.get(name, ())  # see `_decode_match_history`
+            value = None if players is None else [_decode_match_history_player(player) for player in players]
+        elif name == "unknown":
+            value = None
+        else:
+            value = data.get(name)
+        self.__dict__[name] = value
+        return value
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, MatchHistory):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _LAZY_FIELDS)
+
+    __hash__ = None
+
+
+_LAZY_FIELDS = frozenset(f.name for f in fields(MatchHistory))
+# the properties with a (class level) default, which are not looked up via `__getattr__` and thus copied right away
+_DEFAULTED_FIELDS = tuple(f.name for f in fields(MatchHistory) if f.name in vars(MatchHistory))
+
+
+def _decode_lazy_match_history(data: dict) -> LazyMatchHistory:
+    """ Equivalent to `MatchHistory.from_dict(data, infer_missing=True)`, but builds the properties on first access. """
+
+    match = object.__new__(LazyMatchHistory)
+    values = match.__dict__
+    values["_data"] = data
+    for name in _DEFAULTED_FIELDS:
+        if name in data:
+            values[name] = data[name]
+    return match
+
+
+def _encode_match_history(match: MatchHistory) -> dict:
+    """ The inverse of `_decode_match_history`: builds the (JSON serializable) request response `dict` of a match. """
+
+    data = {name: getattr(match, name) for name in _MATCH_HISTORY_FIELDS}
+    data["match_uuid"] = None if match.match_uuid is None else str(match.match_uuid)
+    data["players"] = None if match.players is None else \
+        [{name: getattr(player, name) for name in _MATCH_HISTORY_PLAYER_FIELDS} for player in match.players]
+    return data
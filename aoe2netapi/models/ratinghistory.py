@@ -1,10 +1,13 @@
-from dataclasses import dataclass
-from typing import List, Dict, Union
+from dataclasses import dataclass, fields
+from typing import List, Dict, Union, TYPE_CHECKING
 
 from dataclasses_json import dataclass_json, Undefined
 
 from aoe2netapi.constants import LeaderboardId, EventLeaderboardId
 
+if TYPE_CHECKING:
+    from aoe2netapi.analytics import RatingArrays
+
 
 @dataclass_json(undefined=Undefined.EXCLUDE)
 @dataclass
@@ -31,4 +34,29 @@ class RatingHistory:
         self.game = leaderboard_id.value.game
         self.leaderboard_id = leaderboard_id.value.aoe2net_id
         self.is_event_leaderboard = is_event_leaderboard
-        self.ratings = [RatingHistoryItem.from_dict(rating) for rating in ratings]
+        self.ratings = [_decode_rating_history_item(rating) for rating in ratings]
+
+    def to_arrays(self) -> "RatingArrays":
+        """
+        Returns the ratings as typed NumPy arrays, in chronological order.
+        See :class:`aoe2netapi.analytics.RatingArrays`.
+        Requires the optional dependency `numpy` (`pip install aoe2netapi-wrapper[numpy]`).
+
+        :raises Aoe2NetException: 'numpy' is not installed
+        """
+
+        from aoe2netapi.analytics import _to_rating_arrays  # imported lazily, as 'numpy' is optional
+        return _to_rating_arrays(self.ratings)
+
+
+""" Fast-path decoding, bypassing the generic (reflection based) decoding of `dataclasses_json`. """
+
+_RATING_HISTORY_ITEM_FIELDS = tuple(f.name for f in fields(RatingHistoryItem))
+
+
+def _decode_rating_history_item(data: dict) -> RatingHistoryItem:
+    """ Equivalent to `RatingHistoryItem.from_dict(data)`. """
+
+    item = object.__new__(RatingHistoryItem)
+    item.__dict__ = {name: data[name] for name in _RATING_HISTORY_ITEM_FIELDS}
+    return item
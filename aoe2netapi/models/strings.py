@@ -1,8 +1,10 @@
-from dataclasses import dataclass, field
-from typing import List, NamedTuple
+from dataclasses import dataclass, field, fields
+from typing import List, NamedTuple, Dict, Optional, Iterable
 
 from dataclasses_json import dataclass_json, Undefined, config
 
+from .matchhistory import MatchHistory
+
 
 @dataclass_json
 @dataclass
@@ -26,3 +28,100 @@ class Strings:
     speed: List[StringsItem]
     victory: List[StringsItem]
     visibility: List[StringsItem]
+
+    @property
+    def index(self) -> "StringsIndex":
+        """ The lookup index of these strings, built on first access. """
+
+        index = self.__dict__.get("_index")
+        if index is None:
+            index = self.__dict__["_index"] = StringsIndex(self)
+        return index
+
+    def lookup(self, category: str, id: Optional[int]) -> Optional[str]:
+        """ See :meth:`StringsIndex.lookup`. """
+
+        return self.index.lookup(category, id)
+
+    def civ_name(self, id: Optional[int]) -> Optional[str]:
+        """ Returns the name of the given civilization ID, or None if unknown. """
+
+        return self.index.lookup("civ", id)
+
+    def map_type_name(self, id: Optional[int]) -> Optional[str]:
+        """ Returns the name of the given map type ID, or None if unknown. """
+
+        return self.index.lookup("map_type", id)
+
+    def enrich(self, matches: Iterable[MatchHistory]) -> None:
+        """ See :meth:`StringsIndex.enrich`. """
+
+        self.index.enrich(matches)
+
+
+class StringsIndex:
+    """
+    A lookup index of :class:`Strings`, mapping the IDs of each category (`civ`, `map_type`, ...) to their strings.
+
+    Parameters
+    ----------
+    strings : :class:`Strings`
+        The strings to build the index of.
+    """
+
+    def __init__(self, strings: Strings):
+        self.language = strings.language
+        self._categories: Dict[str, Dict[int, str]] = {
+            category: {item.id: item.value for item in getattr(strings, category)} for category in _STRINGS_CATEGORIES
+        }
+
+    def lookup(self, category: str, id: Optional[int]) -> Optional[str]:
+        """
+        Returns the string of the given ID of a category, e.g. `lookup("map_type", 29)`.
+
+        :return:
+            the string, or None if the ID is unknown
+
+        :raises KeyError: the given category does not exist
+        """
+
+        return self._categories[category].get(id)
+
+    def enrich(self, matches: Iterable[MatchHistory]) -> None:
+        """
+        Resolves the IDs of the given matches to their strings, in place:
+        `map_type_name`, `game_type_name` and `leaderboard_name` of each match, as well as `civ_name` of each player.
+        """
+
+        map_types, game_types = self._categories["map_type"], self._categories["game_type"]
+        leaderboards, civs = self._categories["leaderboard"], self._categories["civ"]
+        for match in matches:
+            match.map_type_name = map_types.get(match.map_type)
+            match.game_type_name = game_types.get(match.game_type)
+            match.leaderboard_name = leaderboards.get(match.leaderboard_id)
+            for player in match.players or ():
+                player.civ_name = civs.get(player.civ)
+
+
+""" Fast-path decoding, bypassing the generic (reflection based) decoding of `dataclasses_json`. """
+
+_STRINGS_CATEGORIES = tuple(f.name for f in fields(Strings) if f.name != "language")
+
+
+def _decode_strings_item(data: dict) -> StringsItem:
+    """ Equivalent to `StringsItem.from_dict(data)`. """
+
+    item = object.__new__(StringsItem)
+    item.__dict__ = {"id": data["id"], "value": data["string"]}
+    return item
+
+
+def _decode_strings(data: dict) -> Strings:
+    """ Equivalent to `Strings.from_dict(data)`. """
+
+    strings = object.__new__(Strings)
+    values = {"language": data["language"]}
+    for category in _STRINGS_CATEGORIES:
+        values[category] = [_decode_strings_item(item) for item in data[category]]
+    strings.__dict__ = values
+    return strings
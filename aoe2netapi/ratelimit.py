@@ -0,0 +1,161 @@
+"""
+Client-side rate limiting and retries for the client classes.
+
+- :class:`RateLimiter` -- a token bucket, shared across threads and asyncio tasks, with priority lanes
+  (e.g. interactive `Nightbot` calls are served before bulk leaderboard crawls)
+- :class:`RetryPolicy` -- retries of failed requests (e.g. 429 or 5xx) with jittered exponential backoff,
+  honoring the `Retry-After` response header
+"""
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Optional, Tuple
+
+
+class Priority(IntEnum):
+    """ The priority lanes of a :class:`RateLimiter`. A lower value is served first. """
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class RateLimiter:
+    """
+    A token bucket rate limiter with priority lanes. Thread-safe and usable from asyncio tasks at the same time.
+
+    A request of a lane only gets a token if no request of a more urgent lane is waiting.
+
+    Parameters
+    ----------
+    rate : `float`
+        The number of requests allowed per second.
+    burst : `int`
+        The maximum number of requests allowed at once (the bucket size). Defaults to 1.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0 or burst < 1:
+            raise ValueError("'rate' has to be positive and 'burst' has to be 1 or more.")
+
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = [0] * len(Priority)
+
+    def pause(self, seconds: float) -> None:
+        """ Hands out no tokens for the given time, e.g. after the server answered with a 429 (Too Many Requests). """
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _try_acquire(self, priority: Priority) -> float:
+        """ Takes a token, if available. Returns 0 on success, otherwise the time to wait before trying again. """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1 and not any(self._waiting[:priority]):
+                self._tokens -= 1
+                return 0.0
+            return max(1 - self._tokens, 0.1) / self.rate  # waits at least a fraction of a token if outranked
+
+    def _set_waiting(self, priority: Priority, delta: int) -> None:
+        with self._lock:
+            self._waiting[priority] += delta
+
+    def acquire(self, priority: Priority = Priority.NORMAL) -> None:
+        """ Blocks until a token is available for a request of the given priority. """
+
+        wait = self._try_acquire(priority)
+        if not wait:
+            return
+
+        self._set_waiting(priority, 1)
+        try:
+            while wait:
+                time.sleep(wait)
+                wait = self._try_acquire(priority)
+        finally:
+            self._set_waiting(priority, -1)
+
+    async def acquire_async(self, priority: Priority = Priority.NORMAL) -> None:
+        """ Waits (without blocking the event loop) until a token is available for a request of the given priority. """
+
+        wait = self._try_acquire(priority)
+        if not wait:
+            return
+
+        self._set_waiting(priority, 1)
+        try:
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self._try_acquire(priority)
+        finally:
+            self._set_waiting(priority, -1)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Helper function to parse the value of a `Retry-After` response header (either seconds or an HTTP date).
+
+    :returns: the number of seconds to wait, or None if not given (or not parsable)
+    """
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    The retry policy of failed requests: connection errors, timeouts and the given response status codes are retried
+    with a jittered exponential backoff. A `Retry-After` response header takes precedence over the backoff, but is
+    capped at `max_backoff` as well.
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5  # the backoff of the n-th retry is 'backoff_factor * 2 ** n' seconds
+    max_backoff: float = 60.0
+    jitter: bool = True  # waits a random time between half and the full backoff
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def backoff(self, attempt: int) -> float:
+        """ Returns the backoff in seconds before the given retry (starting at 0). """
+
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2) if self.jitter else backoff
+
+    def delay(self, attempt: int, status: Optional[int] = None, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Returns the time in seconds to wait before the given retry (starting at 0) of a failed request.
+
+        :param attempt: the number of retries done so far
+        :param status: the response status code, or None for connection errors and timeouts
+        :param retry_after: the value of the `Retry-After` response header, if any
+
+        :returns: the time to wait, or None if the request should not be retried
+        """
+
+        if attempt >= self.max_retries or (status is not None and status not in self.retry_statuses):
+            return None
+        retry_after_seconds = _parse_retry_after(retry_after)
+        return self.backoff(attempt) if retry_after_seconds is None else min(self.max_backoff, retry_after_seconds)
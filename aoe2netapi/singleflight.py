@@ -0,0 +1,108 @@
+"""
+Request coalescing ("single-flight") for the client classes.
+
+Concurrent calls with the same key (the request URL plus its normalized parameters) share one in-flight request:
+the first call sends the request, all others wait for it and receive its result (or its exception).
+"""
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Awaitable, Optional
+
+
+@dataclass
+class SingleFlightStats:
+    """ The statistics of a single-flight group. """
+
+    requests: int = 0  # the number of requests actually sent
+    collapsed: int = 0  # the number of calls which were served by an already in-flight request
+
+
+class _Call:
+    """ An in-flight call of a :class:`SingleFlight` group. """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """ A single-flight group for threaded use. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = SingleFlightStats()
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """ The current statistics of this group. """
+
+        with self._lock:
+            return SingleFlightStats(requests=self._stats.requests, collapsed=self._stats.collapsed)
+
+    def do(self, key: str, function: Callable[[], Any]) -> Any:
+        """
+        Calls 'function', unless a call with the same key is already in flight, whose result is returned instead.
+
+        :raises Exception: the exception raised by the (shared) call
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+                self._stats.requests += 1
+            else:
+                self._stats.collapsed += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """ A single-flight group for asyncio use (within one event loop). """
+
+    def __init__(self):
+        self._calls: Dict[str, "asyncio.Future"] = {}
+        self._stats = SingleFlightStats()
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """ The current statistics of this group. """
+
+        return SingleFlightStats(requests=self._stats.requests, collapsed=self._stats.collapsed)
+
+    async def do(self, key: str, function: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Awaits 'function()', unless a call with the same key is already in flight, whose result is returned instead.
+
+        A cancelled caller does not cancel the shared call for the other callers.
+
+        :raises Exception: the exception raised by the (shared) call
+        """
+
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self._calls.pop(key) if self._calls.get(key) is done else None)
+            self._stats.requests += 1
+        else:
+            self._stats.collapsed += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,173 @@
+"""
+A local, persistent (sqlite) store of match histories, to answer questions about already requested matches offline.
+
+The matches are deduplicated by their match ID and UUID, and indexed by player ('profile_id'), civilization,
+map type, leaderboard and start time.
+"""
+import json
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+from aoe2netapi.models import MatchHistory
+from aoe2netapi.models.matchhistory import _decode_lazy_match_history, _encode_match_history
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS matches (match_id TEXT PRIMARY KEY, match_uuid TEXT UNIQUE, map_type INTEGER, "
+    "leaderboard_id INTEGER, started INTEGER, data TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS match_players (match_id TEXT NOT NULL REFERENCES matches (match_id) ON DELETE CASCADE, "
+    "profile_id TEXT, civ INTEGER)",
+    "CREATE INDEX IF NOT EXISTS matches_map_type ON matches (map_type)",
+    "CREATE INDEX IF NOT EXISTS matches_leaderboard_id ON matches (leaderboard_id)",
+    "CREATE INDEX IF NOT EXISTS matches_started ON matches (started)",
+    "CREATE INDEX IF NOT EXISTS match_players_match_id ON match_players (match_id)",
+    "CREATE INDEX IF NOT EXISTS match_players_profile_id ON match_players (profile_id, civ)",
+    "CREATE INDEX IF NOT EXISTS match_players_civ ON match_players (civ)",
+)
+
+
+def _to_int(value) -> Optional[int]:
+    """ Helper function which converts an (API) timestamp or ID to `int`, if given. """
+
+    return None if value is None else int(value)
+
+
+class MatchStore:
+    """
+    A local, persistent (sqlite) store of :class:`MatchHistory` objects. Thread-safe.
+
+    Parameters
+    ----------
+    path : `str`
+        The path to the sqlite database file. Defaults to ":memory:" (not persistent).
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def __enter__(self) -> "MatchStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ Closes the connection to the database file. """
+
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def __contains__(self, match_id: str) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM matches WHERE match_id = ?",
+                                            (str(match_id),)).fetchone() is not None
+
+    def add(self, matches: Iterable[MatchHistory]) -> int:
+        """
+        Stores the given matches, e.g. the result of `API.get_match_history`.
+
+        A match which is already stored (same match ID or UUID) is replaced, e.g. by its finished state.
+
+        :return:
+            the number of matches which were not stored before
+        """
+
+        added = 0
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for match in matches:
+                    match_id = str(match.match_id)
+                    match_uuid = None if match.match_uuid is None else str(match.match_uuid)
+                    replaced = connection.execute("DELETE FROM matches WHERE match_id = ? OR match_uuid = ?",
+                                                  (match_id, match_uuid)).rowcount
+                    added += not replaced
+                    connection.execute("INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?)",
+                                       (match_id, match_uuid, match.map_type, match.leaderboard_id,
+                                        _to_int(match.started), json.dumps(_encode_match_history(match))))
+                    connection.executemany("INSERT INTO match_players VALUES (?, ?, ?)",
+                                           [(match_id, None if player.profile_id is None else str(player.profile_id),
+                                             player.civ) for player in match.players or ()])
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return added
+
+    def get(self, match_id: str) -> Optional[MatchHistory]:
+        """ Returns the stored match with the given ID, or None if not stored. """
+
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM matches WHERE match_id = ?", (str(match_id),)).fetchone()
+        return None if row is None else _decode_lazy_match_history(json.loads(row[0]))
+
+    def query(self,
+              profile_id: Optional[str] = None,
+              civ: Optional[int] = None,
+              map_type: Optional[int] = None,
+              leaderboard_id: Optional[int] = None,
+              since: Optional[int] = None,
+              until: Optional[int] = None,
+              limit: Optional[int] = None) -> List[MatchHistory]:
+        """
+        Returns the stored matches matching all of the given filters, most recent match first.
+
+        Parameters
+        ----------
+        profile_id : `str`
+            Only matches of this player.
+        civ : `int`
+            Only matches in which this civilization was played (by the player of 'profile_id', if given).
+        map_type : `int`
+            Only matches on this map type.
+        leaderboard_id : `int`
+            Only matches of this leaderboard, e.g. `LeaderboardId.AOE_TWO_RM.value`.
+        since : `int`
+            Only matches started at or after this (unix) timestamp.
+        until : `int`
+            Only matches started before this (unix) timestamp.
+        limit : `int`
+            The maximum number of matches to return. Defaults to None (all).
+
+        :return:
+            a list of :class:`MatchHistory`
+        """
+
+        conditions, params = [], []
+        if profile_id is not None or civ is not None:
+            player_conditions = ["p.match_id = m.match_id"]
+            if profile_id is not None:
+                player_conditions.append("p.profile_id = ?")
+                params.append(str(profile_id))
+            if civ is not None:
+                player_conditions.append("p.civ = ?")
+                params.append(civ)
+            conditions.append("EXISTS (SELECT 1 FROM match_players p WHERE {})".format(" AND ".join(player_conditions)))
+        for column, operator, value in (("map_type", "=", map_type), ("leaderboard_id", "=", leaderboard_id),
+                                         ("started", ">=", since), ("started", "<", until)):
+            if value is not None:
+                conditions.append("m.{} {} ?".format(column, operator))
+                params.append(value)
+
+        sql = "SELECT m.data FROM matches m"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY m.started DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [_decode_lazy_match_history(json.loads(data)) for data, in rows]
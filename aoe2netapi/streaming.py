@@ -0,0 +1,155 @@
+"""
+Incremental (streaming) parsing of JSON request responses.
+
+:class:`_JsonArrayStream` is fed the response body chunk by chunk and returns the items of one top-level array
+(e.g. the `leaderboard` of a `/leaderboard` response) as soon as they are complete, instead of parsing the whole body
+at once. Uses `ijson` (with its C backend) if installed, otherwise an iterative parser based on the stdlib `json`.
+"""
+import codecs
+import json
+from typing import Any, List, Optional
+
+try:
+    import ijson
+except ImportError:  # optional dependency
+    ijson = None
+
+from aoe2netapi.aoe2 import Aoe2NetException
+
+_WHITESPACE = " \t\r\n"
+_SEPARATORS = ",:]}" + _WHITESPACE
+
+# the states of the stdlib parser
+_OBJECT, _KEY, _COLON, _VALUE, _ITEMS, _DONE = range(6)
+
+
+class _JsonArrayStream:
+    """
+    An incremental parser of the items of the array at a top-level key of a JSON object.
+
+    Parameters
+    ----------
+    key : `str`
+        The top-level key of the array.
+    use_ijson : `bool`
+        Whether to use `ijson`. Defaults to None (if installed).
+    """
+
+    def __init__(self, key: str, use_ijson: Optional[bool] = None):
+        self.key = key
+        self._use_ijson = ijson is not None if use_ijson is None else use_ijson
+        if self._use_ijson:
+            self._items = ijson.sendable_list()
+            self._coroutine = ijson.items_coro(self._items, key + ".item", use_float=True)
+        else:
+            self._decoder = json.JSONDecoder()
+            self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+            self._buffer = ""
+            self._state = _OBJECT
+
+    @property
+    def done(self) -> bool:
+        """ Whether the array is complete, i.e. the rest of the response body does not have to be fed anymore. """
+
+        return not self._use_ijson and self._state == _DONE
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """ Parses the next chunk of the response body and returns the array items completed by it. """
+
+        if self._use_ijson:
+            try:
+                self._coroutine.send(chunk)
+            except ijson.JSONError as error:
+                raise Aoe2NetException("The response is not valid JSON: {}".format(error)) from error
+            items = list(self._items)
+            del self._items[:]
+            return items
+
+        if self._state == _DONE:
+            return []
+        self._buffer += self._text_decoder.decode(chunk)
+        return self._parse()
+
+    def close(self) -> None:
+        """
+        Finishes the parsing, once the whole response body was fed.
+
+        :raises Aoe2NetException: the response ended before the array was complete
+        """
+
+        if self._use_ijson:
+            try:
+                self._coroutine.close()
+            except ijson.JSONError as error:
+                raise Aoe2NetException("The response is not valid JSON: {}".format(error)) from error
+        elif self._state != _DONE:
+            raise Aoe2NetException("The response is not valid JSON or ended before the '{}' array was complete."
+                                   .format(self.key))
+
+    def _decode(self, position: int) -> Optional[tuple]:
+        """
+        Decodes the JSON value at the given position of the buffer.
+
+        :returns: the value and the position after it, or None if the value is not complete yet
+        """
+
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, position)
+        except json.JSONDecodeError:  # not complete yet (or not valid JSON, see `close`)
+            return None
+        # a (complete) value is always followed by a separator, e.g. "12" might only be the start of "12.5"
+        return (value, end) if end < len(self._buffer) and self._buffer[end] in _SEPARATORS else None
+
+    def _parse(self) -> List[Any]:
+        buffer, position, items = self._buffer, 0, []
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                break
+
+            character = buffer[position]
+            if self._state == _OBJECT:
+                if character != "{":
+                    raise Aoe2NetException("The response is not a JSON object.")
+                position, self._state = position + 1, _KEY
+            elif self._state == _KEY:
+                if character in ",}":
+                    position += 1
+                    if character == "}":
+                        self._state = _DONE
+                        break
+                    continue
+                decoded = self._decode(position)
+                if decoded is None:
+                    break
+                self._current_key, position = decoded
+                self._state = _COLON
+            elif self._state == _COLON:
+                if character != ":":
+                    raise Aoe2NetException("The response is not valid JSON.")
+                position += 1
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if self._current_key == self.key and character == "[":
+                    position, self._state = position + 1, _ITEMS
+                    continue
+                decoded = self._decode(position)  # skips the values of all other keys
+                if decoded is None:
+                    break
+                position, self._state = decoded[1], _KEY
+            else:  # _ITEMS
+                if character in ",]":
+                    position += 1
+                    if character == "]":
+                        self._state = _DONE  # everything after the array is not of interest
+                        break
+                    continue
+                decoded = self._decode(position)
+                if decoded is None:
+                    break
+                items.append(decoded[0])
+                position = decoded[1]
+
+        self._buffer = "" if self._state == _DONE else buffer[position:]
+        return items
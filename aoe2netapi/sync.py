@@ -0,0 +1,304 @@
+"""
+Incremental synchronization of the API data.
+
+- :class:`LeaderboardSnapshot` -- keeps the last known state of leaderboards and computes the differences
+  (new, removed and changed players) on each refresh
+- :class:`MatchHistorySync` -- keeps the newest known match per player and requests only the matches played since
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from aoe2netapi.aoe2 import Aoe2NetException, _match_history_params, _is_past_cutoff, _check_pagination
+from aoe2netapi.constants import LeaderboardId, EventLeaderboardId, Game
+from aoe2netapi.models import Leaderboard, LeaderboardPlayer, LeaderboardTable, MatchHistory
+
+
+def _delta(current: Optional[int], previous: Optional[int]) -> Optional[int]:
+    """ Helper function which returns 'current - previous', or None if one of both is unknown. """
+
+    if current is None or previous is None:
+        return None
+    return current - previous
+
+
+@dataclass
+class PlayerChange:
+    """ A player whose leaderboard entry changed between two snapshots. """
+
+    previous: LeaderboardPlayer
+    current: LeaderboardPlayer
+
+    @property
+    def profile_id(self) -> str:
+        return self.current.profile_id
+
+    @property
+    def rating_delta(self) -> Optional[int]:
+        """ The rating difference (positive if the player gained rating), or None if a rating is unknown. """
+
+        return _delta(self.current.rating, self.previous.rating)
+
+    @property
+    def rank_delta(self) -> Optional[int]:
+        """ The rank difference (negative if the player climbed the ladder), or None if a rank is unknown. """
+
+        return _delta(self.current.rank, self.previous.rank)
+
+
+@dataclass
+class LeaderboardDiff:
+    """ The differences of a leaderboard between two snapshots. """
+
+    new: List[LeaderboardPlayer] = field(default_factory=list)
+    removed: List[LeaderboardPlayer] = field(default_factory=list)
+    changed: List[PlayerChange] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        """ Whether nothing changed at all. """
+
+        return not (self.new or self.removed or self.changed)
+
+
+class LeaderboardSnapshot:
+    """
+    Keeps the last known state of one or more leaderboards, per player ('profile_id').
+
+    Each `update` (or `refresh`) replaces the state of a leaderboard and returns the differences to the previous state
+    as :class:`LeaderboardDiff`. The state is kept as compact rows (see `LeaderboardTable.rows`);
+    :class:`LeaderboardPlayer` objects are only built for the new, removed and changed players.
+
+    The first update of a leaderboard reports all of its players as new.
+    """
+
+    def __init__(self):
+        self._states: Dict[Union[LeaderboardId, EventLeaderboardId], Dict[str, Tuple]] = {}
+
+    def __contains__(self, leaderboard_id: Union[LeaderboardId, EventLeaderboardId]) -> bool:
+        return leaderboard_id in self._states
+
+    def players(self, leaderboard_id: Union[LeaderboardId, EventLeaderboardId]) -> List[LeaderboardPlayer]:
+        """ Returns the last known players of the given leaderboard (an empty list if it was never updated). """
+
+        return [LeaderboardTable.row_to_player(row) for row in self._states.get(leaderboard_id, {}).values()]
+
+    def clear(self, leaderboard_id: Optional[Union[LeaderboardId, EventLeaderboardId]] = None) -> None:
+        """ Forgets the state of the given leaderboard, or of all leaderboards if none is given. """
+
+        if leaderboard_id is None:
+            self._states.clear()
+        else:
+            self._states.pop(leaderboard_id, None)
+
+    def update(self,
+               leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+               leaderboard: Union[Leaderboard, LeaderboardTable]) -> LeaderboardDiff:
+        """
+        Replaces the state of the given leaderboard with the given (full) leaderboard.
+
+        Parameters
+        ----------
+        leaderboard_id : `LeaderboardId` or `EventLeaderboardId`
+            The leaderboard the data belongs to.
+        leaderboard : `Leaderboard` or `LeaderboardTable`
+            The current data of the whole leaderboard, e.g. via `API.get_full_leaderboard`.
+
+        :return:
+            the differences to the previous state as :class:`LeaderboardDiff`
+        """
+
+        if isinstance(leaderboard, LeaderboardTable):
+            rows = leaderboard.rows()
+        else:
+            rows = (LeaderboardTable.player_to_row(player) for player in leaderboard.players or ())
+
+        # one pass over the ladder: every player still present is taken out of the previous state,
+        # whatever is left over afterwards was removed from the leaderboard
+        previous_state = dict(self._states.get(leaderboard_id, {}))
+        state = {}
+        diff = LeaderboardDiff()
+        to_player = LeaderboardTable.row_to_player
+        for row in rows:
+            profile_id = row[0]
+            state[profile_id] = row
+            previous = previous_state.pop(profile_id, None)
+            if previous is None:
+                diff.new.append(to_player(row))
+            elif previous != row:
+                diff.changed.append(PlayerChange(previous=to_player(previous), current=to_player(row)))
+        diff.removed = [to_player(row) for row in previous_state.values()]
+
+        self._states[leaderboard_id] = state
+        return diff
+
+    def refresh(self, api,
+                leaderboard_id: Union[LeaderboardId, EventLeaderboardId],
+                page_size: int = 10000,
+                max_in_flight: int = 4) -> LeaderboardDiff:
+        """
+        Requests the whole leaderboard (columnar, see `API.get_full_leaderboard`) and updates the state with it.
+
+        Parameters
+        ----------
+        api : `API`
+            The client to request the leaderboard with.
+
+        See `API.iter_leaderboard` for the other parameters.
+
+        :return:
+            the differences to the previous state as :class:`LeaderboardDiff`
+
+        :raises Aoe2NetException:
+            'page_size' has to be between 1 and 10000 || 'max_in_flight' has to be 1 or more
+        """
+
+        table = api.get_full_leaderboard(leaderboard_id, page_size=page_size, max_in_flight=max_in_flight,
+                                         columnar=True)
+        return self.update(leaderboard_id, table)
+
+
+@dataclass(frozen=True)
+class MatchMark:
+    """ The newest known match of a player. """
+
+    match_id: str
+    started: Optional[int]
+
+
+class MatchHistorySync:
+    """
+    Keeps the newest known match per player and game, to request only the matches played since the last sync.
+
+    A sync requests small pages of the match history, starting with the most recent match, until the newest known match
+    (or a match started before it) is reached - usually a single request of a few entries,
+    instead of re-requesting the whole history.
+
+    Parameters
+    ----------
+    page_size : `int`
+        Specifies how many entries should be requested per page. Defaults to 10.
+        Max. 1000.
+    initial_count : `int`
+        Specifies how many of the most recent entries should be requested for a player which was never synced before.
+        Defaults to 10. Max. 1000.
+    marks : `dict`
+        The marks of a previous instance (see `marks`), to continue where it stopped. Defaults to None.
+
+    :raises Aoe2NetException:
+        'page_size' has to be between 1 and 1000 || 'initial_count' has to be between 1 and 1000
+    """
+
+    def __init__(self, page_size: int = 10, initial_count: int = 10,
+                 marks: Optional[Dict[Tuple[str, str], MatchMark]] = None):
+        _check_pagination(page_size, max_page_size=1000)
+        if not 1 <= initial_count <= 1000:
+            raise Aoe2NetException("'initial_count' has to be between 1 and 1000.")
+
+        self.page_size = page_size
+        self.initial_count = initial_count
+        self._marks: Dict[Tuple[str, str], MatchMark] = dict(marks or {})
+
+    @property
+    def marks(self) -> Dict[Tuple[str, str], MatchMark]:
+        """ The newest known match per player, keyed by `(game, steam_id or profile_id)`. """
+
+        return dict(self._marks)
+
+    @staticmethod
+    def _key(game: Game, steam_id: str, profile_id: str) -> Tuple[str, str]:
+        _match_history_params(game, 0, 1, steam_id, profile_id)  # validate before the first request
+        return game.value, str(steam_id or profile_id)  # 'steam_id' takes precedence, as with the requests
+
+    def mark(self, game: Game, steam_id: str = "", profile_id: str = "") -> Optional[MatchMark]:
+        """ Returns the newest known match of the given player, or None if the player was never synced. """
+
+        return self._marks.get(self._key(game, steam_id, profile_id))
+
+    def _count_and_mark(self, key: Tuple[str, str]) -> Tuple[int, Optional[MatchMark]]:
+        """ Returns the page size of the requests and the mark of the given player. """
+
+        mark = self._marks.get(key)
+        return (self.initial_count if mark is None else self.page_size), mark
+
+    def _take(self, mark: Optional[MatchMark], page: List[MatchHistory], new_matches: List[MatchHistory]) -> bool:
+        """
+        Collects the new matches of a page.
+
+        :returns: whether the sync is done, i.e. no further page has to be requested
+        """
+
+        if mark is None:
+            new_matches.extend(page)
+            done = True
+        else:
+            done = len(page) < self.page_size
+            for match in page:
+                if _is_past_cutoff(match.match_id, match.started, mark.match_id, mark.started):
+                    done = True
+                    break
+                new_matches.append(match)
+        return done
+
+    def _advance(self, key: Tuple[str, str], new_matches: List[MatchHistory]) -> None:
+        """
+        Advances the mark of the player to the newest of the new matches.
+        Only called once a sync is done, so that a failed request does not skip the matches not returned yet.
+        """
+
+        if new_matches and new_matches[0].match_id is not None:
+            newest = new_matches[0]
+            self._marks[key] = MatchMark(match_id=str(newest.match_id),
+                                         started=None if newest.started is None else int(newest.started))
+
+    def sync(self, api, game: Game, steam_id: str = "", profile_id: str = "") -> List[MatchHistory]:
+        """
+        Requests the matches of a player played since the last sync.
+
+        'game' required, as well as either 'steam_id' or 'profile_id'.
+        For a player which was never synced before, the 'initial_count' most recent matches are returned.
+
+        Parameters
+        ----------
+        api : `API`
+            The client to request the match history with.
+        game : :class:`Game`
+            The game for which to extract the match history.
+        steam_id : `str`
+            The steamID64 of a player. (ex: 76561199003184910)
+
+            Takes precedence over 'profile_id'.
+        profile_id : `str`
+            The profile ID. (ex: 459658)
+
+        :return:
+            a list of the new :class:`MatchHistory` (most recent match first)
+
+        :raises Aoe2NetException:
+            Either 'steam_id' or 'profile_id' required || 'game' is not valid
+        """
+
+        key = self._key(game, steam_id, profile_id)
+        count, mark = self._count_and_mark(key)
+        new_matches: List[MatchHistory] = []
+        start, done = 0, False
+        while not done:
+            page = api.get_match_history(game, start=start, count=count, steam_id=steam_id, profile_id=profile_id)
+            done = self._take(mark, page, new_matches)
+            start += count
+        self._advance(key, new_matches)
+        return new_matches
+
+    async def sync_async(self, api, game: Game, steam_id: str = "", profile_id: str = "") -> List[MatchHistory]:
+        """ The equivalent of `sync` for the asyncio client `AsyncAPI`. """
+
+        key = self._key(game, steam_id, profile_id)
+        count, mark = self._count_and_mark(key)
+        new_matches: List[MatchHistory] = []
+        start, done = 0, False
+        while not done:
+            page = await api.get_match_history(game, start=start, count=count, steam_id=steam_id,
+                                               profile_id=profile_id)
+            done = self._take(mark, page, new_matches)
+            start += count
+        self._advance(key, new_matches)
+        return new_matches
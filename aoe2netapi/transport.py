@@ -0,0 +1,392 @@
+"""
+Pluggable transports of the `API` and `Nightbot` classes, to record, replay and stand in for the aoe2.net API offline,
+e.g. for tests and load tests.
+
+- :class:`HttpTransport` -- sends the requests over HTTP, optionally to another origin (e.g. a :class:`FixtureServer`)
+- :class:`RecordingTransport` -- sends the requests via another transport and writes the responses to a directory
+- :class:`ReplayTransport` -- serves recorded responses, with configurable latency and error injection
+- :class:`FixtureServer` -- a local HTTP stand-in server of the aoe2.net API, serving recorded (or generated) responses
+"""
+import abc
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from aoe2netapi.cache import _cache_key
+
+AOE2NET_ORIGIN = "https://aoe2.net"
+
+# the response headers kept in recordings
+_RECORDED_HEADERS = ("Content-Type", "Retry-After", "ETag", "Last-Modified")
+
+
+def _request_key(url: str, params: Optional[dict]) -> str:
+    """
+    Helper function to build the key of a request in a recording: its URL plus its normalized parameters.
+    Parameters without a value are left out, as they are not sent.
+    """
+
+    return _cache_key(url.rstrip("?"), {key: value for key, value in (params or {}).items() if value is not None})
+
+
+def _build_response(url: str, status: int, headers: Dict[str, str], body: bytes) -> requests.Response:
+    """ Helper function to build a :class:`requests.Response` which was not received over HTTP. """
+
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = "utf-8"
+    response._content = body
+    response._content_consumed = True  # there is no connection to release
+    return response
+
+
+class Transport(abc.ABC):
+    """ The base class of the transports: sends a request and returns its response. """
+
+    @abc.abstractmethod
+    def send(self, url: str, params: Optional[dict] = None, session: Optional[requests.Session] = None,
+             timeout: Optional[Union[float, Tuple[float, float]]] = None, stream: bool = False,
+             headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Sends a (GET) request.
+
+        :param url: the request URL (of the aoe2.net API)
+        :param params: the request parameters
+        :param session: the (pooled) session of the client
+        :param timeout: the timeout of the client
+        :param stream: whether the response body may be read while it is received (see `requests`)
+        :param headers: additional request headers, e.g. the ones of a conditional request (`If-None-Match`)
+
+        :returns: the response (whose status is checked by the client)
+        """
+
+
+class HttpTransport(Transport):
+    """
+    Sends the requests over HTTP.
+
+    Parameters
+    ----------
+    origin : `str`
+        The origin to send the requests to instead of "https://aoe2.net", e.g. the `url` of a :class:`FixtureServer`.
+        Defaults to None (aoe2.net).
+    """
+
+    def __init__(self, origin: Optional[str] = None):
+        self.origin = origin
+
+    def send(self, url: str, params: Optional[dict] = None, session: Optional[requests.Session] = None,
+             timeout: Optional[Union[float, Tuple[float, float]]] = None, stream: bool = False,
+             headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        if self.origin is not None and url.startswith(AOE2NET_ORIGIN):
+            url = self.origin.rstrip("/") + url[len(AOE2NET_ORIGIN):]
+        return (session or requests).get(url, params=params, timeout=timeout, stream=stream, headers=headers)
+
+
+class RecordingTransport(Transport):
+    """
+    Sends the requests via another transport and writes their responses to a directory (one JSON file per request),
+    to be served by a :class:`ReplayTransport` or a :class:`FixtureServer` later on. Thread-safe.
+
+    The requests are sent without the conditional request headers, so that the whole responses are recorded.
+
+    Parameters
+    ----------
+    directory : `str`
+        The directory to write the recordings to. Created if it does not exist.
+    transport : :class:`Transport`
+        The transport to send the requests with. Defaults to an :class:`HttpTransport`.
+    """
+
+    def __init__(self, directory: str, transport: Optional[Transport] = None):
+        self.directory = directory
+        self.transport = HttpTransport() if transport is None else transport
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, url: str, params: Optional[dict] = None, session: Optional[requests.Session] = None,
+             timeout: Optional[Union[float, Tuple[float, float]]] = None, stream: bool = False,
+             headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        response = self.transport.send(url, params=params, session=session, timeout=timeout)  # read as a whole
+        key = _request_key(url, params)
+        recording = {
+            "key": key,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in _RECORDED_HEADERS if name in response.headers},
+            "body": response.content.decode("utf-8"),
+        }
+        path = os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+        temporary_path = "{}.{}.tmp".format(path, threading.get_ident())
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(recording, file)
+        os.replace(temporary_path, path)  # atomically, for concurrent readers
+        return response
+
+
+def _validators(response_headers: Mapping[str, str]) -> Dict[str, str]:
+    """ Helper function which returns the validators (`ETag`, `Last-Modified`) of the given response headers. """
+
+    return {name: response_headers[name] for name in ("ETag", "Last-Modified") if name in response_headers}
+
+
+def _is_not_modified(request_headers: Optional[Mapping[str, str]], response_headers: Mapping[str, str]) -> bool:
+    """
+    Helper function which checks if a conditional request can be answered with a 304 (Not Modified):
+    its `If-None-Match` header matches the `ETag` of the response, or (without `If-None-Match`) the response was not
+    modified since its `If-Modified-Since` header.
+    """
+
+    request_headers = CaseInsensitiveDict(request_headers or {})
+    if "If-None-Match" in request_headers:
+        etag = response_headers.get("ETag")
+        return etag is not None and etag in (tag.strip() for tag in request_headers["If-None-Match"].split(","))
+
+    modified_since, last_modified = request_headers.get("If-Modified-Since"), response_headers.get("Last-Modified")
+    if modified_since is None or last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def _load_recordings(directory: str) -> Dict[str, Dict[str, Any]]:
+    """ Helper function which loads all recordings of a directory, keyed by their request key. """
+
+    recordings = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as file:
+                recording = json.load(file)
+            recordings[recording["key"]] = recording
+    return recordings
+
+
+class ReplayTransport(Transport):
+    """
+    Serves the responses recorded by a :class:`RecordingTransport`, without any network access. Thread-safe.
+
+    Requests which were not recorded are answered with a 404 (Not Found), conditional requests whose validators
+    match the recorded `ETag` or `Last-Modified` header with a 304 (Not Modified).
+
+    Parameters
+    ----------
+    directory : `str`
+        The directory of the recordings.
+    latency : `float`
+        The time in seconds every response takes. Defaults to 0.
+    jitter : `float`
+        An additional random time in seconds (between 0 and 'jitter') every response takes. Defaults to 0.
+    error_rate : `float`
+        The share of requests (between 0 and 1) which are answered with 'error_status' instead. Defaults to 0.
+    error_status : `int`
+        The status code of the injected errors. Defaults to 503 (Service Unavailable).
+    seed : `int`
+        The seed of the random jitter and error injection, for reproducible runs. Defaults to None.
+    """
+
+    def __init__(self, directory: str, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None):
+        if latency < 0 or jitter < 0 or not 0 <= error_rate <= 1:
+            raise ValueError("'latency' and 'jitter' can not be negative and 'error_rate' has to be between 0 and 1.")
+
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._recordings = _load_recordings(directory)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, url: str, params: Optional[dict] = None, session: Optional[requests.Session] = None,
+             timeout: Optional[Union[float, Tuple[float, float]]] = None, stream: bool = False,
+             headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            return _build_response(url, self.error_status, {"Content-Type": "text/plain"}, b"Injected error")
+        recording = self._recordings.get(_request_key(url, params))
+        if recording is None:
+            return _build_response(url, 404, {"Content-Type": "text/plain"}, b"Not recorded")
+        if _is_not_modified(headers, recording["headers"]):
+            return _build_response(url, 304, _validators(recording["headers"]), b"")
+        return _build_response(url, recording["status"], recording["headers"], recording["body"].encode("utf-8"))
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """ Helper function which returns the compression functions per supported content encoding. """
+
+    compressors = {"gzip": gzip.compress, "deflate": zlib.compress}
+    try:
+        import brotli  # optional
+        compressors["br"] = brotli.compress
+    except ImportError:
+        pass
+    try:
+        from backports import zstd  # optional, part of the standard library as 'compression.zstd' from Python 3.14
+        compressors["zstd"] = zstd.compress
+    except ImportError:
+        try:
+            from compression import zstd
+            compressors["zstd"] = zstd.compress
+        except ImportError:
+            pass
+    return compressors
+
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """ Helper function which returns the first supported content encoding of an `Accept-Encoding` header, if any. """
+
+    compressors = _compressors()
+    for encoding in accept_encoding.split(","):
+        encoding, _, quality = encoding.strip().lower().partition(";")
+        if encoding in compressors and quality.strip().replace(" ", "") not in ("q=0", "q=0.0"):
+            return encoding
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    """ Helper function which compresses a response body in the given (supported) content encoding. """
+
+    return _compressors()[encoding](body)
+
+
+# a route of a `FixtureServer`: returns the response (a JSON value or text) for the request parameters
+Route = Callable[[Dict[str, str]], Union[str, dict, list]]
+
+
+class FixtureServer:
+    """
+    A local HTTP stand-in server of the aoe2.net API, running in a background thread.
+
+    Serves the recorded responses of a directory (see :class:`RecordingTransport`) and the responses of the given
+    routes (e.g. generated payloads), for the `/api/strings`, `/api/leaderboard`, `/api/player/matches`,
+    `/api/player/ratinghistory` and `/api/nightbot/*` paths. All other requests are answered with a 404 (Not Found).
+    Conditional requests whose validators match the `ETag` or `Last-Modified` header of the response are answered
+    with a 304 (Not Modified).
+
+    Send requests to it via `HttpTransport(origin=server.url)`. Can be used as a context manager,
+    which starts and stops the server.
+
+    Parameters
+    ----------
+    directory : `str`
+        The directory of the recordings to serve. Defaults to None (no recordings).
+    routes : `dict`
+        The responses per path (e.g. "/api/leaderboard"), as functions of the request parameters.
+        Recordings take precedence. Defaults to None (no routes).
+    host : `str`
+        The host to listen on. Defaults to "127.0.0.1".
+    port : `int`
+        The port to listen on. Defaults to 0 (any free port).
+    etags : `bool`
+        Specifies if the responses of the routes should have an `ETag` (a hash of their body). Defaults to True.
+    compress : `bool`
+        Specifies if the responses should be compressed, in the first encoding of the `Accept-Encoding` request
+        header which is supported (zstd and brotli if installed, gzip and deflate). Defaults to False.
+    """
+
+    def __init__(self, directory: Optional[str] = None, routes: Optional[Dict[str, Route]] = None,
+                 host: str = "127.0.0.1", port: int = 0, etags: bool = True, compress: bool = False):
+        self.recordings = _load_recordings(directory) if directory is not None else {}
+        self.routes = dict(routes or {})
+        self.etags = etags
+        self.compress = compress
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """ The origin of this server, e.g. "http://127.0.0.1:8080". """
+
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self) -> "FixtureServer":
+        """ Starts serving in a background thread. """
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FixtureServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """ Stops serving and closes the server. """
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """ Returns the status, headers and body of the response to the given request. """
+
+        recording = self.recordings.get(_request_key(AOE2NET_ORIGIN + path, params))
+        if recording is not None:
+            return recording["status"], recording["headers"], recording["body"].encode("utf-8")
+
+        route = self.routes.get(path.rstrip("/"))
+        if route is None:
+            return 404, {"Content-Type": "text/plain"}, b"Not found"
+        result = route(params)
+        if isinstance(result, str):
+            response_headers, body = {"Content-Type": "text/plain; charset=utf-8"}, result.encode("utf-8")
+        else:
+            response_headers, body = {"Content-Type": "application/json"}, json.dumps(result).encode("utf-8")
+        if self.etags:
+            response_headers["ETag"] = '"{}"'.format(hashlib.sha1(body).hexdigest())
+        return 200, response_headers, body
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, as the API
+            disable_nagle_algorithm = True  # the headers and the body are sent separately
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                status, headers, body = server.respond(parts.path, dict(parse_qsl(parts.query,
+                                                                                  keep_blank_values=True)))
+                if status == 200 and _is_not_modified(self.headers, headers):
+                    status, headers, body = 304, _validators(headers), b""
+                elif server.compress and body:
+                    encoding = _negotiate_encoding(self.headers.get("Accept-Encoding", ""))
+                    if encoding is not None:
+                        headers, body = dict(headers, **{"Content-Encoding": encoding}), _compress(body, encoding)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # no logging of every request
+
+        return Handler
@@ -0,0 +1,40 @@
+"""
+Compares the installed JSON backends (see `aoe2netapi.jsonbackend`) on representative response bodies.
+
+Run from the repository root:
+
+    python -m benchmarks.json_benchmark
+"""
+import json
+import timeit
+
+from aoe2netapi.jsonbackend import available_json_backends, get_json_backend
+from benchmarks.payloads import leaderboard_payload, match_history_payload, rating_history_payload
+
+
+def _best_of(function, repeat: int = 5) -> float:
+    """ Returns the best wall time (in seconds) of 'repeat' runs of 'function'. """
+
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    bodies = [
+        ("Leaderboard (10000 rows)", json.dumps(leaderboard_payload(10000)).encode()),
+        ("MatchHistory (1000 matches, 8 players)", json.dumps(match_history_payload(1000, 8)).encode()),
+        ("RatingHistory (10000 entries)", json.dumps(rating_history_payload(10000)).encode()),
+    ]
+    backends = [get_json_backend(name) for name in available_json_backends()]
+
+    print("{:<40} {:>8}".format("payload", "size") + "".join(" {:>10}".format(b.name) for b in backends))
+    for name, body in bodies:
+        expected = json.loads(body)
+        times = []
+        for backend in backends:
+            assert backend.loads(body) == expected
+            times.append(_best_of(lambda: backend.loads(body)))
+        print("{:<40} {:>6}KB".format(name, len(body) // 1024) + "".join(" {:>8.1f}ms".format(t * 1000) for t in times))
+
+
+if __name__ == "__main__":
+    main()
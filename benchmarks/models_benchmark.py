@@ -0,0 +1,56 @@
+"""
+Compares the fast-path model decoding against the generic `dataclasses_json` decoding (`from_dict`).
+
+Run from the repository root:
+
+    python -m benchmarks.models_benchmark
+"""
+import timeit
+
+from aoe2netapi.models import Leaderboard, MatchHistory, RatingHistoryItem, Strings
+from aoe2netapi.models.leaderboard import _decode_leaderboard
+from aoe2netapi.models.matchhistory import _decode_match_history, _decode_lazy_match_history
+from aoe2netapi.models.ratinghistory import _decode_rating_history_item
+from aoe2netapi.models.strings import _decode_strings
+from benchmarks.payloads import leaderboard_payload, match_history_payload, rating_history_payload, strings_payload
+
+
+def _best_of(function, repeat: int = 3) -> float:
+    """ Returns the best wall time (in seconds) of 'repeat' runs of 'function'. """
+
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    leaderboard = leaderboard_payload(10000)
+    matches = match_history_payload(1000, players_per_match=8)
+    ratings = rating_history_payload(10000)
+    strings = strings_payload()
+
+    cases = [
+        ("Leaderboard (10000 rows)",
+         lambda: Leaderboard.from_dict(leaderboard, infer_missing=True),
+         lambda: _decode_leaderboard(leaderboard)),
+        ("MatchHistory (1000 matches, 8 players)",
+         lambda: [MatchHistory.from_dict(match, infer_missing=True) for match in matches],
+         lambda: [_decode_match_history(match) for match in matches]),
+        ("MatchHistory (lazy, 'started' only)",
+         lambda: [MatchHistory.from_dict(match, infer_missing=True).started for match in matches],
+         lambda: [_decode_lazy_match_history(match).started for match in matches]),
+        ("RatingHistoryItem (10000 entries)",
+         lambda: [RatingHistoryItem.from_dict(rating) for rating in ratings],
+         lambda: [_decode_rating_history_item(rating) for rating in ratings]),
+        ("Strings (11 categories, 50 items)",
+         lambda: Strings.from_dict(strings),
+         lambda: _decode_strings(strings)),
+    ]
+
+    print("{:<40} {:>12} {:>12} {:>9}".format("payload", "from_dict", "fast path", "speedup"))
+    for name, from_dict, fast_path in cases:
+        assert from_dict() == fast_path()
+        generic, fast = _best_of(from_dict), _best_of(fast_path)
+        print("{:<40} {:>10.1f}ms {:>10.1f}ms {:>8.1f}x".format(name, generic * 1000, fast * 1000, generic / fast))
+
+
+if __name__ == "__main__":
+    main()
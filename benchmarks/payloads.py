@@ -0,0 +1,57 @@
+"""
+Synthetic aoe2.net API payloads for the benchmarks, shaped like the real request responses.
+"""
+from typing import Dict, List
+from uuid import UUID
+
+
+def leaderboard_payload(rows: int, start: int = 1, total: int = 50000) -> Dict:
+    """ A `/leaderboard` request response with 'rows' players, starting at rank 'start'. """
+
+    return {"total": total, "leaderboard_id": 3, "start": start, "count": rows, "leaderboard": [
+        {"profile_id": 100000 + rank, "rank": rank, "rating": 3000 - rank // 20,
+         "steam_id": str(76561190000000000 + rank), "icon": None, "name": "Player {}".format(rank),
+         "clan": "CLAN" if rank % 3 else None, "country": "DE",
+         "previous_rating": 3001 - rank // 20, "highest_rating": 3050 - rank // 20, "streak": rank % 7 - 3,
+         "lowest_streak": -5, "highest_streak": 9, "games": 1000 + rank, "wins": 550 + rank // 2,
+         "losses": 450 + rank // 2, "drops": rank % 4, "last_match_time": 1674000000 - rank}
+        for rank in range(start, start + rows)]}
+
+
+def match_history_payload(matches: int, players_per_match: int = 2) -> List[Dict]:
+    """ A `/player/matches` request response with 'matches' matches (most recent first). """
+
+    return [{
+        "match_id": str(200000000 - index), "match_uuid": str(UUID(int=index)), "version": "66692",
+        "name": "AUTOMATCH", "num_players": players_per_match, "num_slots": 8, "has_password": False,
+        "map_size": 2, "map_type": 29, "ranked": True, "event_leaderboard_id": None, "rating_type_id": 2,
+        "server": "ukwest", "started": 1674000000 - index * 3600, "finished": 1674001800 - index * 3600,
+        "cheats": False, "full_tech_tree": False, "ending_age": 5, "game_type": 0, "lock_speed": True,
+        "lock_teams": True, "pop": 200, "leaderboard_id": 3, "resources": 1, "shared_exploration": False,
+        "speed": 2, "starting_age": 2, "team_together": True, "team_positions": True, "treaty_length": 0,
+        "turbo": False, "victory": 1, "victory_time": 0,
+        "players": [{"profile_id": 100000 + slot, "name": "Player {}".format(slot), "clan": None, "country": "DE",
+                     "slot": slot, "slot_type": 1, "rating": 2000 + slot, "rating_change": None, "color": slot,
+                     "team": slot % 2 + 1, "civ": slot + 10, "won": bool(slot % 2)}
+                    for slot in range(1, players_per_match + 1)]}
+        for index in range(matches)]
+
+
+def rating_history_payload(entries: int) -> List[Dict]:
+    """ A `/player/ratinghistory` request response with 'entries' entries (most recent first). """
+
+    return [{"rating": 2000 + index % 50, "num_wins": 5000 - index // 2, "num_losses": 4000 - index // 2,
+             "streak": index % 5 - 2, "drops": 3, "timestamp": 1674000000 - index * 3600}
+            for index in range(entries)]
+
+
+def strings_payload(items_per_category: int = 50) -> Dict:
+    """ A `/strings` request response with 'items_per_category' strings in every category. """
+
+    categories = ("age", "civ", "game_type", "leaderboard", "map_size", "map_type", "rating_type",
+                  "resources", "speed", "victory", "visibility")
+    payload = {"language": "en"}
+    for category in categories:
+        payload[category] = [{"id": index, "string": "{} {}".format(category, index)}
+                             for index in range(items_per_category)]
+    return payload
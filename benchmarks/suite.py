@@ -0,0 +1,228 @@
+"""
+Benchmark suite of the client hot paths, runnable offline against synthetic payloads (see `benchmarks.payloads`):
+model decoding, request parameter building and end-to-end calls against a local `FixtureServer`.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                            # prints a table
+    python -m benchmarks.suite --json results.json        # additionally writes the results as JSON
+    python -m benchmarks.suite --compare baseline.json    # compares against earlier results, exits 1 on regressions
+    python -m benchmarks.suite --filter e2e --repeat 10   # runs a subset of the cases
+
+The JSON results contain the version of the package, the Python version and the platform next to the timings of
+every case, so that they can be tracked across releases.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import aoe2netapi
+from aoe2netapi import API
+from aoe2netapi.aoe2 import _leaderboard_params, _match_history_params
+from aoe2netapi.cache import ConditionalCache
+from aoe2netapi.constants import Game, LeaderboardId
+from aoe2netapi.jsonbackend import get_json_backend
+from aoe2netapi.models import Leaderboard, MatchHistory, RatingHistory
+from aoe2netapi.models.matchhistory import _decode_lazy_match_history
+from aoe2netapi.transport import FixtureServer, HttpTransport
+from benchmarks.payloads import leaderboard_payload, match_history_payload, rating_history_payload, strings_payload
+
+SCHEMA_VERSION = 1
+
+
+class Case(NamedTuple):
+    """ A benchmark case: 'function' processes 'items' items (rows, matches, calls, ...) per call. """
+
+    name: str
+    group: str
+    items: int
+    function: Callable[[], object]
+    number: int = 1  # the calls per timed run, for very short functions
+
+
+def _time(case: Case, repeat: int) -> Dict:
+    """ Runs the case once to warm up, then 'repeat' timed runs, and returns its result entry. """
+
+    case.function()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(case.number):
+            case.function()
+        timings.append((time.perf_counter() - started) / case.number)
+
+    best, median = min(timings), statistics.median(timings)
+    return {
+        "name": case.name,
+        "group": case.group,
+        "items": case.items,
+        "repeat": repeat,
+        "number": case.number,
+        "best": best,
+        "median": median,
+        "stdev": statistics.stdev(timings) if repeat > 1 else 0.0,
+        "items_per_second": case.items / median if median else None,
+    }
+
+
+def _decoding_cases() -> List[Case]:
+    cases = []
+    for rows in (10, 1000, 10000):
+        payload = leaderboard_payload(rows)
+        cases.append(Case("Leaderboard.from_dict ({} rows)".format(rows), "decoding", rows,
+                          lambda payload=payload: Leaderboard.from_dict(payload, infer_missing=True),
+                          number=max(1, 1000 // rows)))
+
+    matches = match_history_payload(1000, players_per_match=8)
+    cases.append(Case("MatchHistory.from_dict infer_missing (1000 matches)", "decoding", len(matches),
+                      lambda: [MatchHistory.from_dict(match, infer_missing=True) for match in matches]))
+    cases.append(Case("MatchHistory lazy, 'started' only (1000 matches)", "decoding", len(matches),
+                      lambda: [match.started for match in map(_decode_lazy_match_history, matches)]))
+
+    ratings = rating_history_payload(10000)
+    cases.append(Case("RatingHistory.__init__ (10000 entries)", "decoding", len(ratings),
+                      lambda: RatingHistory(LeaderboardId.AOE_TWO_RM, False, ratings)))
+    return cases
+
+
+def _params_cases() -> List[Case]:
+    calls = 10000
+
+    def leaderboard_params():
+        for _ in range(calls):
+            _leaderboard_params(LeaderboardId.AOE_TWO_RM, 1, 10000, {"search": "Player", "profile_id": "1"})
+
+    def match_history_params():
+        for _ in range(calls):
+            _match_history_params(Game.AOE_TWO_DE, 0, 1000, "", "100001")
+
+    return [Case("get_leaderboard parameters ({} calls)".format(calls), "params", calls, leaderboard_params),
+            Case("get_match_history parameters ({} calls)".format(calls), "params", calls, match_history_params)]
+
+
+def _end_to_end_cases(server: FixtureServer) -> List[Case]:
+    api = API(transport=HttpTransport(origin=server.url))
+    conditional = API(transport=HttpTransport(origin=server.url), conditional_cache=ConditionalCache())
+    return [
+        Case("e2e get_strings", "e2e", 1, lambda: api.get_strings(Game.AOE_TWO_DE), number=10),
+        Case("e2e get_leaderboard (10 rows)", "e2e", 10,
+             lambda: api.get_leaderboard(LeaderboardId.AOE_TWO_RM, count=10), number=10),
+        Case("e2e get_leaderboard (10000 rows)", "e2e", 10000,
+             lambda: api.get_leaderboard(LeaderboardId.AOE_TWO_RM, count=10000)),
+        Case("e2e get_leaderboard not modified (10000 rows)", "e2e", 10000,
+             lambda: conditional.get_leaderboard(LeaderboardId.AOE_TWO_RM, count=10000)),
+        Case("e2e get_leaderboard columnar (10000 rows)", "e2e", 10000,
+             lambda: api.get_leaderboard(LeaderboardId.AOE_TWO_RM, count=10000, columnar=True)),
+        Case("e2e stream_leaderboard (10000 rows)", "e2e", 10000,
+             lambda: sum(1 for _ in api.stream_leaderboard(LeaderboardId.AOE_TWO_RM, count=10000))),
+        Case("e2e get_match_history (1000 matches)", "e2e", 1000,
+             lambda: api.get_match_history(Game.AOE_TWO_DE, profile_id="100001", count=1000)),
+        Case("e2e get_rating_history (10000 entries)", "e2e", 10000,
+             lambda: api.get_rating_history(LeaderboardId.AOE_TWO_RM, profile_id="100001", count=10000)),
+    ]
+
+
+def _fixture_server() -> FixtureServer:
+    """ A `FixtureServer` generating the payloads of the requested size (cached per request parameters). """
+
+    payloads = {}
+
+    def route(build):
+        def respond(params):
+            key = (build, params.get("start", "1"), params["count"])
+            if key not in payloads:
+                payloads[key] = build(int(params["count"]))
+            return payloads[key]
+        return respond
+
+    return FixtureServer(routes={
+        "/api/strings": lambda params: strings_payload(),
+        "/api/leaderboard": route(leaderboard_payload),
+        "/api/player/matches": route(match_history_payload),
+        "/api/player/ratinghistory": route(rating_history_payload),
+    })
+
+
+def run(repeat: int = 5, name_filter: Optional[str] = None) -> Dict:
+    """ Runs the (filtered) benchmark cases and returns the results (see `SCHEMA_VERSION`). """
+
+    results = []
+    with _fixture_server() as server:
+        for case in _decoding_cases() + _params_cases() + _end_to_end_cases(server):
+            if name_filter is None or name_filter.lower() in (case.group + " " + case.name).lower():
+                results.append(_time(case, repeat))
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "version": aoe2netapi.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "json_backend": get_json_backend().name,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, out=sys.stdout) -> List[str]:
+    """ Returns the names of the cases whose median is more than 'threshold' (e.g. 0.1) slower than the baseline. """
+
+    baseline_medians = {result["name"]: result["median"] for result in baseline["results"]}
+    regressions = []
+    print("\n{:<55} {:>12} {:>12} {:>9}".format("case (vs. {})".format(baseline["version"]), "baseline", "median",
+                                                 "change"), file=out)
+    for result in results["results"]:
+        before = baseline_medians.get(result["name"])
+        if before is None:
+            continue
+        change = result["median"] / before - 1
+        if change > threshold:
+            regressions.append(result["name"])
+        print("{:<55} {:>10.3f}ms {:>10.3f}ms {:>+8.1%}{}".format(result["name"], before * 1000,
+                                                                  result["median"] * 1000, change,
+                                                                  " !" if change > threshold else ""), file=out)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="the timed runs per case (default: 5)")
+    parser.add_argument("--filter", dest="name_filter", help="runs only the cases whose group or name contain this")
+    parser.add_argument("--json", dest="json_path", help="the file to write the results to ('-' for stdout)")
+    parser.add_argument("--compare", dest="baseline_path", help="the results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="the slowdown of the median counted as regression (default: 0.1, i.e. 10%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.name_filter)
+
+    out = sys.stderr if args.json_path == "-" else sys.stdout
+    print("{:<55} {:>12} {:>12} {:>14}".format("case", "best", "median", "items/s"), file=out)
+    for result in results["results"]:
+        print("{:<55} {:>10.3f}ms {:>10.3f}ms {:>14,.0f}".format(result["name"], result["best"] * 1000,
+                                                                result["median"] * 1000, result["items_per_second"]),
+              file=out)
+
+    if args.json_path == "-":
+        json.dump(results, sys.stdout, indent=2)
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline_path:
+        with open(args.baseline_path, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("schema") != SCHEMA_VERSION:
+            parser.error("the baseline has another schema version")
+        if compare(results, baseline, args.threshold, out):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
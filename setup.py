@@ -19,6 +19,14 @@ setup(
         "requests>=2.20.0",
         "dataclasses-json==0.5.7"
     ],
+    extras_require={
+        "async": ["aiohttp>=3.8.0"],
+        "numpy": ["numpy>=1.17.0"],
+        "arrow": ["pyarrow>=8.0.0"],
+        "streaming": ["ijson>=3.1"],
+        "fast-json": ["orjson>=3.0.0"],
+        "compression": ["brotli>=1.0.9", "backports.zstd>=1.0.0; python_version >= '3.9' and python_version < '3.14'"]
+    },
     python_requires=">=3.7",
     classifiers=[
         "License :: OSI Approved :: MIT License",
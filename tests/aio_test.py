@@ -0,0 +1,199 @@
+import asyncio
+import subprocess
+import sys
+
+import aiohttp
+import pytest
+
+from aoe2netapi import AsyncAPI, AsyncNightbot, Aoe2NetException
+from aoe2netapi.constants import LeaderboardId, Game
+from aoe2netapi.ratelimit import RetryPolicy
+
+from tests.api_test import RM_LEADERBOARD_RESPONSE, MATCH_HISTORY_RESPONSE, RATING_HISTORY_RESPONSE, \
+    leaderboard_page_response, match_history_page_response
+
+RANK_DETAILS = "Sample Player (9999) Rank #1, has played 9,999 games with a 100% winrate, +9999 streak, and 0 drops"
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_importing_the_package_does_not_import_aiohttp():
+    code = ("import sys, aoe2netapi; assert 'aiohttp' not in sys.modules; "
+            "aoe2netapi.AsyncAPI; assert 'aiohttp' in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_async_get_leaderboard_throws_aoe2net_exception_when_count_is_more_than_10000():
+    async def main():
+        async with AsyncAPI() as api:
+            await api.get_leaderboard(LeaderboardId.AOE_TWO_RM, count=10001)
+
+    with pytest.raises(Aoe2NetException):
+        run(main())
+
+
+def test_async_get_leaderboard_returns_leaderboard(mocker):
+    mocker.patch("aoe2netapi.aio._get_request_response", return_value=RM_LEADERBOARD_RESPONSE)
+
+    async def main():
+        async with AsyncAPI() as api:
+            return await api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+
+    leaderboard = run(main())
+    assert len(leaderboard.players) == 2
+    assert leaderboard.is_event_leaderboard is False
+    assert leaderboard.players[0].name == "Sample Player 1"
+
+
+def test_async_get_match_history_and_rating_history_return_models(mocker):
+    mocker.patch("aoe2netapi.aio._get_request_response",
+                 side_effect=[MATCH_HISTORY_RESPONSE, RATING_HISTORY_RESPONSE])
+
+    async def main():
+        async with AsyncAPI() as api:
+            return (await api.get_match_history(Game.AOE_TWO_DE, profile_id="x"),
+                    await api.get_rating_history(LeaderboardId.AOE_TWO_RM, profile_id="x"))
+
+    match_history, rating_history = run(main())
+    assert match_history[0].name == "AUTOMATCH"
+    assert len(rating_history.ratings) == 2
+
+
+def test_async_nightbot_get_rank_details_returns_rank_details(mocker):
+    mocker.patch("aoe2netapi.aio._get_request_response", return_value=RANK_DETAILS)
+
+    async def main():
+        async with AsyncNightbot() as nightbot:
+            return await nightbot.get_rank_details(LeaderboardId.AOE_TWO_RM, search="Sample Player")
+
+    assert run(main()) == RANK_DETAILS
+
+
+def test_async_client_bounds_concurrent_requests(mocker):
+    in_flight, peak = 0, 0
+
+    async def fake_request(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return RANK_DETAILS
+
+    mocker.patch("aoe2netapi.aio._get_request_response", side_effect=fake_request)
+
+    async def main():
+        async with AsyncNightbot(max_concurrency=3) as nightbot:
+            return await asyncio.gather(*(nightbot.get_rank_details(LeaderboardId.AOE_TWO_RM, profile_id=str(i))
+                                          for i in range(20)))
+
+    assert len(run(main())) == 20
+    assert peak == 3
+
+
+def test_async_get_full_leaderboard_returns_all_players_in_rank_order(mocker):
+    async def leaderboard_page(url, params, **kwargs):
+        await asyncio.sleep(0.001 * (30 - params["start"]))  # later pages arrive first
+        return leaderboard_page_response(url, params)
+
+    mocker.patch("aoe2netapi.aio._get_request_response", side_effect=leaderboard_page)
+
+    async def main():
+        async with AsyncAPI() as api:
+            return await api.get_full_leaderboard(LeaderboardId.AOE_TWO_RM, page_size=10, max_in_flight=2)
+
+    leaderboard = run(main())
+    assert [player.rank for player in leaderboard.players] == list(range(1, 26))
+
+
+def test_async_leaderboard_pages_in_flight_are_cancelled_when_stopped_early(mocker):
+    cancelled = []
+
+    async def leaderboard_page(url, params, **kwargs):
+        if params["start"] == 21:
+            try:
+                await asyncio.sleep(10)
+            finally:
+                cancelled.append(params["start"])
+        await asyncio.sleep(0.01)  # the last page is requested in the meantime
+        return leaderboard_page_response(url, params)
+
+    mocker.patch("aoe2netapi.aio._get_request_response", side_effect=leaderboard_page)
+
+    async def main():
+        async with AsyncAPI(coalesce_requests=False) as api:  # coalesced requests are not cancelled by a waiter
+            players = api.iter_leaderboard(LeaderboardId.AOE_TWO_RM, page_size=10, max_in_flight=2)
+            ranks = [(await players.__anext__()).rank for _ in range(11)]
+            await players.aclose()
+            return ranks[-1], list(cancelled)
+
+    assert run(main()) == (11, [21])
+
+
+def test_async_match_history_page_in_flight_is_cancelled_when_stopped_early(mocker):
+    cancelled = []
+
+    async def match_history_page(url, params, **kwargs):
+        if params["start"] == 2:
+            try:
+                await asyncio.sleep(10)
+            finally:
+                cancelled.append(params["start"])
+        return match_history_page_response(url, params)
+
+    mocker.patch("aoe2netapi.aio._get_request_response", side_effect=match_history_page)
+
+    async def main():
+        async with AsyncAPI(coalesce_requests=False) as api:
+            matches = api.iter_match_history(Game.AOE_TWO_DE, profile_id="x", page_size=2)
+            match_id = (await matches.__anext__()).match_id
+            await asyncio.sleep(0.01)  # the next page is requested in the meantime
+            await matches.aclose()
+            return match_id, list(cancelled)
+
+    assert run(main()) == ("7", [2])
+
+
+def test_async_iter_match_history_stops_at_cutoff(mocker):
+    async def match_history_page(url, params, **kwargs):
+        return match_history_page_response(url, params)
+
+    mocker.patch("aoe2netapi.aio._get_request_response", side_effect=match_history_page)
+
+    async def main():
+        async with AsyncAPI() as api:
+            return [match.match_id async for match in
+                    api.iter_match_history(Game.AOE_TWO_DE, profile_id="x", page_size=2, until_match_id="3")]
+
+    assert run(main()) == ["7", "6", "5", "4"]
+
+
+def test_async_client_retries_failed_request(mocker):
+    error = aiohttp.ClientResponseError(request_info=None, history=(), status=503, headers={"Retry-After": "0"})
+    mocked = mocker.patch("aoe2netapi.aio._get_request_response", side_effect=[error, RANK_DETAILS])
+
+    async def main():
+        async with AsyncNightbot(retry_policy=RetryPolicy()) as nightbot:
+            return await nightbot.get_rank_details(LeaderboardId.AOE_TWO_RM, search="Sample Player")
+
+    assert run(main()) == RANK_DETAILS
+    assert mocked.call_count == 2
+
+
+def test_async_get_match_histories_reports_errors_per_player(mocker):
+    async def response(url, params, **kwargs):
+        if params["profile_id"] == "2":
+            raise Aoe2NetException("request failed")
+        return MATCH_HISTORY_RESPONSE
+
+    mocker.patch("aoe2netapi.aio._get_request_response", side_effect=response)
+
+    async def main():
+        async with AsyncAPI() as api:
+            return await api.get_match_histories(Game.AOE_TWO_DE, profile_ids=["1", "2", "3"], max_in_flight=2)
+
+    batch = run(main())
+    assert sorted(batch.results) == ["1", "3"]
+    assert list(batch.errors) == ["2"]
@@ -0,0 +1,53 @@
+import pytest
+
+from aoe2netapi import Aoe2NetException
+from aoe2netapi.constants import LeaderboardId
+from aoe2netapi.models import RatingHistory
+
+numpy = pytest.importorskip("numpy")
+from aoe2netapi import analytics  # noqa: E402
+
+
+def rating_history(*entries):
+    # the API returns the most recent entry first
+    return RatingHistory(LeaderboardId.AOE_TWO_RM, False, [
+        {'rating': rating, 'num_wins': wins, 'num_losses': losses, 'streak': 0, 'drops': 0, 'timestamp': str(timestamp)}
+        for timestamp, rating, wins, losses in reversed(entries)])
+
+
+HISTORY = rating_history((100, 1000, 1, 0), (200, 1016, 2, 0), (300, 1000, 2, 1), (400, 984, 2, 2), (500, 1010, 3, 2))
+
+
+def test_to_arrays_returns_typed_arrays_in_chronological_order():
+    arrays = HISTORY.to_arrays()
+    assert arrays.timestamp.dtype == numpy.int64 and arrays.rating.dtype == numpy.int32
+    assert arrays.timestamp.tolist() == [100, 200, 300, 400, 500]
+    assert arrays.rating.tolist() == [1000, 1016, 1000, 984, 1010]
+    assert len(arrays) == 5
+
+
+def test_helpers_on_a_single_history():
+    arrays = HISTORY.to_arrays()
+    assert analytics.peak(arrays.rating) == 1016
+    assert analytics.max_drawdown(arrays.rating) == 32
+    numpy.testing.assert_allclose(analytics.rolling_mean(arrays.rating, 2), [numpy.nan, 1008, 1008, 992, 997])
+    numpy.testing.assert_allclose(analytics.win_rates(arrays.num_wins, arrays.num_losses, 2),
+                                  [numpy.nan, numpy.nan, 0.5, 0, 0.5])
+    assert analytics.volatility(arrays.rating) == pytest.approx(numpy.std([16, -16, -16, 26]))
+
+
+def test_helpers_on_a_batch_of_histories():
+    histories = [HISTORY.to_arrays(), rating_history((150, 900, 0, 1), (250, 950, 1, 1)).to_arrays()]
+    ratings = analytics.stack(histories)
+    assert ratings.shape == (2, 5)
+    assert analytics.peak(ratings).tolist() == [1016, 950]
+    assert analytics.max_drawdown(ratings).tolist() == [32, 0]
+    numpy.testing.assert_allclose(analytics.rolling_mean(ratings, 2)[1], [numpy.nan, 925, 950, numpy.nan, numpy.nan])
+
+    resampled = analytics.resample(histories, grid=[50, 200, 260, 1000])
+    numpy.testing.assert_allclose(resampled, [[numpy.nan, 1016, 1016, 1010], [numpy.nan, 900, 950, 950]])
+
+
+def test_helpers_throw_aoe2net_exception_when_window_is_not_valid():
+    with pytest.raises(Aoe2NetException):
+        analytics.rolling_mean([1, 2], 0)
@@ -169,3 +169,139 @@ def test_get_rating_history_returns_rating_history(mocker):
     assert rating_history.leaderboard_id == LeaderboardId.AOE_TWO_RM.value.aoe2net_id
     assert rating_history.is_event_leaderboard is False
     assert len(rating_history.ratings) == 2
+
+
+def leaderboard_page_response(url, params, **kwargs):
+    total, start, count = 25, params["start"], params["count"]
+    players = [dict(RM_LEADERBOARD_RESPONSE["leaderboard"][0], profile_id=rank, rank=rank)
+               for rank in range(start, min(start + count, total + 1))]
+    return {'total': total, 'leaderboard_id': 3, 'start': start, 'count': len(players), 'leaderboard': players}
+
+
+@pytest.mark.parametrize("page_size, max_in_flight", [(0, 1), (10001, 1), (10, 0)])
+def test_iter_leaderboard_throws_aoe2net_exception_when_pagination_is_not_valid(page_size, max_in_flight):
+    api = API()
+    with pytest.raises(Aoe2NetException):
+        next(api.iter_leaderboard(LeaderboardId.AOE_TWO_RM, page_size=page_size, max_in_flight=max_in_flight))
+
+
+def test_iter_leaderboard_yields_all_players_in_rank_order(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=leaderboard_page_response)
+    api = API()
+    players = list(api.iter_leaderboard(LeaderboardId.AOE_TWO_RM, page_size=10, max_in_flight=2))
+    assert [player.rank for player in players] == list(range(1, 26))
+    assert mocked.call_count == 3
+
+
+def test_get_full_leaderboard_returns_leaderboard_with_all_players(mocker):
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=leaderboard_page_response)
+    api = API()
+    leaderboard = api.get_full_leaderboard(LeaderboardId.AOE_TWO_RM, page_size=4)
+    assert leaderboard.total == 25
+    assert leaderboard.count == 25
+    assert leaderboard.game == LeaderboardId.AOE_TWO_RM.value.game
+    assert [player.rank for player in leaderboard.players] == list(range(1, 26))
+
+
+def match_history_page_response(url, params, **kwargs):
+    total, start, count = 7, params["start"], params["count"]
+    return [dict(MATCH_HISTORY_RESPONSE[0], match_id=str(total - index), started=total - index)
+            for index in range(start, min(start + count, total))]
+
+
+def test_iter_match_history_throws_aoe2net_exception_when_page_size_is_more_than_1000():
+    api = API()
+    with pytest.raises(Aoe2NetException):
+        next(api.iter_match_history(game=Game.AOE_TWO_DE, profile_id="x", page_size=1001))
+
+
+def test_iter_match_history_yields_whole_history(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=match_history_page_response)
+    api = API()
+    matches = list(api.iter_match_history(game=Game.AOE_TWO_DE, profile_id="x", page_size=3))
+    assert [match.match_id for match in matches] == ["7", "6", "5", "4", "3", "2", "1"]
+    assert mocked.call_count == 3
+
+
+@pytest.mark.parametrize("cutoff", [{"until_match_id": "4"}, {"since": 5}])
+def test_iter_match_history_stops_at_cutoff(mocker, cutoff):
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=match_history_page_response)
+    api = API()
+    matches = list(api.iter_match_history(game=Game.AOE_TWO_DE, profile_id="x", page_size=2, **cutoff))
+    assert [match.match_id for match in matches] == ["7", "6", "5"]
+
+
+def test_iter_rating_history_stops_at_cutoff(mocker):
+    def rating_history_page_response(url, params, **kwargs):
+        return [dict(RATING_HISTORY_RESPONSE[0], timestamp=100 - index)
+                for index in range(params["start"], params["start"] + params["count"])]
+
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=rating_history_page_response)
+    api = API()
+    ratings = list(api.iter_rating_history(LeaderboardId.AOE_TWO_RM, profile_id="x", page_size=4, since=91))
+    assert [rating.timestamp for rating in ratings] == list(range(100, 90, -1))
+
+
+def test_get_leaderboard_columnar_returns_leaderboard_table(mocker):
+    mocker.patch(
+        "aoe2netapi.aoe2._get_request_response",
+        return_value=RM_LEADERBOARD_RESPONSE
+    )
+    api = API()
+    table = api.get_leaderboard(LeaderboardId.AOE_TWO_RM, columnar=True)
+    assert len(table) == 2
+    assert table.is_event_leaderboard is False
+    assert list(table.column("rating")) == [9999, 9998]
+    assert table.players == api.get_leaderboard(LeaderboardId.AOE_TWO_RM).players
+
+
+def test_get_full_leaderboard_columnar_returns_leaderboard_table_with_all_players(mocker):
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=leaderboard_page_response)
+    api = API()
+    table = api.get_full_leaderboard(LeaderboardId.AOE_TWO_RM, page_size=10, columnar=True)
+    assert table.count == 25
+    assert list(table.column("rank")) == list(range(1, 26))
+    assert table[-1].rank == 25
+
+
+def test_get_rating_histories_throws_aoe2net_exception_when_count_is_more_than_10000():
+    api = API()
+    with pytest.raises(Aoe2NetException):
+        api.get_rating_histories(LeaderboardId.AOE_TWO_RM, profile_ids=["1"], count=10001)
+
+
+def test_get_rating_histories_returns_rating_history_per_player(mocker):
+    mocked = mocker.patch(
+        "aoe2netapi.aoe2._get_request_response",
+        return_value=RATING_HISTORY_RESPONSE
+    )
+    api = API()
+    batch = api.get_rating_histories(LeaderboardId.AOE_TWO_RM, profile_ids=["1", "2", 3, "1"])
+    assert batch.ok
+    assert list(batch.results) == ["1", "2", "3"]
+    assert len(batch.results["3"].ratings) == 2
+    assert mocked.call_count == 3
+
+
+def test_get_match_histories_reports_errors_per_player(mocker):
+    def response(url, params, **kwargs):
+        if params["profile_id"] == "2":
+            raise Aoe2NetException("request failed")
+        return MATCH_HISTORY_RESPONSE
+
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=response)
+    api = API()
+    batch = api.get_match_histories(Game.AOE_TWO_DE, profile_ids=["1", "2", "3"], max_in_flight=2)
+    assert not batch.ok
+    assert sorted(batch.results) == ["1", "3"]
+    assert batch.results["1"][0].name == "AUTOMATCH"
+    assert isinstance(batch.errors["2"], Aoe2NetException)
+
+
+def test_get_strings_index_requests_strings_once_per_game(mocker):
+    mocker.patch.dict("aoe2netapi.aoe2._STRINGS_INDEXES", clear=True)
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", return_value=STRINGS_RESPONSE)
+    index = API().get_strings_index(Game.AOE_TWO_DE)
+    assert API().get_strings_index(Game.AOE_TWO_DE) is index
+    assert index.lookup("civ", 0) == "Sample Civ"
+    assert mocked.call_count == 1
@@ -0,0 +1,243 @@
+import asyncio
+
+import pytest
+import requests
+
+from aoe2netapi import API, AsyncAPI, Nightbot, aoe2
+from aoe2netapi.aoe2 import STRINGS_URL, CURRENT_MATCH_URL
+from aoe2netapi.cache import ConditionalCache, MemoryCache, ResponseCache, SqliteCache, _cache_key
+from aoe2netapi.constants import Game, LeaderboardId
+from aoe2netapi.instrumentation import Instrumentation
+from aoe2netapi.models import Leaderboard, LeaderboardTable
+from aoe2netapi.transport import FixtureServer, HttpTransport
+
+from tests.api_test import STRINGS_RESPONSE, RM_LEADERBOARD_RESPONSE
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        if request.param == "memory":
+            cache = MemoryCache(**kwargs)
+        else:
+            cache = SqliteCache(str(tmp_path / "cache.db"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        if isinstance(cache, SqliteCache):
+            cache.close()
+
+
+def test_cache_key_is_independent_of_parameter_order():
+    assert _cache_key(STRINGS_URL, {"a": 1, "b": "x"}) == _cache_key(STRINGS_URL, {"b": "x", "a": "1"})
+
+
+def test_cache_returns_cached_response_and_counts_hits_and_misses(make_cache):
+    cache = make_cache()
+    assert cache.get("key") is None
+    cache.set("key", {"value": [1, 2]}, ttl=60)
+    assert cache.get("key") == {"value": [1, 2]}
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_cache_does_not_return_expired_response(make_cache):
+    cache = make_cache()
+    cache.set("key", "value", ttl=-1)
+    assert cache.get("key") is None
+
+
+def test_cache_evicts_least_recently_used_entries(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set("a", "a", ttl=60)
+    cache.set("b", "b", ttl=60)
+    assert cache.get("a") == "a"  # 'b' is now the least recently used entry
+    cache.set("c", "c", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.stats.evictions == 1
+
+
+def test_cache_evicts_entries_when_exceeding_max_bytes(make_cache):
+    cache = make_cache(max_bytes=10)
+    cache.set("a", "x" * 6, ttl=60)
+    cache.set("b", "y" * 6, ttl=60)
+    assert cache.get("a") is None
+    assert cache.stats.bytes == 6
+
+
+def test_cache_counts_the_given_size_instead_of_estimating_it(make_cache, mocker):
+    size_of = mocker.patch("aoe2netapi.cache._size_of")
+    cache = make_cache()
+    cache.set("key", "value", ttl=60, size=20)
+    assert cache.stats.bytes == 20
+    assert size_of.call_count == 0
+
+
+def test_response_cache_requires_the_cache_methods():
+    with pytest.raises(TypeError):
+        ResponseCache()
+
+
+def test_client_caches_responses_with_the_size_of_their_body():
+    server, _ = leaderboard_server()
+    with server:
+        api = API(transport=HttpTransport(origin=server.url), cache=MemoryCache())
+        api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+        api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+        body = requests.get(server.url + "/api/leaderboard").content
+
+    assert (api.cache.stats.hits, api.cache.stats.entries) == (1, 1)
+    assert api.cache.stats.bytes == len(body)
+
+
+def test_async_client_caches_responses_with_the_size_of_their_body(mocker):
+    server, _ = leaderboard_server()
+
+    async def main():
+        async with AsyncAPI(cache=MemoryCache(), cache_ttls={server.url + "/api/leaderboard": 60}) as api:
+            await api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+            await api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+            return api.cache.stats
+
+    with server:
+        mocker.patch("aoe2netapi.aio.LEADERBOARD_URL", server.url + "/api/leaderboard")
+        stats = asyncio.run(main())
+        body = requests.get(server.url + "/api/leaderboard").content
+    assert (stats.hits, stats.bytes) == (1, len(body))
+
+
+def test_client_caches_responses_per_endpoint_ttl(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", return_value=STRINGS_RESPONSE)
+    api = API(cache=MemoryCache())
+    api.get_strings(Game.AOE_TWO_DE)
+    strings = api.get_strings(Game.AOE_TWO_DE)
+    assert strings.language == "en"
+    assert mocked.call_count == 1
+    assert api.cache.stats.hits == 1
+
+
+def test_client_does_not_cache_endpoints_without_ttl(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", return_value="Player not found")
+    nightbot = Nightbot(cache=MemoryCache(), cache_ttls={CURRENT_MATCH_URL: 0})
+    nightbot.get_current_or_last_match(profile_id="1")
+    nightbot.get_current_or_last_match(profile_id="1")
+    assert mocked.call_count == 2
+
+
+def leaderboard_server(etags=True):
+    """ A `FixtureServer` whose leaderboard changes when 'total' of the returned dict is changed. """
+
+    state = {"total": RM_LEADERBOARD_RESPONSE["total"]}
+    server = FixtureServer(routes={"/api/leaderboard": lambda params: dict(RM_LEADERBOARD_RESPONSE, **state)},
+                           etags=etags)
+    return server, state
+
+
+def test_client_returns_last_model_for_not_modified_responses(mocker):
+    decode = mocker.spy(aoe2, "_decode_body")
+    server, state = leaderboard_server()
+    with server:
+        api = API(transport=HttpTransport(origin=server.url), conditional_cache=ConditionalCache())
+        first = api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+        assert api.get_leaderboard(LeaderboardId.AOE_TWO_RM) is first
+        state["total"] = 1
+        changed = api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+
+    assert (first.total, changed.total) == (RM_LEADERBOARD_RESPONSE["total"], 1)
+    assert decode.call_count == 2
+    stats = api.conditional_cache.stats
+    assert (stats.not_modified, stats.unchanged, stats.modified, stats.entries) == (1, 0, 2, 1)
+
+
+def test_client_returns_last_model_for_identical_responses_without_validators(mocker):
+    decode = mocker.spy(aoe2, "_decode_body")
+    server, _ = leaderboard_server(etags=False)
+    with server:
+        api = API(transport=HttpTransport(origin=server.url), conditional_cache=ConditionalCache())
+        first = api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+        assert api.get_leaderboard(LeaderboardId.AOE_TWO_RM) is first
+
+    assert decode.call_count == 1
+    assert (api.conditional_cache.stats.unchanged, api.conditional_cache.stats.modified) == (1, 1)
+
+
+def test_instrumented_conditional_calls_skip_decoding_and_building():
+    collected = []
+    server, _ = leaderboard_server()
+    with server:
+        api = API(transport=HttpTransport(origin=server.url), conditional_cache=ConditionalCache(),
+                  instrumentation=Instrumentation(collected.append))
+        api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+        api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+
+    modified, not_modified = collected
+    assert (modified.outcome, modified.decode > 0, modified.build > 0) == ("200", True, True)
+    assert (not_modified.outcome, not_modified.response_bytes, not_modified.decode, not_modified.build) == \
+        ("304", 0, 0.0, 0.0)
+
+
+def test_shared_columnar_pages_are_not_modified_by_merging():
+    server, _ = leaderboard_server()
+    with server:
+        api = API(transport=HttpTransport(origin=server.url), conditional_cache=ConditionalCache())
+        page = api.get_leaderboard(LeaderboardId.AOE_TWO_RM, count=10000, columnar=True)
+        full = api.get_full_leaderboard(LeaderboardId.AOE_TWO_RM, columnar=True)
+    assert full is not page
+    assert len(page) == len(RM_LEADERBOARD_RESPONSE["leaderboard"])
+
+
+def test_conditional_cache_evicts_least_recently_used_entries():
+    cache = ConditionalCache(max_entries=1)
+    cache.resolve("a", None, 200, {"ETag": '"a"'}, b"[]", lambda body: ["a"])
+    cache.resolve("b", None, 200, {}, b"[]", lambda body: ["b"])
+    assert cache.get("a") is None
+    assert cache.get("b").request_headers == {}
+    assert cache.stats.entries == 1
+
+
+def test_async_client_returns_last_model_for_not_modified_responses(mocker):
+    server, _ = leaderboard_server()
+
+    async def main():
+        async with AsyncAPI(conditional_cache=ConditionalCache()) as api:
+            first = await api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+            return first, await api.get_leaderboard(LeaderboardId.AOE_TWO_RM), api.conditional_cache.stats
+
+    with server:
+        mocker.patch("aoe2netapi.aio.LEADERBOARD_URL", server.url + "/api/leaderboard")
+        first, second, stats = asyncio.run(main())
+    assert second is first
+    assert (stats.not_modified, stats.modified) == (1, 1)
+
+
+def test_conditional_cache_keeps_columnar_and_regular_leaderboards_apart():
+    server, _ = leaderboard_server()
+    with server:
+        api = API(transport=HttpTransport(origin=server.url), conditional_cache=ConditionalCache())
+        regular = api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+        table = api.get_leaderboard(LeaderboardId.AOE_TWO_RM, columnar=True)
+        assert api.get_leaderboard(LeaderboardId.AOE_TWO_RM) is regular
+        assert api.get_leaderboard(LeaderboardId.AOE_TWO_RM, columnar=True) is table
+
+    assert isinstance(regular, Leaderboard) and isinstance(table, LeaderboardTable)
+    assert api.conditional_cache.stats.entries == 2
+
+
+def test_concurrent_columnar_and_regular_calls_are_not_coalesced(mocker):
+    server, _ = leaderboard_server()
+
+    async def main():
+        async with AsyncAPI(conditional_cache=ConditionalCache()) as api:
+            return await asyncio.gather(api.get_leaderboard(LeaderboardId.AOE_TWO_RM),
+                                        api.get_leaderboard(LeaderboardId.AOE_TWO_RM, columnar=True))
+
+    with server:
+        mocker.patch("aoe2netapi.aio.LEADERBOARD_URL", server.url + "/api/leaderboard")
+        regular, table = asyncio.run(main())
+    assert isinstance(regular, Leaderboard) and isinstance(table, LeaderboardTable)
@@ -0,0 +1,30 @@
+from aoe2netapi import API, Nightbot
+from aoe2netapi.aoe2 import LEADERBOARD_URL
+
+
+def test_client_shares_one_pooled_session_across_calls(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", return_value={})
+    api = API(pool_maxsize=4, timeout=(1, 5))
+    api._request(url=LEADERBOARD_URL)
+    api._request(url=LEADERBOARD_URL)
+    sessions = {call.kwargs["session"] for call in mocked.call_args_list}
+    assert sessions == {api._session}
+    assert mocked.call_args.kwargs["timeout"] == (1, 5)
+
+
+def test_client_mounts_adapter_with_configured_pool_size():
+    api = API(pool_connections=2, pool_maxsize=7)
+    adapter = api._session.get_adapter("https://aoe2.net/api")
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 7
+
+
+def test_client_without_keep_alive_sends_connection_close_header():
+    nightbot = Nightbot(keep_alive=False)
+    assert nightbot._session.headers["Connection"] == "close"
+
+
+def test_client_context_manager_closes_session(mocker):
+    with API() as api:
+        close = mocker.spy(api._session, "close")
+    close.assert_called_once()
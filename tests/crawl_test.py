@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from aoe2netapi import Aoe2NetException
+from aoe2netapi.constants import LeaderboardId, EventLeaderboardId
+from aoe2netapi.crawl import crawl_leaderboards
+from aoe2netapi.transport import FixtureServer, HttpTransport
+
+from tests.api_test import RM_LEADERBOARD_RESPONSE
+
+TOTALS = {"3": 25, "4": 0, "1": 7}
+
+
+def leaderboard(params, shift=0):
+    """ A leaderboard of TOTALS[id] players. 'shift' moves the players of the pages after the first one up. """
+
+    leaderboard_id = params.get("leaderboard_id") or params.get("event_leaderboard_id")
+    total, start, count = TOTALS[leaderboard_id], int(params["start"]), int(params["count"])
+    first = start - shift if start > 1 else start
+    players = [dict(RM_LEADERBOARD_RESPONSE["leaderboard"][0], profile_id=int(leaderboard_id) * 1000 + rank,
+                    rank=rank, rating=3000 - rank, name="Player {}".format(rank))
+               for rank in range(first, min(first + count, total + 1))]
+    return {"total": total, "leaderboard_id": int(leaderboard_id), "start": start, "count": len(players),
+            "leaderboard": players}
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+@pytest.fixture
+def server():
+    with FixtureServer(routes={"/api/leaderboard": leaderboard}) as server:
+        yield server
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_crawl_leaderboards_writes_rank_ordered_files(server, tmp_path, processes):
+    results = crawl_leaderboards(str(tmp_path), [LeaderboardId.AOE_TWO_RM, LeaderboardId.AOE_TWO_RM_TEAM,
+                                                 EventLeaderboardId.AOE_FOUR_SEASON_ONE],
+                                 page_size=10, processes=processes,
+                                 client_options={"transport": HttpTransport(origin=server.url)})
+
+    rm = results[LeaderboardId.AOE_TWO_RM]
+    assert (rm.total, rm.rows, len(rm.shards)) == (25, 25, 3)
+    assert rm.path == str(tmp_path / "aoe_two_rm.jsonl")
+    assert [player["rank"] for player in read_jsonl(rm.path)] == list(range(1, 26))
+    assert read_jsonl(rm.path)[0]["profile_id"] == 3001
+
+    assert (results[LeaderboardId.AOE_TWO_RM_TEAM].rows, read_jsonl(tmp_path / "aoe_two_rm_team.jsonl")) == (0, [])
+    assert results[EventLeaderboardId.AOE_FOUR_SEASON_ONE].rows == 7
+    assert (tmp_path / "event_aoe_four_season_one.jsonl").exists()
+    assert list((tmp_path / "shards").iterdir()) == []
+
+
+def test_crawl_leaderboards_keeps_players_moved_across_pages_once(tmp_path):
+    with FixtureServer(routes={"/api/leaderboard": lambda params: leaderboard(params, shift=1)}) as server:
+        results = crawl_leaderboards(str(tmp_path), [LeaderboardId.AOE_TWO_RM], page_size=10, processes=0,
+                                     client_options={"transport": HttpTransport(origin=server.url)},
+                                     keep_shards=True)
+
+    result = results[LeaderboardId.AOE_TWO_RM]
+    assert sum(len(read_jsonl(shard)) for shard in result.shards) == 26
+    assert [player["rank"] for player in read_jsonl(result.path)] == list(range(1, 26))
+
+
+def test_crawl_leaderboards_writes_parquet(server, tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    results = crawl_leaderboards(str(tmp_path), [LeaderboardId.AOE_TWO_RM, LeaderboardId.AOE_TWO_RM_TEAM],
+                                 page_size=10, processes=2, shard_format="parquet",
+                                 client_options={"transport": HttpTransport(origin=server.url)})
+
+    table = pyarrow.parquet.read_table(results[LeaderboardId.AOE_TWO_RM].path)
+    assert table.column("rank").to_pylist() == list(range(1, 26))
+    assert pyarrow.parquet.read_table(results[LeaderboardId.AOE_TWO_RM_TEAM].path).num_rows == 0
+
+
+def test_crawl_leaderboards_merges_parquet_shards_batch_by_batch(tmp_path, mocker):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    mocker.patch("aoe2netapi.crawl._MERGE_BATCH_SIZE", 4)
+    with FixtureServer(routes={"/api/leaderboard": lambda params: leaderboard(params, shift=1)}) as server:
+        results = crawl_leaderboards(str(tmp_path), [LeaderboardId.AOE_TWO_RM], page_size=10, processes=0,
+                                     shard_format="parquet",
+                                     client_options={"transport": HttpTransport(origin=server.url)})
+
+    file = pyarrow.parquet.ParquetFile(results[LeaderboardId.AOE_TWO_RM].path)
+    assert file.read().column("rank").to_pylist() == list(range(1, 26))
+    assert file.metadata.num_row_groups == 7
+
+
+@pytest.mark.parametrize("kwargs", [{"page_size": 0}, {"page_size": 10001}, {"shard_format": "csv"}])
+def test_crawl_leaderboards_throws_aoe2net_exception_when_arguments_are_not_valid(tmp_path, kwargs):
+    with pytest.raises(Aoe2NetException):
+        crawl_leaderboards(str(tmp_path), [LeaderboardId.AOE_TWO_RM], **kwargs)
@@ -0,0 +1,74 @@
+import pytest
+
+from aoe2netapi import API
+from aoe2netapi.constants import LeaderboardId, Game
+from aoe2netapi.models.leaderboard import _decode_leaderboard, _decode_leaderboard_table
+from aoe2netapi.models.matchhistory import _decode_match_history
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.feather  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+from aoe2netapi import export  # noqa: E402
+
+from tests.api_test import RM_LEADERBOARD_RESPONSE, MATCH_HISTORY_RESPONSE, leaderboard_page_response, \
+    match_history_page_response  # noqa: E402
+
+LEADERBOARD_RESPONSE = dict(RM_LEADERBOARD_RESPONSE, leaderboard=[
+    RM_LEADERBOARD_RESPONSE["leaderboard"][0], dict(RM_LEADERBOARD_RESPONSE["leaderboard"][1], streak=None)])
+
+
+@pytest.mark.parametrize("decode", [_decode_leaderboard, _decode_leaderboard_table])
+def test_leaderboard_to_record_batch_uses_the_leaderboard_schema(decode):
+    batch = export.leaderboard_to_record_batch(decode(LEADERBOARD_RESPONSE))
+    assert batch.schema == export.LEADERBOARD_SCHEMA
+    assert batch.column("profile_id").to_pylist() == ["1", "2"]
+    assert batch.column("rating").to_pylist() == [9999, 9998]
+    assert batch.column("streak").to_pylist() == [1, None]
+
+
+def test_leaderboard_table_cannot_be_extended_while_its_record_batch_is_alive():
+    table = _decode_leaderboard_table(LEADERBOARD_RESPONSE)
+    batch = export.leaderboard_to_record_batch(table)
+    with pytest.raises(BufferError):
+        table.append(LEADERBOARD_RESPONSE["leaderboard"][0])
+    with pytest.raises(BufferError):
+        table.extend(_decode_leaderboard_table(LEADERBOARD_RESPONSE))
+    assert len(table.column("name")) == 2
+    assert batch.column("rating").to_pylist() == [9999, 9998]
+
+    del batch
+    table.append(LEADERBOARD_RESPONSE["leaderboard"][0])
+    assert len(table) == 3
+
+
+def test_match_histories_to_record_batch_nests_players():
+    batch = export.match_histories_to_record_batch([_decode_match_history(match) for match in MATCH_HISTORY_RESPONSE])
+    assert batch.schema == export.MATCH_HISTORY_SCHEMA
+    assert batch.num_rows == len(MATCH_HISTORY_RESPONSE)
+    players = batch.column("players").to_pylist()[0]
+    assert [player["civ"] for player in players] == [player["civ"] for player in MATCH_HISTORY_RESPONSE[0]["players"]]
+    assert batch.column("match_uuid").to_pylist()[0] == MATCH_HISTORY_RESPONSE[0]["match_uuid"]
+
+
+def test_match_histories_without_players_are_exported_with_an_empty_list():
+    match = _decode_match_history(dict(MATCH_HISTORY_RESPONSE[0], players=None))
+    batch = export.match_histories_to_record_batch([match])
+    assert batch.column("players").to_pylist() == [[]]
+
+
+def test_leaderboard_record_batches_are_streamed_to_parquet(mocker, tmp_path):
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=leaderboard_page_response)
+    batches = export.iter_leaderboard_record_batches(API(), LeaderboardId.AOE_TWO_RM, page_size=10, max_in_flight=2)
+    path = str(tmp_path / "leaderboard.parquet")
+    assert export.write_parquet(path, batches, export.LEADERBOARD_SCHEMA) == 25
+    table = pyarrow.parquet.read_table(path)
+    assert table.column("rank").to_pylist() == list(range(1, 26))
+
+
+def test_match_history_record_batches_are_streamed_to_feather(mocker, tmp_path):
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=match_history_page_response)
+    batches = export.iter_match_history_record_batches(API(), Game.AOE_TWO_DE, profile_id="x", page_size=3)
+    path = str(tmp_path / "matches.feather")
+    assert export.write_feather(path, batches, export.MATCH_HISTORY_SCHEMA) == 7
+    table = pyarrow.feather.read_table(path)
+    assert table.column("match_id").to_pylist() == ["7", "6", "5", "4", "3", "2", "1"]
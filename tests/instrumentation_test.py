@@ -0,0 +1,283 @@
+import asyncio
+import json
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from aoe2netapi import API, AsyncAPI, Nightbot
+from aoe2netapi.cache import MemoryCache
+from aoe2netapi.constants import LeaderboardId, Game
+from aoe2netapi.aoe2 import _accept_encoding
+from aoe2netapi.instrumentation import Instrumentation, OpenTelemetryExporter, PrometheusExporter, RequestMetrics, \
+    ResponseSizes, _TimedHTTPAdapter
+from aoe2netapi.ratelimit import RetryPolicy
+from aoe2netapi.transport import FixtureServer, HttpTransport, ReplayTransport
+
+from tests.api_test import RM_LEADERBOARD_RESPONSE
+
+ROUTES = {
+    "/api/leaderboard": lambda params: RM_LEADERBOARD_RESPONSE,
+    "/api/nightbot/rank": lambda params: "Sample Player 1 (9999) is #1",
+}
+
+
+@pytest.fixture
+def server():
+    with FixtureServer(routes=ROUTES) as server:
+        yield server
+
+
+def test_instrumented_call_is_split_into_phases(server):
+    collected = []
+    api = API(transport=HttpTransport(origin=server.url), instrumentation=Instrumentation(collected.append))
+    leaderboard = api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    api.get_leaderboard(LeaderboardId.AOE_TWO_RM, start=2)
+
+    assert leaderboard.total == RM_LEADERBOARD_RESPONSE["total"]
+    first, second = collected
+    assert first.endpoint == "/api/leaderboard"
+    assert first.params["leaderboard_id"] == 3
+    assert (first.status, first.attempts, first.outcome, first.error) == (200, 1, "200", None)
+    assert first.response_bytes == len(json.dumps(RM_LEADERBOARD_RESPONSE))
+    assert first.dns is None
+    assert first.connect > 0 and second.connect == 0  # the connection is reused
+    assert all(seconds > 0 for phase, seconds in first.phases.items() if phase not in ("dns", "connect"))
+    assert first.total >= sum(first.phases.values())
+
+
+def test_instrumented_cached_and_failed_calls(server):
+    collected = []
+    api = API(transport=HttpTransport(origin=server.url), cache=MemoryCache(),
+              instrumentation=Instrumentation(collected.append))
+    api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    with pytest.raises(requests.HTTPError):
+        api.get_match_history(Game.AOE_TWO_DE, profile_id="1")
+
+    assert [metrics.outcome for metrics in collected] == ["200", "cached", "404"]
+    assert (collected[1].attempts, collected[1].response_bytes, collected[1].build > 0) == (0, 0, True)
+    assert isinstance(collected[2].error, requests.HTTPError)
+
+
+def test_instrumented_nightbot_call_has_no_build_phase(server):
+    collected = []
+    nightbot = Nightbot(transport=HttpTransport(origin=server.url), instrumentation=Instrumentation(collected.append))
+    assert nightbot.get_rank_details(LeaderboardId.AOE_TWO_RM, profile_id="1") == "Sample Player 1 (9999) is #1"
+    assert (collected[0].endpoint, collected[0].status, collected[0].build) == ("/api/nightbot/rank", 200, 0.0)
+
+
+def test_instrumented_call_counts_retried_attempts(tmp_path, mocker):
+    mocker.patch("aoe2netapi.aoe2.time.sleep")
+    collected = []
+    api = API(transport=ReplayTransport(str(tmp_path), error_rate=1), retry_policy=RetryPolicy(max_retries=2),
+              instrumentation=Instrumentation(collected.append))
+    with pytest.raises(requests.HTTPError):
+        api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    assert (collected[0].attempts, collected[0].status) == (3, 503)
+
+
+def test_not_instrumented_client_takes_the_plain_path(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", return_value=RM_LEADERBOARD_RESPONSE)
+    api = API()
+    api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    assert mocked.call_args.kwargs["metrics"] is None
+    assert type(api._session.get_adapter("https://aoe2.net")) is HTTPAdapter
+    assert isinstance(API(instrumentation=Instrumentation())._session.get_adapter("https://aoe2.net"),
+                      _TimedHTTPAdapter)
+
+
+def test_instrumentation_hooks_can_be_added_and_removed():
+    first, second = [], []
+    instrumentation = Instrumentation(first.append)
+    instrumentation.add_hook(second.append)
+    instrumentation.emit(RequestMetrics("https://aoe2.net/api/strings"))
+    instrumentation.remove_hook(first.append)
+    instrumentation.emit(RequestMetrics("https://aoe2.net/api/strings"))
+    assert (len(first), len(second)) == (1, 2)
+
+
+def test_prometheus_exporter_renders_aggregated_metrics():
+    exporter = PrometheusExporter(buckets=(0.1, 1.0))
+    exporter(RequestMetrics("https://aoe2.net/api/leaderboard", status=200, attempts=1, response_bytes=100,
+                            ttfb=0.02, decode=0.01, total=0.05))
+    exporter(RequestMetrics("https://aoe2.net/api/leaderboard", status=200, attempts=1, response_bytes=50,
+                            ttfb=0.3, total=0.5))
+    exporter(RequestMetrics("https://aoe2.net/api/leaderboard", cached=True, total=0.001))
+
+    lines = exporter.render().splitlines()
+    assert 'aoe2net_requests_total{endpoint="/api/leaderboard",status="200"} 2' in lines
+    assert 'aoe2net_requests_total{endpoint="/api/leaderboard",status="cached"} 1' in lines
+    assert 'aoe2net_request_duration_seconds_bucket{endpoint="/api/leaderboard",le="0.1"} 2' in lines
+    assert 'aoe2net_request_duration_seconds_bucket{endpoint="/api/leaderboard",le="1.0"} 3' in lines
+    assert 'aoe2net_request_duration_seconds_bucket{endpoint="/api/leaderboard",le="+Inf"} 3' in lines
+    assert 'aoe2net_request_phase_seconds_total{endpoint="/api/leaderboard",phase="decode"} 0.01' in lines
+    assert 'aoe2net_response_bytes_total{endpoint="/api/leaderboard"} 150' in lines
+    assert 'aoe2net_response_compressed_bytes_total{endpoint="/api/leaderboard"} 0' in lines
+
+
+class FakeInstrument:
+    def __init__(self, name):
+        self.name = name
+        self.values = []
+
+    def add(self, value, attributes):
+        self.values.append((value, attributes))
+
+    record = add
+
+
+class FakeMeter:
+    def __init__(self):
+        self.instruments = {}
+
+    def create_instrument(self, name, unit="", description=""):
+        return self.instruments.setdefault(name, FakeInstrument(name))
+
+    create_counter = create_histogram = create_instrument
+
+
+def test_open_telemetry_exporter_records_via_meter():
+    meter = FakeMeter()
+    exporter = OpenTelemetryExporter(meter)
+    exporter(RequestMetrics("https://aoe2.net/api/strings", status=200, attempts=1, response_bytes=10, ttfb=0.2,
+                            total=0.25))
+
+    instruments = meter.instruments
+    assert instruments["aoe2net.requests"].values == [(1, {"endpoint": "/api/strings", "status": "200"})]
+    assert instruments["aoe2net.request.duration"].values == [(0.25, {"endpoint": "/api/strings", "status": "200"})]
+    assert instruments["aoe2net.request.phase.duration"].values == [(0.2, {"endpoint": "/api/strings",
+                                                                           "phase": "ttfb"})]
+    assert instruments["aoe2net.response.size"].values == [(10, {"endpoint": "/api/strings"})]
+
+
+def test_instrumented_async_call_measures_dns_and_connect(server, mocker):
+    mocker.patch("aoe2netapi.aio.LEADERBOARD_URL", server.url.replace("127.0.0.1", "localhost") + "/api/leaderboard")
+    collected = []
+
+    async def main():
+        async with AsyncAPI(instrumentation=Instrumentation(collected.append)) as api:
+            return await api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+
+    assert asyncio.run(main()).total == RM_LEADERBOARD_RESPONSE["total"]
+    metrics = collected[0]
+    assert (metrics.status, metrics.attempts, metrics.response_bytes) == (200, 1, len(json.dumps(
+        RM_LEADERBOARD_RESPONSE)))
+    assert metrics.dns > 0 and metrics.connect > 0
+    assert metrics.ttfb > 0 and metrics.build > 0
+
+
+OPTIONAL_DECODERS = {"zstd": "backports.zstd", "br": "brotli"}
+LARGE_LEADERBOARD_RESPONSE = dict(RM_LEADERBOARD_RESPONSE, leaderboard=RM_LEADERBOARD_RESPONSE["leaderboard"] * 50)
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "br", "gzip", "deflate"])
+def test_instrumented_call_measures_compressed_and_decompressed_size(mocker, encoding):
+    if encoding in OPTIONAL_DECODERS:
+        pytest.importorskip(OPTIONAL_DECODERS[encoding])
+    mocker.patch.dict("aoe2netapi.aoe2.headers", {"Accept-Encoding": encoding})
+    sizes, collected = ResponseSizes(), []
+    with FixtureServer(routes={"/api/leaderboard": lambda params: LARGE_LEADERBOARD_RESPONSE}, compress=True) as server:
+        api = API(transport=HttpTransport(origin=server.url), instrumentation=Instrumentation(sizes, collected.append))
+        leaderboard = api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+        players = list(api.stream_leaderboard(LeaderboardId.AOE_TWO_RM))  # decompressed while received
+
+    assert len(leaderboard.players) == len(players) == 100
+    assert [metrics.content_encoding for metrics in collected] == [encoding, encoding]
+    assert collected[0].compressed_bytes == collected[1].compressed_bytes
+    size = sizes.per_endpoint()["/api/leaderboard"]
+    assert (size.responses, size.decompressed_bytes) == (2, 2 * len(json.dumps(LARGE_LEADERBOARD_RESPONSE)))
+    assert 0 < size.compressed_bytes < size.decompressed_bytes / 10
+    assert size.ratio > 10
+    assert sizes.total() == size
+
+
+def test_instrumented_streamed_call_is_measured_once_done(server):
+    collected = []
+    api = API(transport=HttpTransport(origin=server.url), instrumentation=Instrumentation(collected.append))
+    players = []
+    for player in api.stream_leaderboard(LeaderboardId.AOE_TWO_RM):
+        players.append(player)
+        assert collected == []  # not done yet
+    stream = api.stream_leaderboard(LeaderboardId.AOE_TWO_RM)
+    next(stream)
+    stream.close()  # closed early
+
+    assert len(players) == len(RM_LEADERBOARD_RESPONSE["leaderboard"])
+    done, closed = collected
+    assert (done.endpoint, done.status, done.attempts, done.error) == ("/api/leaderboard", 200, 1, None)
+    assert done.response_bytes == len(json.dumps(RM_LEADERBOARD_RESPONSE))
+    assert done.ttfb > 0 and done.decode > 0 and done.download >= 0 and done.build == 0.0
+    assert done.total >= sum(done.phases.values())
+    assert (closed.status, closed.error, closed.total > 0) == (200, None, True)
+
+
+def test_instrumented_streamed_call_counts_failed_attempts(server, mocker):
+    collected = []
+    mocker.patch("aoe2netapi.aoe2.LEADERBOARD_URL", "https://aoe2.net/api/missing")
+    api = API(transport=HttpTransport(origin=server.url), instrumentation=Instrumentation(collected.append))
+    with pytest.raises(requests.HTTPError):
+        list(api.stream_leaderboard(LeaderboardId.AOE_TWO_RM))
+    assert (collected[0].status, collected[0].attempts, collected[0].outcome) == (404, 1, "404")
+    assert isinstance(collected[0].error, requests.HTTPError)
+
+
+def test_instrumented_async_streamed_call_is_measured(server, mocker):
+    mocker.patch("aoe2netapi.aio.LEADERBOARD_URL", server.url.replace("127.0.0.1", "localhost") + "/api/leaderboard")
+    collected = []
+
+    async def main():
+        async with AsyncAPI(instrumentation=Instrumentation(collected.append)) as api:
+            return [player async for player in api.stream_leaderboard(LeaderboardId.AOE_TWO_RM)]
+
+    assert len(asyncio.run(main())) == len(RM_LEADERBOARD_RESPONSE["leaderboard"])
+    metrics = collected[0]
+    assert (metrics.status, metrics.attempts) == (200, 1)
+    assert metrics.response_bytes == metrics.compressed_bytes == len(json.dumps(RM_LEADERBOARD_RESPONSE))
+    assert metrics.dns > 0 and metrics.connect > 0 and metrics.ttfb > 0 and metrics.decode > 0
+
+
+def test_instrumented_async_streamed_call_is_measured_when_stopped_early(server, mocker):
+    mocker.patch("aoe2netapi.aio.LEADERBOARD_URL", server.url + "/api/leaderboard")
+    collected = []
+
+    async def main():
+        async with AsyncAPI(instrumentation=Instrumentation(collected.append)) as api:
+            players = api.stream_leaderboard(LeaderboardId.AOE_TWO_RM)
+            await players.__anext__()
+            await players.aclose()
+            return len(collected)
+
+    assert asyncio.run(main()) == 1
+    assert (collected[0].status, collected[0].error) == (200, None)
+
+
+def test_not_compressed_responses_have_the_same_compressed_and_decompressed_size(server):
+    collected = []
+    api = API(transport=HttpTransport(origin=server.url), instrumentation=Instrumentation(collected.append))
+    api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    assert collected[0].compressed_bytes == collected[0].response_bytes > 0
+    assert collected[0].content_encoding is None
+
+
+def test_clients_accept_compressed_responses():
+    assert _accept_encoding(brotli=True, zstd=True) == "zstd, br, gzip, deflate"
+    assert _accept_encoding(brotli=False, zstd=False) == "gzip, deflate"
+    assert "gzip" in API()._session.headers["Accept-Encoding"]
+
+
+def test_instrumented_async_call_measures_compressed_size(mocker):
+    collected = []
+
+    async def main():
+        async with AsyncAPI(instrumentation=Instrumentation(collected.append)) as api:
+            leaderboard = await api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+            return leaderboard.players + [player async for player in api.stream_leaderboard(LeaderboardId.AOE_TWO_RM)]
+
+    with FixtureServer(routes={"/api/leaderboard": lambda params: LARGE_LEADERBOARD_RESPONSE}, compress=True) as server:
+        mocker.patch("aoe2netapi.aio.LEADERBOARD_URL", server.url + "/api/leaderboard")
+        assert len(asyncio.run(main())) == 2 * 100
+
+    for metrics in collected:
+        assert metrics.content_encoding is not None
+        assert 0 < metrics.compressed_bytes < metrics.response_bytes == len(json.dumps(LARGE_LEADERBOARD_RESPONSE))
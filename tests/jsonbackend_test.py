@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from aoe2netapi import API, Nightbot
+from aoe2netapi.aoe2 import _get_request_response
+from aoe2netapi.constants import LeaderboardId
+from aoe2netapi.jsonbackend import JSON_BACKENDS, available_json_backends, get_json_backend
+
+from tests.api_test import RM_LEADERBOARD_RESPONSE, MATCH_HISTORY_RESPONSE
+
+
+def test_get_json_backend_defaults_to_the_fastest_installed_backend():
+    assert get_json_backend().name == available_json_backends()[0]
+    assert available_json_backends()[-1] == "json"
+
+
+@pytest.mark.parametrize("name", available_json_backends())
+def test_json_backends_decode_responses_equally(name):
+    for response in (RM_LEADERBOARD_RESPONSE, MATCH_HISTORY_RESPONSE):
+        assert get_json_backend(name).loads(json.dumps(response).encode()) == response
+
+
+def test_get_json_backend_throws_value_error_when_backend_is_not_available(mocker):
+    mocker.patch.dict("aoe2netapi.jsonbackend._loaded", {name: None for name in JSON_BACKENDS if name != "json"})
+    assert get_json_backend().name == "json"
+    with pytest.raises(ValueError):
+        get_json_backend("orjson")
+    with pytest.raises(ValueError):
+        get_json_backend("yaml")
+
+
+def test_client_decodes_responses_with_its_json_backend(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", return_value=RM_LEADERBOARD_RESPONSE)
+    api = API(json_backend="json")
+    api.get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    assert api.json_backend.name == "json"
+    assert mocked.call_args.kwargs["loads"] is json.loads
+    with pytest.raises(ValueError):
+        Nightbot(json_backend="yaml")
+
+
+def test_get_request_response_decodes_the_response_body_with_loads(mocker):
+    response = mocker.Mock(content=b'{"total": 1}')
+    session = mocker.Mock(**{"get.return_value": response})
+    loads = mocker.Mock(return_value={"total": 1})
+    assert _get_request_response("url", session=session, loads=loads) == {"total": 1}
+    loads.assert_called_once_with(b'{"total": 1}')
+    response.json.assert_not_called()
@@ -0,0 +1,110 @@
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from aoe2netapi.models import Leaderboard, MatchHistory, RatingHistoryItem, Strings
+from aoe2netapi.models.leaderboard import _decode_leaderboard, _decode_leaderboard_table
+from aoe2netapi.models.matchhistory import _decode_match_history, _decode_lazy_match_history
+from aoe2netapi.models.ratinghistory import _decode_rating_history_item
+from aoe2netapi.models.strings import _decode_strings
+
+from tests.api_test import STRINGS_RESPONSE, RM_LEADERBOARD_RESPONSE, EMPTY_EVENT_LEADERBOARD_RESPONSE, \
+    MATCH_HISTORY_RESPONSE, RATING_HISTORY_RESPONSE
+
+
+@pytest.mark.parametrize("response", [
+    RM_LEADERBOARD_RESPONSE,
+    EMPTY_EVENT_LEADERBOARD_RESPONSE,
+    dict(RM_LEADERBOARD_RESPONSE, unknown_property=1),
+    {'total': 1, 'start': 1, 'count': 0},
+])
+def test_decode_leaderboard_equals_from_dict(response):
+    assert _decode_leaderboard(response) == Leaderboard.from_dict(response, infer_missing=True)
+
+
+@pytest.mark.parametrize("response", [
+    MATCH_HISTORY_RESPONSE[0],
+    dict(MATCH_HISTORY_RESPONSE[0], unknown_property=1, match_uuid=None),
+    {'match_id': '1', 'name': 'AUTOMATCH'},
+    dict(MATCH_HISTORY_RESPONSE[0], players=None),
+])
+def test_decode_match_history_equals_from_dict(response):
+    assert _decode_match_history(response) == MatchHistory.from_dict(response, infer_missing=True)
+
+
+@pytest.mark.parametrize("response", [
+    MATCH_HISTORY_RESPONSE[0],
+    dict(MATCH_HISTORY_RESPONSE[0], unknown_property=1, match_uuid=None),
+    {'match_id': '1', 'name': 'AUTOMATCH'},
+    dict(MATCH_HISTORY_RESPONSE[0], players=None),
+])
+def test_lazy_match_history_equals_from_dict(response):
+    match = _decode_lazy_match_history(response)
+    assert isinstance(match, MatchHistory)
+    assert match == MatchHistory.from_dict(response, infer_missing=True)
+    assert MatchHistory.from_dict(response, infer_missing=True) == match
+    assert dataclasses.asdict(match) == dataclasses.asdict(_decode_match_history(response))
+
+
+def test_lazy_match_history_builds_properties_on_first_access():
+    match = _decode_lazy_match_history(MATCH_HISTORY_RESPONSE[0])
+    assert match.match_id == "XXXXXXXXX"
+    assert "players" not in vars(match) and "match_uuid" not in vars(match)
+    assert match.players is match.players
+    assert match.match_uuid.version == 4
+    assert match.map_type_name is None
+    with pytest.raises(AttributeError):
+        match.not_a_property
+
+
+def test_lazy_match_history_can_be_copied_changed_and_pickled():
+    match = _decode_lazy_match_history(dict(MATCH_HISTORY_RESPONSE[0], map_type_name="Arabia"))
+    assert match.map_type_name == "Arabia"
+    match.name = "Renamed"
+    assert pickle.loads(pickle.dumps(match)) == match
+    assert copy.deepcopy(match) == match
+    assert dataclasses.replace(match, name="Other").name == "Other"
+    assert match != _decode_lazy_match_history(MATCH_HISTORY_RESPONSE[0])
+
+
+def test_decode_rating_history_item_equals_from_dict():
+    for response in RATING_HISTORY_RESPONSE:
+        assert _decode_rating_history_item(response) == RatingHistoryItem.from_dict(response)
+
+
+def test_decode_strings_equals_from_dict():
+    assert _decode_strings(STRINGS_RESPONSE) == Strings.from_dict(STRINGS_RESPONSE)
+
+
+def test_leaderboard_table_rows_equal_leaderboard_players():
+    response = dict(RM_LEADERBOARD_RESPONSE)
+    response["leaderboard"] = response["leaderboard"] + [dict(response["leaderboard"][0], streak=None, drops=None)]
+    table = _decode_leaderboard_table(response)
+    leaderboard = _decode_leaderboard(response)
+    assert len(table) == 3
+    assert list(table) == leaderboard.players
+    assert table[2].streak is None
+    assert table[1:] == leaderboard.players[1:]
+    assert table.to_leaderboard() == leaderboard
+
+
+def test_strings_lookup_resolves_ids():
+    strings = _decode_strings(STRINGS_RESPONSE)
+    assert strings.civ_name(0) == "Sample Civ"
+    assert strings.lookup("map_type", 0) == "Dry Arabia"
+    assert strings.map_type_name(29) is None
+    assert strings.index is strings.index
+    with pytest.raises(KeyError):
+        strings.lookup("unknown", 0)
+
+
+def test_strings_enrich_resolves_match_history_ids():
+    strings = _decode_strings(dict(STRINGS_RESPONSE, civ=[{'id': 36, 'string': 'Sample Civ'}],
+                                   map_type=[{'id': 29, 'string': 'Arabia'}]))
+    matches = [_decode_lazy_match_history(match) for match in MATCH_HISTORY_RESPONSE]
+    strings.enrich(matches)
+    assert (matches[0].map_type_name, matches[0].game_type_name, matches[0].leaderboard_name) == \
+           ("Arabia", "Random Map", None)
+    assert [player.civ_name for player in matches[0].players] == ["Sample Civ", None]
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from aoe2netapi import API
+from aoe2netapi.constants import Game
+from aoe2netapi.ratelimit import Priority, RateLimiter, RetryPolicy
+
+from tests.api_test import STRINGS_RESPONSE
+
+
+def http_error(status: int, retry_after: str = None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.HTTPError(response=response)
+
+
+def test_rate_limiter_limits_requests_per_second():
+    rate_limiter = RateLimiter(rate=50, burst=2)
+    started = time.monotonic()
+    for _ in range(7):
+        rate_limiter.acquire()
+    assert time.monotonic() - started >= 0.09  # 2 immediately (burst), 5 more at 50/s
+
+
+def test_rate_limiter_serves_more_urgent_lane_first():
+    rate_limiter = RateLimiter(rate=10, burst=1)
+    rate_limiter.acquire()
+    order = []
+
+    def acquire(priority):
+        rate_limiter.acquire(priority)
+        order.append(priority)
+
+    bulk = threading.Thread(target=acquire, args=(Priority.BULK,))
+    interactive = threading.Thread(target=acquire, args=(Priority.INTERACTIVE,))
+    bulk.start()
+    time.sleep(0.02)
+    interactive.start()
+    bulk.join()
+    interactive.join()
+    assert order == [Priority.INTERACTIVE, Priority.BULK]
+
+
+def test_rate_limiter_pause_delays_all_lanes():
+    rate_limiter = RateLimiter(rate=1000, burst=10)
+    rate_limiter.pause(0.05)
+    started = time.monotonic()
+    rate_limiter.acquire(Priority.INTERACTIVE)
+    assert time.monotonic() - started >= 0.04
+
+
+def test_retry_policy_honors_retry_after_and_limits():
+    retry_policy = RetryPolicy(max_retries=2, jitter=False)
+    assert retry_policy.delay(0, 429, "7") == 7
+    assert retry_policy.delay(1, 503) == 1.0
+    assert retry_policy.delay(0, None) == 0.5  # connection error or timeout
+    assert retry_policy.delay(0, 404) is None
+    assert retry_policy.delay(2, 503) is None
+
+
+def test_retry_policy_caps_retry_after_at_max_backoff():
+    retry_policy = RetryPolicy(max_backoff=60)
+    assert retry_policy.delay(0, 429, "3600") == 60
+    assert retry_policy.delay(0, 503, "Fri, 31 Dec 9999 23:59:59 GMT") == 60
+
+
+def test_retry_policy_backoff_is_jittered_and_bounded():
+    retry_policy = RetryPolicy(backoff_factor=1, max_backoff=4)
+    for attempt in range(6):
+        backoff = min(4, 2 ** attempt)
+        assert backoff / 2 <= retry_policy.backoff(attempt) <= backoff
+
+
+def test_client_retries_throttled_request_after_retry_after(mocker):
+    sleep = mocker.patch("aoe2netapi.aoe2.time.sleep")
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response",
+                          side_effect=[http_error(429, retry_after="3"), http_error(503), STRINGS_RESPONSE])
+    api = API(retry_policy=RetryPolicy(jitter=False))
+    strings = api.get_strings(Game.AOE_TWO_DE)
+    assert strings.language == "en"
+    assert mocked.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [3, 1.0]
+
+
+def test_client_does_not_retry_client_errors(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=http_error(404))
+    api = API(retry_policy=RetryPolicy())
+    with pytest.raises(requests.HTTPError):
+        api.get_strings(Game.AOE_TWO_DE)
+    assert mocked.call_count == 1
+
+
+def test_client_without_retry_policy_raises_immediately(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=http_error(503))
+    api = API()
+    with pytest.raises(requests.HTTPError):
+        api.get_strings(Game.AOE_TWO_DE)
+    assert mocked.call_count == 1
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aoe2netapi import Nightbot, AsyncNightbot
+from aoe2netapi.constants import LeaderboardId
+from aoe2netapi.singleflight import SingleFlight
+
+RANK_DETAILS = "Sample Player (9999) Rank #1, has played 9,999 games with a 100% winrate, +9999 streak, and 0 drops"
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def function():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(single_flight.do, "key", function)
+        started.wait()
+        followers = [executor.submit(single_flight.do, "key", function) for _ in range(4)]
+        while single_flight.stats.collapsed < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [follower.result() for follower in followers]
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert single_flight.stats.requests == 1
+    assert single_flight.stats.collapsed == 4
+
+
+def test_single_flight_shares_exception_between_concurrent_callers():
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def function():
+        started.set()
+        release.wait()
+        raise ValueError("request failed")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "key", function)
+        started.wait()
+        follower = executor.submit(single_flight.do, "key", function)
+        while single_flight.stats.collapsed < 1:
+            time.sleep(0.001)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_single_flight_sends_sequential_calls_again():
+    single_flight = SingleFlight()
+    assert single_flight.do("key", lambda: 1) == 1
+    assert single_flight.do("key", lambda: 2) == 2
+    assert single_flight.stats.requests == 2
+
+
+def test_nightbot_collapses_identical_concurrent_requests(mocker):
+    def slow_response(**kwargs):
+        time.sleep(0.05)
+        return RANK_DETAILS
+
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=slow_response)
+    nightbot = Nightbot()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: nightbot.get_rank_details(LeaderboardId.AOE_TWO_RM, profile_id="1"),
+                                    range(8)))
+    assert results == [RANK_DETAILS] * 8
+    assert mocked.call_count + nightbot.single_flight.stats.collapsed == 8
+    assert mocked.call_count < 8
+
+
+def test_async_nightbot_collapses_identical_concurrent_requests(mocker):
+    async def slow_response(**kwargs):
+        await asyncio.sleep(0.01)
+        return RANK_DETAILS
+
+    mocked = mocker.patch("aoe2netapi.aio._get_request_response", side_effect=slow_response)
+
+    async def main():
+        async with AsyncNightbot() as nightbot:
+            results = await asyncio.gather(*(nightbot.get_rank_details(LeaderboardId.AOE_TWO_RM, profile_id="1")
+                                             for _ in range(10)))
+            return results, nightbot.single_flight.stats
+
+    results, stats = asyncio.run(main())
+    assert results == [RANK_DETAILS] * 10
+    assert mocked.call_count == 1
+    assert stats.collapsed == 9
@@ -0,0 +1,62 @@
+import pytest
+
+from aoe2netapi.models.matchhistory import _decode_match_history
+from aoe2netapi.store import MatchStore
+
+from tests.api_test import MATCH_HISTORY_RESPONSE
+
+
+def match(match_id, started, map_type=29, leaderboard_id=3, civs=(36, 1), **kwargs):
+    players = [dict(MATCH_HISTORY_RESPONSE[0]["players"][0], profile_id=profile_id, civ=civ)
+               for profile_id, civ in enumerate(civs, start=1)]
+    return _decode_match_history(dict(MATCH_HISTORY_RESPONSE[0], match_id=match_id, started=started,
+                                      map_type=map_type, leaderboard_id=leaderboard_id, players=players,
+                                      match_uuid="00000000-0000-0000-0000-{:012d}".format(int(match_id)), **kwargs))
+
+
+@pytest.fixture
+def store(tmp_path):
+    with MatchStore(str(tmp_path / "matches.db")) as store:
+        yield store
+
+
+def test_match_store_returns_stored_matches(store):
+    stored = match("1", 100)
+    assert store.add([stored]) == 1
+    assert len(store) == 1 and "1" in store
+    assert store.get("1") == stored
+    assert store.get("2") is None
+
+
+def test_match_store_deduplicates_matches_by_match_id_and_uuid(store):
+    store.add([match("1", 100), match("2", 200)])
+    assert store.add([match("1", 100, finished=150), match("3", 300)]) == 1
+    assert len(store) == 3
+    assert store.get("1").finished == 150
+    assert [m.match_id for m in store.query(profile_id="1")] == ["3", "2", "1"]
+
+
+def test_match_store_persists_matches(tmp_path):
+    path = str(tmp_path / "matches.db")
+    with MatchStore(path) as store:
+        store.add([match("1", 100)])
+    with MatchStore(path) as store:
+        assert [m.match_id for m in store.query()] == ["1"]
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({}, ["4", "3", "2", "1"]),
+    ({"map_type": 9}, ["4", "2"]),
+    ({"leaderboard_id": 4}, ["3"]),
+    ({"civ": 5}, ["4", "1"]),
+    ({"profile_id": "1", "civ": 5}, ["1"]),
+    ({"profile_id": "3"}, ["2"]),
+    ({"since": 200, "until": 400}, ["3", "2"]),
+    ({"map_type": 9, "limit": 1}, ["4"]),
+])
+def test_match_store_query_filters_matches(store, filters, expected):
+    store.add([match("1", 100, civs=(5, 1)),
+               match("2", 200, map_type=9, civs=(1, 2, 3)),
+               match("3", 300, leaderboard_id=4),
+               match("4", 400, map_type=9, civs=(1, 5))])
+    assert [m.match_id for m in store.query(**filters)] == expected
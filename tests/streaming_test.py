@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+
+from aoe2netapi import API, AsyncAPI, Aoe2NetException
+from aoe2netapi.constants import LeaderboardId
+from aoe2netapi.streaming import _JsonArrayStream, ijson
+
+from tests.api_test import RM_LEADERBOARD_RESPONSE
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(ijson is None, reason="requires ijson"))]
+
+BODY = json.dumps(dict(RM_LEADERBOARD_RESPONSE, unknown={"nested": [1, "]}"]}, total=12.5,
+                       leaderboard=[dict(RM_LEADERBOARD_RESPONSE["leaderboard"][0], profile_id=i, name="Spíeler ,]")
+                                    for i in range(20)])).encode()
+
+
+def chunks(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class FakeContent:
+    async def iter_chunked(self, chunk_size):
+        for chunk in chunks(BODY, 64):
+            yield chunk
+
+
+class FakeAsyncStreamResponse:
+    content = FakeContent()
+    released = False
+
+    def release(self):
+        self.released = True
+
+
+@pytest.mark.parametrize("use_ijson", BACKENDS)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024, 1 << 20])
+def test_json_array_stream_yields_all_items_of_any_chunk_sizes(use_ijson, chunk_size):
+    parser = _JsonArrayStream("leaderboard", use_ijson=use_ijson)
+    items = [item for chunk in chunks(BODY, chunk_size) for item in parser.feed(chunk)]
+    parser.close()
+    assert items == json.loads(BODY)["leaderboard"]
+
+
+@pytest.mark.parametrize("use_ijson", BACKENDS)
+def test_json_array_stream_yields_items_before_the_response_is_complete(use_ijson):
+    parser = _JsonArrayStream("leaderboard", use_ijson=use_ijson)
+    assert len(parser.feed(BODY[:len(BODY) // 2])) > 0
+
+
+@pytest.mark.parametrize("use_ijson", BACKENDS)
+def test_json_array_stream_throws_aoe2net_exception_when_response_is_incomplete(use_ijson):
+    parser = _JsonArrayStream("leaderboard", use_ijson=use_ijson)
+    parser.feed(BODY[:-40])
+    with pytest.raises(Aoe2NetException):
+        parser.close()
+
+
+class FakeStreamResponse:
+    def __init__(self, body, chunk_size=64):
+        self._chunks = chunks(body, chunk_size)
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+    def iter_content(self, chunk_size):
+        yield from self._chunks
+
+
+def test_stream_leaderboard_yields_players(mocker):
+    response = FakeStreamResponse(BODY)
+    mocked = mocker.patch("aoe2netapi.aoe2._get_response_stream", return_value=response)
+    players = list(API().stream_leaderboard(LeaderboardId.AOE_TWO_RM, count=20))
+    assert [player.profile_id for player in players] == list(range(20))
+    assert players[0].name == "Spíeler ,]"
+    assert mocked.call_args.kwargs["params"]["count"] == 20
+    assert response.closed
+
+
+def test_async_stream_leaderboard_yields_players(mocker):
+    response = FakeAsyncStreamResponse()
+
+    async def stream(**kwargs):
+        return response
+
+    mocker.patch("aoe2netapi.aio._get_response_stream", side_effect=stream)
+
+    async def main():
+        async with AsyncAPI() as api:
+            return [player.profile_id async for player in api.stream_leaderboard(LeaderboardId.AOE_TWO_RM)]
+
+    assert asyncio.run(main()) == list(range(20))
+    assert response.released
+
+
+def test_async_stream_leaderboard_releases_the_response_when_stopped_early(mocker):
+    response = FakeAsyncStreamResponse()
+
+    async def stream(**kwargs):
+        return response
+
+    mocker.patch("aoe2netapi.aio._get_response_stream", side_effect=stream)
+
+    async def main():
+        async with AsyncAPI() as api:
+            players = api.stream_leaderboard(LeaderboardId.AOE_TWO_RM)
+            profile_id = (await players.__anext__()).profile_id
+            await players.aclose()
+            return profile_id, response.released
+
+    assert asyncio.run(main()) == (0, True)
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+import requests
+
+from aoe2netapi import API, AsyncAPI, Aoe2NetException
+from aoe2netapi.constants import LeaderboardId, EventLeaderboardId, Game
+from aoe2netapi.models.leaderboard import _decode_leaderboard, _decode_leaderboard_table
+from aoe2netapi.sync import LeaderboardSnapshot, MatchHistorySync, MatchMark
+
+from tests.api_test import RM_LEADERBOARD_RESPONSE, MATCH_HISTORY_RESPONSE, leaderboard_page_response
+
+
+def leaderboard_response(*players):
+    return dict(RM_LEADERBOARD_RESPONSE, leaderboard=[dict(RM_LEADERBOARD_RESPONSE["leaderboard"][0], **player)
+                                                      for player in players])
+
+
+def test_first_update_reports_all_players_as_new():
+    snapshot = LeaderboardSnapshot()
+    diff = snapshot.update(LeaderboardId.AOE_TWO_RM, _decode_leaderboard_table(RM_LEADERBOARD_RESPONSE))
+    assert [player.name for player in diff.new] == ["Sample Player 1", "Sample Player 2"]
+    assert not diff.removed and not diff.changed
+    assert LeaderboardId.AOE_TWO_RM in snapshot
+
+
+def test_update_reports_new_removed_and_changed_players_with_deltas():
+    snapshot = LeaderboardSnapshot()
+    snapshot.update(LeaderboardId.AOE_TWO_RM, _decode_leaderboard_table(leaderboard_response(
+        {"profile_id": 1, "rank": 1, "rating": 2000},
+        {"profile_id": 2, "rank": 2, "rating": 1900, "streak": None},
+        {"profile_id": 3, "rank": 3, "rating": 1800})))
+
+    diff = snapshot.update(LeaderboardId.AOE_TWO_RM, _decode_leaderboard_table(leaderboard_response(
+        {"profile_id": 2, "rank": 1, "rating": 2016, "streak": None},
+        {"profile_id": 1, "rank": 2, "rating": 1984},
+        {"profile_id": 4, "rank": 3, "rating": 1700})))
+
+    assert [player.profile_id for player in diff.new] == [4]
+    assert [player.profile_id for player in diff.removed] == [3]
+    assert [(change.profile_id, change.rating_delta, change.rank_delta) for change in diff.changed] == \
+           [(2, 116, -1), (1, -16, 1)]
+    assert diff.changed[0].current.streak is None
+
+
+def test_update_accepts_leaderboards_and_keeps_leaderboards_apart():
+    snapshot = LeaderboardSnapshot()
+    snapshot.update(LeaderboardId.AOE_TWO_RM, _decode_leaderboard_table(RM_LEADERBOARD_RESPONSE))
+
+    assert snapshot.update(LeaderboardId.AOE_TWO_RM, _decode_leaderboard(RM_LEADERBOARD_RESPONSE)).empty
+    assert len(snapshot.update(EventLeaderboardId.AOE_FOUR_SEASON_ONE,
+                               _decode_leaderboard(RM_LEADERBOARD_RESPONSE)).new) == 2
+    assert snapshot.players(LeaderboardId.AOE_TWO_RM) == _decode_leaderboard(RM_LEADERBOARD_RESPONSE).players
+
+
+def test_refresh_requests_the_full_leaderboard(mocker):
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=leaderboard_page_response)
+    snapshot = LeaderboardSnapshot()
+    diff = snapshot.refresh(API(), LeaderboardId.AOE_TWO_RM, page_size=10, max_in_flight=2)
+    assert [player.rank for player in diff.new] == list(range(1, 26))
+    assert snapshot.refresh(API(), LeaderboardId.AOE_TWO_RM, page_size=10).empty
+
+
+def match_history(newest):
+    def response(url, params, **kwargs):
+        start, count = params["start"], params["count"]
+        return [dict(MATCH_HISTORY_RESPONSE[0], match_id=str(match_id), started=match_id * 100)
+                for match_id in range(newest - start, max(newest - start - count, 0), -1)]
+    return response
+
+
+@pytest.mark.parametrize("page_size, initial_count", [(0, 10), (1001, 10), (10, 0), (10, 1001)])
+def test_match_history_sync_throws_aoe2net_exception_when_page_sizes_are_not_valid(page_size, initial_count):
+    with pytest.raises(Aoe2NetException):
+        MatchHistorySync(page_size=page_size, initial_count=initial_count)
+
+
+def test_match_history_sync_requests_only_the_new_matches(mocker):
+    mocked = mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=match_history(50))
+    api, history_sync = API(), MatchHistorySync(page_size=3, initial_count=5)
+
+    assert [match.match_id for match in history_sync.sync(api, Game.AOE_TWO_DE, profile_id="1")] == \
+           ["50", "49", "48", "47", "46"]
+    assert history_sync.mark(Game.AOE_TWO_DE, profile_id="1") == MatchMark(match_id="50", started=5000)
+    assert history_sync.sync(api, Game.AOE_TWO_DE, profile_id="1") == []
+    assert mocked.call_count == 2
+
+    mocked.side_effect = match_history(54)
+    assert [match.match_id for match in history_sync.sync(api, Game.AOE_TWO_DE, profile_id="1")] == \
+           ["54", "53", "52", "51"]
+    assert mocked.call_count == 4
+    assert history_sync.marks == {("aoe2de", "1"): MatchMark(match_id="54", started=5400)}
+
+
+def test_match_history_sync_stops_at_older_matches_if_the_known_match_is_gone(mocker):
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=match_history(30))
+    history_sync = MatchHistorySync(page_size=5, marks={("aoe2de", "1"): MatchMark(match_id="x", started=2750)})
+    assert [match.match_id for match in history_sync.sync(API(), Game.AOE_TWO_DE, profile_id="1")] == \
+           ["30", "29", "28"]
+
+
+def test_match_history_sync_keeps_the_mark_if_a_page_request_fails(mocker):
+    response = match_history(30)
+
+    def failing_second_page(url, params, **kwargs):
+        if params["start"] > 0:
+            raise requests.ConnectionError("connection reset")
+        return response(url, params)
+
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=failing_second_page)
+    history_sync = MatchHistorySync(page_size=10, marks={("aoe2de", "1"): MatchMark(match_id="10", started=1000)})
+    with pytest.raises(requests.ConnectionError):
+        history_sync.sync(API(), Game.AOE_TWO_DE, profile_id="1")
+    assert history_sync.mark(Game.AOE_TWO_DE, profile_id="1") == MatchMark(match_id="10", started=1000)
+
+    mocker.patch("aoe2netapi.aoe2._get_request_response", side_effect=response)
+    assert [match.match_id for match in history_sync.sync(API(), Game.AOE_TWO_DE, profile_id="1")] == \
+           [str(match_id) for match_id in range(30, 10, -1)]
+
+
+def test_match_history_sync_async_requests_only_the_new_matches(mocker):
+    response = match_history(20)
+
+    async def match_history_page(url, params, **kwargs):
+        return response(url, params)
+
+    mocker.patch("aoe2netapi.aio._get_request_response", side_effect=match_history_page)
+    history_sync = MatchHistorySync(page_size=2, marks={("aoe2de", "1"): MatchMark(match_id="17", started=1700)})
+
+    async def main():
+        async with AsyncAPI() as api:
+            return await history_sync.sync_async(api, Game.AOE_TWO_DE, profile_id="1")
+
+    assert [match.match_id for match in asyncio.run(main())] == ["20", "19", "18"]
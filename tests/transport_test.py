@@ -0,0 +1,141 @@
+import json
+
+import pytest
+import requests
+
+from aoe2netapi import API, Nightbot
+from aoe2netapi.constants import LeaderboardId, Game
+from aoe2netapi.ratelimit import RetryPolicy
+from aoe2netapi.transport import FixtureServer, HttpTransport, RecordingTransport, ReplayTransport, Transport, \
+    _build_response
+
+from tests.api_test import STRINGS_RESPONSE, RM_LEADERBOARD_RESPONSE
+
+ROUTES = {
+    "/api/strings": lambda params: STRINGS_RESPONSE,
+    "/api/leaderboard": lambda params: dict(RM_LEADERBOARD_RESPONSE, start=int(params["start"])),
+    "/api/nightbot/rank": lambda params: "Sample Player 1 (9999) is #1",
+}
+
+
+class CannedTransport(Transport):
+    """ Answers every request with the leaderboard response and counts the requests. """
+
+    def __init__(self):
+        self.requests = []
+        self.headers = {}
+
+    def send(self, url, params=None, session=None, timeout=None, stream=False, headers=None):
+        self.requests.append((url, params))
+        body = json.dumps(RM_LEADERBOARD_RESPONSE).encode()
+        return _build_response(url, 200, dict({"Content-Type": "application/json", "ETag": '"1"', "X-Other": "1"},
+                                              **self.headers), body)
+
+
+def record_leaderboard(directory, transport=None):
+    API(transport=RecordingTransport(str(directory), transport=transport or CannedTransport())) \
+        .get_leaderboard(LeaderboardId.AOE_TWO_RM)
+
+
+def test_transport_requires_send():
+    class IncompleteTransport(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteTransport()
+
+
+def test_recorded_responses_are_replayed_without_network(tmp_path):
+    canned = CannedTransport()
+    record_leaderboard(tmp_path, canned)
+    assert len(canned.requests) == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    leaderboard = API(transport=ReplayTransport(str(tmp_path))).get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    assert leaderboard.total == RM_LEADERBOARD_RESPONSE["total"]
+    assert len(leaderboard.players) == 2
+    assert len(canned.requests) == 1
+
+
+def test_replay_transport_keeps_recorded_headers_only(tmp_path):
+    RecordingTransport(str(tmp_path), transport=CannedTransport()).send("https://aoe2.net/api/leaderboard?",
+                                                                       {"start": 1, "search": None})
+    response = ReplayTransport(str(tmp_path)).send("https://aoe2.net/api/leaderboard", {"start": "1"})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1"'
+    assert "X-Other" not in response.headers
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"If-None-Match": '"1"'}, 304),
+    ({"If-None-Match": '"0", "1"'}, 304),
+    ({"If-None-Match": '"2"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}, 200),
+    ({"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}, 304),
+    ({"If-Modified-Since": "Tue, 20 Oct 2015 07:28:00 GMT"}, 200),
+    ({"If-Modified-Since": "not a date"}, 200),
+    (None, 200),
+])
+def test_replay_transport_answers_matching_conditional_requests_with_not_modified(tmp_path, headers, status):
+    transport = CannedTransport()
+    transport.headers = {"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    RecordingTransport(str(tmp_path), transport=transport).send("https://aoe2.net/api/leaderboard", {"start": 1})
+    response = ReplayTransport(str(tmp_path)).send("https://aoe2.net/api/leaderboard", {"start": "1"},
+                                                   headers=headers)
+    assert response.status_code == status
+    assert response.headers["ETag"] == '"1"'
+    assert (response.content == b"") == (status == 304)
+
+
+def test_replay_transport_answers_unrecorded_requests_with_not_found(tmp_path):
+    api = API(transport=ReplayTransport(str(tmp_path)))
+    with pytest.raises(requests.HTTPError) as error:
+        api.get_strings(Game.AOE_TWO_DE)
+    assert error.value.response.status_code == 404
+
+
+def test_replay_transport_injected_errors_are_retried(tmp_path, mocker):
+    mocker.patch("aoe2netapi.aoe2.time.sleep")
+    record_leaderboard(tmp_path)
+
+    failing = ReplayTransport(str(tmp_path), error_rate=1)
+    with pytest.raises(requests.HTTPError) as error:
+        API(transport=failing, retry_policy=RetryPolicy(max_retries=2)).get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    assert error.value.response.status_code == 503
+
+    flaky = ReplayTransport(str(tmp_path), error_rate=0.5, seed=1)
+    api = API(transport=flaky, retry_policy=RetryPolicy(max_retries=10))
+    for _ in range(5):
+        assert api.get_leaderboard(LeaderboardId.AOE_TWO_RM).total == RM_LEADERBOARD_RESPONSE["total"]
+
+
+def test_replay_transport_adds_latency(tmp_path, mocker):
+    sleep = mocker.patch("aoe2netapi.transport.time.sleep")
+    ReplayTransport(str(tmp_path), latency=0.25).send("https://aoe2.net/api/strings", {"game": "aoe2de"})
+    sleep.assert_called_once_with(0.25)
+
+
+@pytest.mark.parametrize("kwargs", [{"latency": -1}, {"jitter": -1}, {"error_rate": 1.5}])
+def test_replay_transport_throws_value_error_when_arguments_are_not_valid(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        ReplayTransport(str(tmp_path), **kwargs)
+
+
+def test_fixture_server_serves_routes_end_to_end():
+    with FixtureServer(routes=ROUTES) as server:
+        transport = HttpTransport(origin=server.url)
+        api = API(transport=transport)
+        assert api.get_strings(Game.AOE_TWO_DE).language == "en"
+        assert api.get_leaderboard(LeaderboardId.AOE_TWO_RM, start=5).start == 5
+        assert [player.profile_id for player in api.stream_leaderboard(LeaderboardId.AOE_TWO_RM, count=2)] == [1, 2]
+        assert Nightbot(transport=transport).get_rank_details(LeaderboardId.AOE_TWO_RM, profile_id="1") == \
+            "Sample Player 1 (9999) is #1"
+        with pytest.raises(requests.HTTPError):
+            api.get_match_history(Game.AOE_TWO_DE, profile_id="1")
+
+
+def test_fixture_server_serves_recordings_over_routes(tmp_path):
+    record_leaderboard(tmp_path)
+
+    with FixtureServer(str(tmp_path), routes={"/api/leaderboard": lambda params: {}}) as server:
+        leaderboard = API(transport=HttpTransport(origin=server.url)).get_leaderboard(LeaderboardId.AOE_TWO_RM)
+    assert leaderboard.total == RM_LEADERBOARD_RESPONSE["total"]